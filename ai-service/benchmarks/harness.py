@@ -0,0 +1,101 @@
+"""
+Shared pieces of the benchmark scripts: latency summaries, starting a local
+server and driving it with concurrent HTTP clients.
+"""
+
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import httpx
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def latency_summary(latencies_ms: List[float]) -> Dict:
+    lat = np.array(latencies_ms) if latencies_ms else np.zeros(1)
+    return {
+        "p50_ms": round(float(np.percentile(lat, 50)), 2),
+        "p95_ms": round(float(np.percentile(lat, 95)), 2),
+        "p99_ms": round(float(np.percentile(lat, 99)), 2),
+        "mean_ms": round(float(lat.mean()), 2),
+    }
+
+
+def wait_ready(base_url: str, timeout: float) -> None:
+    # Workers load independently, so require a run of consecutive 200s
+    deadline = time.time() + timeout
+    streak = 0
+    while time.time() < deadline:
+        try:
+            ok = httpx.get(f"{base_url}/ready", timeout=2).status_code == 200
+        except httpx.HTTPError:
+            ok = False
+        streak = streak + 1 if ok else 0
+        if streak >= 20:
+            return
+        time.sleep(0.05 if ok else 0.5)
+    raise SystemExit(f"Service at {base_url} not ready after {timeout:.0f}s")
+
+
+@contextmanager
+def running_server(command: List[str], env: Dict, port: int, ready_timeout: float):
+    """Start `command` in ai-service/, wait for /ready and yield (base_url, process)."""
+    proc = subprocess.Popen(command, cwd=ROOT, env=env)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        wait_ready(base_url, ready_timeout)
+        yield base_url, proc
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+
+def drive_load(
+    base_url: str,
+    secret: str,
+    make_request: Callable[[int], tuple],
+    concurrency: int,
+    duration: float,
+) -> Dict:
+    """
+    Run `concurrency` client threads for `duration` seconds. `make_request(i)`
+    returns (path, json payload) for the i-th request.
+    """
+    latencies, errors = [], []
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def client(offset: int):
+        with httpx.Client(
+            timeout=30, headers={"Authorization": f"Bearer {secret}"}
+        ) as http:
+            i = offset
+            while time.perf_counter() < stop_at:
+                path, payload = make_request(i)
+                started = time.perf_counter()
+                try:
+                    ok = http.post(f"{base_url}{path}", json=payload).status_code == 200
+                except httpx.HTTPError:
+                    ok = False
+                elapsed = (time.perf_counter() - started) * 1000.0
+                with lock:
+                    (latencies if ok else errors).append(elapsed)
+                i += concurrency
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "rps": round(len(latencies) / duration, 2),
+        **latency_summary(latencies),
+    }
@@ -0,0 +1,142 @@
+"""
+Benchmark fixed max_length padding against dynamic, length-grouped batching.
+
+Usage (from ai-service/):
+  python benchmarks/padding_benchmark.py --model models/afroxlmr_incident_classifier --data data/incidents_labeled.csv --batch 16
+
+Reports rows/sec, real (non-pad) tokens/sec, padded tokens processed and per-batch
+latency percentiles for each mode.
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import torch
+from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from utils.batching import length_grouped_batches, pad_sequences  # noqa: E402
+
+MAX_LENGTH = 128
+
+
+def _batches(encoded, batch_size: int, mode: str):
+    if mode == "max_length":
+        for i in range(0, len(encoded), batch_size):
+            yield encoded[i : i + batch_size]
+        return
+    for idx in length_grouped_batches([len(ids) for ids in encoded], batch_size):
+        yield [encoded[i] for i in idx]
+
+
+def run_mode(model, tokenizer, texts, batch_size: int, mode: str, repeats: int):
+    encoded = tokenizer(texts, truncation=True, max_length=MAX_LENGTH)["input_ids"]
+    real_tokens = sum(len(ids) for ids in encoded)
+    latencies = []
+    padded_tokens = 0
+    started = time.perf_counter()
+    for _ in range(repeats):
+        for chunk in _batches(encoded, batch_size, mode):
+            input_ids, attention_mask = pad_sequences(chunk, tokenizer.pad_token_id)
+            if mode == "max_length" and input_ids.shape[1] < MAX_LENGTH:
+                extra = MAX_LENGTH - input_ids.shape[1]
+                input_ids = np.pad(
+                    input_ids,
+                    ((0, 0), (0, extra)),
+                    constant_values=tokenizer.pad_token_id,
+                )
+                attention_mask = np.pad(attention_mask, ((0, 0), (0, extra)))
+            padded_tokens += input_ids.size
+            t0 = time.perf_counter()
+            with torch.no_grad():
+                model(
+                    input_ids=torch.from_numpy(input_ids),
+                    attention_mask=torch.from_numpy(attention_mask),
+                )
+            latencies.append((time.perf_counter() - t0) * 1000.0)
+    elapsed = time.perf_counter() - started
+    rows = len(texts) * repeats
+    return {
+        "mode": mode,
+        "rows": rows,
+        "seconds": round(elapsed, 3),
+        "rows_per_sec": round(rows / elapsed, 2),
+        "tokens_per_sec": round(real_tokens * repeats / elapsed, 1),
+        "padded_tokens": int(padded_tokens),
+        "padding_ratio": round(1 - real_tokens * repeats / padded_tokens, 4)
+        if padded_tokens
+        else 0.0,
+        "batch_latency_ms": {
+            "p50": round(float(np.percentile(latencies, 50)), 2),
+            "p95": round(float(np.percentile(latencies, 95)), 2),
+            "mean": round(float(np.mean(latencies)), 2),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--model", type=Path, default=Path("models/afroxlmr_incident_classifier")
+    )
+    parser.add_argument("--data", type=Path, default=Path("data/incidents_labeled.csv"))
+    parser.add_argument("--batch", type=int, default=16)
+    parser.add_argument(
+        "--repeats", type=int, default=1, help="Passes over the dataset per mode"
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=0,
+        help="torch intra-op threads (0 = torch default)",
+    )
+    parser.add_argument(
+        "--save_report", type=Path, help="Optional path to save JSON results"
+    )
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    texts = pd.read_csv(args.data)["text"].astype(str).tolist()
+    tokenizer = AutoTokenizer.from_pretrained(str(args.model))
+    model = AutoModelForSequenceClassification.from_pretrained(str(args.model))
+    model.eval()
+
+    # One untimed warm-up batch so the first measured mode doesn't pay for lazy init.
+    run_mode(model, tokenizer, texts[: args.batch], args.batch, "dynamic", repeats=1)
+
+    results = [
+        run_mode(model, tokenizer, texts, args.batch, mode, args.repeats)
+        for mode in ("max_length", "dynamic")
+    ]
+    fixed, dynamic = results
+    report = {
+        "model": str(args.model),
+        "data": str(args.data),
+        "batch_size": args.batch,
+        "torch_threads": torch.get_num_threads(),
+        "results": results,
+        "speedup": {
+            "tokens_per_sec": round(
+                dynamic["tokens_per_sec"] / fixed["tokens_per_sec"], 2
+            ),
+            "batch_latency_p50": round(
+                fixed["batch_latency_ms"]["p50"] / dynamic["batch_latency_ms"]["p50"], 2
+            ),
+        },
+    }
+
+    print(json.dumps(report, indent=2))
+    if args.save_report:
+        args.save_report.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Saved report to {args.save_report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,408 @@
+"""
+Reproducible latency/throughput benchmark suite for the AI service.
+
+Two stages, both on the texts in data/incidents_labeled.csv and
+data/incidents_am_aug.csv:
+
+  inprocess  main.predict_batch (tokenize, forward, postprocess) on each backend,
+             over batch size x text-length bucket x intra-op threads.
+  http       a local `uvicorn main:app` per backend and thread count, driving
+             /classify at each client concurrency and /classify/batch at each
+             batch size.
+
+Length buckets are the token-length tertiles of the data (short/medium/long)
+plus "full": random descriptions joined until they fill MAX_LENGTH tokens, for
+reports longer than anything in the labelled set. Backends are torch, int8
+(QUANTIZATION=dynamic) and onnx (skipped when the model has no ONNX export).
+Batches are sampled with a fixed seed, and the prediction cache and cascade are
+off, so every request runs the model.
+
+Every cell reports p50/p95/p99 latency and throughput. Results are written as
+JSON together with the environment (CPU count, library versions, git commit,
+model version). Pass --baseline with an earlier result file to flag cells whose
+p95 rose, or whose throughput fell, by more than --max_regression; the script
+then exits with status 1.
+
+Usage (from ai-service/):
+  python benchmarks/service_benchmark.py --out bench.json
+  python benchmarks/service_benchmark.py --stages inprocess --backends torch,int8 --threads 1,4 --baseline bench.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from harness import ROOT, drive_load, latency_summary, running_server
+
+sys.path.insert(0, str(ROOT))
+SECRET = "service-benchmark"
+BACKEND_ENV = {
+    "torch": {"INFERENCE_BACKEND": "torch", "QUANTIZATION": "none"},
+    "int8": {"INFERENCE_BACKEND": "torch", "QUANTIZATION": "dynamic"},
+    "onnx": {"INFERENCE_BACKEND": "onnx", "QUANTIZATION": "none"},
+}
+# Serve-path settings shared by both stages; set before main.py is imported
+for key, value in {
+    "PREDICTION_CACHE_URL": "off",
+    "CASCADE_MODE": "off",
+    "WARMUP_LENGTHS": "",
+}.items():
+    os.environ.setdefault(key, value)
+
+
+def _ints(value: str):
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def length_buckets(texts, tokenizer, max_length: int, seed: int) -> dict:
+    """Texts grouped into token-length tertiles, plus joined texts filling max_length."""
+    lengths = np.array(
+        [
+            len(ids)
+            for ids in tokenizer(texts, truncation=True, max_length=max_length)[
+                "input_ids"
+            ]
+        ]
+    )
+    low, high = np.percentile(lengths, [100 / 3, 200 / 3])
+    buckets = {
+        "short": [t for t, n in zip(texts, lengths) if n <= low],
+        "medium": [t for t, n in zip(texts, lengths) if low < n <= high],
+        "long": [t for t, n in zip(texts, lengths) if n > high],
+    }
+    rng = np.random.default_rng(seed)
+    per_full = max(2, int(np.ceil(max_length / max(1, lengths.mean()))))
+    buckets["full"] = [" ".join(rng.choice(texts, per_full)) for _ in range(64)]
+    return {name: rows for name, rows in buckets.items() if rows}
+
+
+def load_bundle(main, backend_name: str, threads: int):
+    from utils.backends import load_onnx_backend, load_torch_backend
+    from utils.model_registry import ModelBundle
+
+    if backend_name == "onnx":
+        backend = load_onnx_backend(main.MODEL_DIR, threads=threads)
+    else:
+        quantization = BACKEND_ENV[backend_name]["QUANTIZATION"]
+        backend = load_torch_backend(
+            main.MODEL_DIR, quantization=quantization, threads=threads
+        )
+    tokenizer = main.AutoTokenizer.from_pretrained(str(main.MODEL_DIR))
+    return ModelBundle(tokenizer, backend, f"benchmark-{backend_name}")
+
+
+def run_inprocess(args, texts) -> list:
+    import torch
+
+    import main
+    from utils.backends import find_onnx_model
+
+    tokenizer = main.AutoTokenizer.from_pretrained(str(main.MODEL_DIR))
+    buckets = length_buckets(texts, tokenizer, main.MAX_LENGTH, args.seed)
+    results = []
+    for backend_name in args.backends:
+        if backend_name == "onnx" and find_onnx_model(main.MODEL_DIR) is None:
+            print(
+                "Skipping onnx: no export next to the model (run training/export_onnx.py)"
+            )
+            continue
+        bundle = None
+        for threads in args.threads:
+            # ORT fixes its thread pool at session creation; torch can switch in place
+            if bundle is None or backend_name == "onnx":
+                bundle = load_bundle(main, backend_name, threads)
+            torch.set_num_threads(threads)
+            for length, pool in buckets.items():
+                for batch_size in args.batch_sizes:
+                    rng = np.random.default_rng(args.seed)
+                    batches = [
+                        list(rng.choice(pool, batch_size))
+                        for _ in range(args.iterations + args.warmup)
+                    ]
+                    latencies = []
+                    for i, batch in enumerate(batches):
+                        started = time.perf_counter()
+                        main.predict_batch(batch, bundle)
+                        if i >= args.warmup:
+                            latencies.append((time.perf_counter() - started) * 1000.0)
+                    seconds = sum(latencies) / 1000.0
+                    result = {
+                        "key": f"inprocess/{backend_name}/threads={threads}/batch={batch_size}/length={length}",
+                        "stage": "inprocess",
+                        "backend": backend_name,
+                        "threads": threads,
+                        "batch_size": batch_size,
+                        "length": length,
+                        "batches": len(latencies),
+                        **latency_summary(latencies),
+                        "rps": round(len(latencies) / seconds, 2),
+                        "items_per_sec": round(
+                            len(latencies) * batch_size / seconds, 2
+                        ),
+                    }
+                    results.append(_report(result))
+    return results
+
+
+def run_http(args, texts) -> list:
+    rng = np.random.default_rng(args.seed)
+    order = rng.permutation(len(texts))
+    results = []
+
+    def single(i: int):
+        return "/classify", {"title": "", "description": texts[order[i % len(order)]]}
+
+    def batch_of(size: int):
+        def request(i: int):
+            rows = [texts[order[(i * size + j) % len(order)]] for j in range(size)]
+            return "/classify/batch", [
+                {"title": "", "description": text} for text in rows
+            ]
+
+        return request
+
+    for backend_name in args.backends:
+        for threads in args.threads:
+            env = {
+                **os.environ,
+                **BACKEND_ENV[backend_name],
+                "INTERNAL_SERVICE_SECRET": SECRET,
+                "INFERENCE_THREADS": str(threads),
+                "WARMUP_LENGTHS": "16,64,128",
+            }
+            command = [
+                sys.executable,
+                "-m",
+                "uvicorn",
+                "main:app",
+                "--port",
+                str(args.port),
+                "--log-level",
+                "warning",
+            ]
+            try:
+                with running_server(command, env, args.port, args.ready_timeout) as (
+                    base_url,
+                    _proc,
+                ):
+                    drive_load(
+                        base_url,
+                        SECRET,
+                        single,
+                        max(args.concurrency),
+                        min(3.0, args.duration),
+                    )
+                    cells = [("/classify", 1, c, single) for c in args.concurrency]
+                    cells += [
+                        ("/classify/batch", b, 1, batch_of(b))
+                        for b in args.batch_sizes
+                        if b > 1
+                    ]
+                    for endpoint, batch_size, concurrency, request in cells:
+                        load = drive_load(
+                            base_url, SECRET, request, concurrency, args.duration
+                        )
+                        result = {
+                            "key": (
+                                f"http/{backend_name}/threads={threads}{endpoint}"
+                                f"/batch={batch_size}/concurrency={concurrency}"
+                            ),
+                            "stage": "http",
+                            "backend": backend_name,
+                            "threads": threads,
+                            "endpoint": endpoint,
+                            "batch_size": batch_size,
+                            "concurrency": concurrency,
+                            **load,
+                            "items_per_sec": round(load["rps"] * batch_size, 2),
+                        }
+                        results.append(_report(result))
+            except SystemExit as e:
+                # e.g. onnx without an export: the server never becomes ready
+                print(f"Skipping http/{backend_name}/threads={threads}: {e}")
+    return results
+
+
+def _report(result: dict) -> dict:
+    errors = f" errors={result['errors']}" if result.get("errors") else ""
+    print(
+        f"{result['key']:70s} p50={result['p50_ms']:8.2f}ms p95={result['p95_ms']:8.2f}ms "
+        f"p99={result['p99_ms']:8.2f}ms items/s={result['items_per_sec']:9.1f}{errors}"
+    )
+    return result
+
+
+def environment(model_dir: Path) -> dict:
+    def version(module: str):
+        try:
+            return __import__(module).__version__
+        except ImportError:
+            return None
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    metadata_path = model_dir / "metadata.json"
+    metadata = (
+        json.loads(metadata_path.read_text(encoding="utf-8"))
+        if metadata_path.exists()
+        else {}
+    )
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "torch": version("torch"),
+        "onnxruntime": version("onnxruntime"),
+        "transformers": version("transformers"),
+        "git_commit": commit,
+        "model_version": metadata.get("version_tag"),
+    }
+
+
+def compare(results: list, baseline: dict, tolerance: float) -> list:
+    """Cells present in both runs whose p95 rose or whose throughput fell by more than `tolerance`."""
+    previous = {r["key"]: r for r in baseline.get("results", [])}
+    regressions = []
+    for current in results:
+        before = previous.get(current["key"])
+        if before is None:
+            continue
+        for metric, worse in (
+            ("p95_ms", lambda a, b: a > b * (1 + tolerance)),
+            ("items_per_sec", lambda a, b: a < b * (1 - tolerance)),
+        ):
+            if before.get(metric) and worse(current[metric], before[metric]):
+                regressions.append(
+                    {
+                        "key": current["key"],
+                        "metric": metric,
+                        "baseline": before[metric],
+                        "current": current[metric],
+                        "change": round(current[metric] / before[metric] - 1, 3),
+                    }
+                )
+    return regressions
+
+
+def main_cli():
+    cores = os.cpu_count() or 1
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--stages", default="inprocess,http", help="Comma-separated: inprocess, http"
+    )
+    parser.add_argument(
+        "--backends",
+        default="torch,int8,onnx",
+        help="Comma-separated: torch, int8, onnx",
+    )
+    parser.add_argument(
+        "--threads",
+        default=",".join(str(t) for t in sorted({1, cores})),
+        help="Intra-op thread counts",
+    )
+    parser.add_argument("--batch_sizes", default="1,8,32")
+    parser.add_argument(
+        "--concurrency",
+        default="1,4,16",
+        help="Client threads for /classify in the http stage",
+    )
+    parser.add_argument(
+        "--data",
+        nargs="+",
+        default=[
+            str(ROOT / "data" / "incidents_labeled.csv"),
+            str(ROOT / "data" / "incidents_am_aug.csv"),
+        ],
+    )
+    parser.add_argument(
+        "--iterations", type=int, default=30, help="Timed batches per in-process cell"
+    )
+    parser.add_argument(
+        "--warmup", type=int, default=3, help="Untimed batches per in-process cell"
+    )
+    parser.add_argument(
+        "--duration", type=float, default=10.0, help="Seconds of load per http cell"
+    )
+    parser.add_argument("--seed", type=int, default=13)
+    parser.add_argument("--port", type=int, default=8012)
+    parser.add_argument("--ready-timeout", type=float, default=300.0)
+    parser.add_argument("--out", help="Write results as JSON to this path")
+    parser.add_argument("--baseline", help="Earlier result file to compare against")
+    parser.add_argument(
+        "--max_regression",
+        type=float,
+        default=0.15,
+        help="Allowed relative p95/throughput change",
+    )
+    args = parser.parse_args()
+    args.backends = [b for b in args.backends.split(",") if b]
+    unknown = set(args.backends) - set(BACKEND_ENV)
+    if unknown:
+        parser.error(f"Unknown backends: {sorted(unknown)}")
+    args.threads = _ints(args.threads)
+    args.batch_sizes = _ints(args.batch_sizes)
+    args.concurrency = _ints(args.concurrency)
+
+    texts = (
+        pd.concat([pd.read_csv(p) for p in args.data], ignore_index=True)["text"]
+        .astype(str)
+        .tolist()
+    )
+    stages = args.stages.split(",")
+    results = []
+    if "inprocess" in stages:
+        results += run_inprocess(args, texts)
+    if "http" in stages:
+        results += run_http(args, texts)
+
+    report = {
+        "environment": environment(ROOT / "models" / "afroxlmr_incident_classifier"),
+        "settings": {
+            k: getattr(args, k)
+            for k in (
+                "stages",
+                "backends",
+                "threads",
+                "batch_sizes",
+                "concurrency",
+                "iterations",
+                "duration",
+                "seed",
+            )
+        },
+        "results": results,
+    }
+    exit_code = 0
+    if args.baseline:
+        report["regressions"] = compare(
+            results, json.loads(Path(args.baseline).read_text()), args.max_regression
+        )
+        for r in report["regressions"]:
+            print(
+                f"REGRESSION {r['key']} {r['metric']}: {r['baseline']} -> {r['current']} ({r['change']:+.1%})"
+            )
+        exit_code = 1 if report["regressions"] else 0
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, indent=2))
+        print(f"Wrote {args.out}")
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main_cli()
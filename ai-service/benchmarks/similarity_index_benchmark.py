@@ -0,0 +1,203 @@
+"""
+Lookup latency and recall of the similar-incident index (utils/similarity_index.py).
+
+For each size the index is filled with synthetic unit vectors of the encoder's
+width (768 for AfroXLMR-base): bursts of near-identical vectors around random
+incident centres, the way repeated citizen reports land close together. The
+benchmark then records
+
+  build_s           time to add every vector in chunks (includes IVF training)
+  search            p50/p95/p99 of single lookups, top-k at --nprobe
+  add               p50/p95/p99 of single inserts into the full index
+  recall_at_k       overlap with the exact top-k over the same vectors
+  recall_at_k_eps   share of returned hits whose exact cosine is within
+                    --eps of the exact k-th best (near-copies of one report are
+                    almost tied, so int8 rounding reorders them)
+  bytes, save_s, load_s, file_bytes
+
+Vectors are regenerated chunk by chunk from the seed for the exact search, so
+a million 768-d vectors never have to sit in memory as float32.
+
+Usage (from ai-service/):
+  python benchmarks/similarity_index_benchmark.py --sizes 10000,100000,1000000 --out similarity_bench.json
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from benchmarks.harness import latency_summary  # noqa: E402
+from utils.similarity_index import SimilarityIndex  # noqa: E402
+
+CHUNK = 10000
+# Chunk numbers for query and insert vectors, past any indexed chunk
+QUERY_CHUNK, INSERT_CHUNK = 10**9, 10**9 + 1
+
+
+def _ints(value: str):
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def chunk_vectors(i: int, dim: int, seed: int, centres: np.ndarray) -> np.ndarray:
+    rng = np.random.default_rng([seed, i])
+    picks = rng.integers(0, len(centres), CHUNK)
+    vectors = centres[picks] + rng.normal(scale=0.01, size=(CHUNK, dim)).astype(
+        np.float32
+    )
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def exact_top_k(
+    queries: np.ndarray,
+    found: list,
+    chunks: int,
+    dim: int,
+    seed: int,
+    centres: np.ndarray,
+    k: int,
+):
+    """Exact top-k ids and k-th best score per query, plus the exact scores of the `found` ids."""
+    best_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+    best_ids = np.zeros((len(queries), k), dtype=np.int64)
+    found_scores = [[] for _ in queries]
+    for i in range(chunks):
+        scores = queries @ chunk_vectors(i, dim, seed, centres).T
+        for q, ids in enumerate(found):
+            found_scores[q].extend(
+                scores[q, int(n) - i * CHUNK]
+                for n in ids
+                if i * CHUNK <= int(n) < (i + 1) * CHUNK
+            )
+        merged = np.concatenate([best_scores, scores], axis=1)
+        ids = np.concatenate(
+            [
+                best_ids,
+                np.broadcast_to(np.arange(i * CHUNK, (i + 1) * CHUNK), scores.shape),
+            ],
+            axis=1,
+        )
+        top = np.argpartition(-merged, k, axis=1)[:, :k]
+        best_scores = np.take_along_axis(merged, top, axis=1)
+        best_ids = np.take_along_axis(ids, top, axis=1)
+    return (
+        [{str(i) for i in row} for row in best_ids],
+        best_scores.min(axis=1),
+        found_scores,
+    )
+
+
+def run_size(size: int, args) -> dict:
+    chunks = max(1, size // CHUNK)
+    rng = np.random.default_rng(args.seed)
+    centres = rng.normal(size=(max(1, size // 20), args.dim)).astype(np.float32)
+    centres /= np.linalg.norm(centres, axis=1, keepdims=True)
+    index = SimilarityIndex(
+        args.dim, window_s=1e12, nprobe=args.nprobe, max_lists=args.max_lists
+    )
+
+    started = time.perf_counter()
+    for i in range(chunks):
+        ids = [str(n) for n in range(i * CHUNK, (i + 1) * CHUNK)]
+        index.add_batch(
+            ids, chunk_vectors(i, args.dim, args.seed, centres), timestamp=0.0
+        )
+    build_s = time.perf_counter() - started
+    print(f"[{size}] built in {build_s:.1f}s: {index.stats()}")
+
+    queries = chunk_vectors(QUERY_CHUNK, args.dim, args.seed, centres)[: args.queries]
+    search_ms, found = [], []
+    for q in queries:
+        t = time.perf_counter()
+        found.append({hit["id"] for hit in index.search(q, k=args.k, now=0.0)})
+        search_ms.append((time.perf_counter() - t) * 1000.0)
+    exact, kth, found_scores = exact_top_k(
+        queries, found, chunks, args.dim, args.seed, centres, args.k
+    )
+    recall = float(np.mean([len(f & e) / args.k for f, e in zip(found, exact)]))
+    recall_eps = float(
+        np.mean(
+            [
+                np.sum(np.array(s) >= t - args.eps) / args.k
+                for s, t in zip(found_scores, kth)
+            ]
+        )
+    )
+
+    add_ms = []
+    for n, q in enumerate(
+        chunk_vectors(INSERT_CHUNK, args.dim, args.seed, centres)[: args.queries]
+    ):
+        t = time.perf_counter()
+        index.add(f"new-{n}", q, timestamp=0.0)
+        add_ms.append((time.perf_counter() - t) * 1000.0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "index.npz"
+        t = time.perf_counter()
+        index.save(path)
+        save_s = time.perf_counter() - t
+        t = time.perf_counter()
+        SimilarityIndex.load(path)
+        load_s = time.perf_counter() - t
+        file_bytes = path.stat().st_size
+
+    result = {
+        "size": len(index),
+        "lists": index.stats()["lists"],
+        "nprobe": args.nprobe,
+        "k": args.k,
+        "build_s": round(build_s, 2),
+        "search": latency_summary(search_ms),
+        "add": latency_summary(add_ms),
+        "recall_at_k": round(recall, 4),
+        "recall_at_k_eps": round(recall_eps, 4),
+        "bytes": index.stats()["bytes"],
+        "save_s": round(save_s, 2),
+        "load_s": round(load_s, 2),
+        "file_bytes": file_bytes,
+    }
+    print(
+        f"[{size}] search {result['search']} recall@{args.k}={result['recall_at_k']} "
+        f"(within {args.eps}: {result['recall_at_k_eps']})"
+    )
+    return result
+
+
+def main_cli():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--sizes", default="10000,100000,1000000", help="Comma-separated index sizes"
+    )
+    parser.add_argument(
+        "--dim",
+        type=int,
+        default=768,
+        help="Embedding width (hidden size of the encoder)",
+    )
+    parser.add_argument("--nprobe", type=int, default=8)
+    parser.add_argument("--max_lists", type=int, default=256)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument(
+        "--eps", type=float, default=0.01, help="Score tolerance for recall_at_k_eps"
+    )
+    parser.add_argument("--seed", type=int, default=13)
+    parser.add_argument("--out", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = [run_size(size, args) for size in _ints(args.sizes)]
+    if args.out:
+        Path(args.out).write_text(
+            json.dumps({"dim": args.dim, "results": results}, indent=2)
+        )
+        print(f"Saved results to {args.out}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,150 @@
+"""
+Data-parallel CPU training throughput at 1, 2, 4 and 8 processes.
+
+For each process count N the benchmark launches
+
+  torchrun --standalone --nproc_per_node N training/train_incident_classifier.py --max_steps S ...
+
+with cores / N intra-op threads per process (OMP_NUM_THREADS and --threads), and
+reads the "training" block rank 0 writes to metadata.json. samples_per_second
+counts optimizer steps only (evaluation and checkpointing are excluded), over the
+global batch (--batch x --grad_accum x N). The report adds speedup and scaling
+efficiency against the single-process run:
+
+  speedup    = samples_per_second(N) / samples_per_second(1)
+  efficiency = speedup / N
+
+Process counts above the core count are skipped unless --oversubscribe is set;
+they would only measure time slicing.
+
+Usage (from ai-service/):
+  python benchmarks/training_scaling_benchmark.py --data ../data/incidents_labeled.csv --procs 1,2,4,8 --out scaling.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import torch
+
+ROOT = Path(__file__).resolve().parent.parent
+TRAIN_SCRIPT = ROOT / "training" / "train_incident_classifier.py"
+
+
+def _ints(value: str):
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def run_procs(procs: int, cores: int, out_dir: Path, args) -> dict:
+    threads = max(1, cores // procs)
+    cmd = [
+        sys.executable,
+        "-m",
+        "torch.distributed.run",
+        "--standalone",
+        f"--nproc_per_node={procs}",
+        str(TRAIN_SCRIPT),
+        "--data",
+        str(args.data),
+        "--model_name",
+        args.model_name,
+        "--output",
+        str(out_dir),
+        "--batch",
+        str(args.batch),
+        "--grad_accum",
+        str(args.grad_accum),
+        "--max_steps",
+        str(args.max_steps),
+        "--bf16",
+        args.bf16,
+        "--threads",
+        str(threads),
+    ]
+    if args.extra_data:
+        cmd += ["--extra_data", *[str(p) for p in args.extra_data]]
+    env = {**os.environ, "OMP_NUM_THREADS": str(threads), "CUDA_VISIBLE_DEVICES": ""}
+    print(f"[{procs} proc] {threads} threads each: {' '.join(cmd)}")
+    subprocess.run(
+        cmd, env=env, check=True, stdout=None if args.verbose else subprocess.DEVNULL
+    )
+    return json.loads((out_dir / "metadata.json").read_text(encoding="utf-8"))[
+        "training"
+    ]
+
+
+def main_cli():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data", type=Path, required=True)
+    parser.add_argument("--extra_data", type=Path, nargs="*")
+    parser.add_argument("--model_name", default="Davlan/afro-xlmr-base")
+    parser.add_argument(
+        "--procs", default="1,2,4,8", help="Comma-separated process counts"
+    )
+    parser.add_argument("--batch", type=int, default=8, help="Per-process batch size")
+    parser.add_argument("--grad_accum", type=int, default=1)
+    parser.add_argument(
+        "--max_steps", type=int, default=30, help="Optimizer steps per run"
+    )
+    parser.add_argument("--bf16", choices=["auto", "on", "off"], default="auto")
+    parser.add_argument(
+        "--cores", type=int, default=0, help="Cores to share out (0 = all)"
+    )
+    parser.add_argument(
+        "--oversubscribe",
+        action="store_true",
+        help="Also run process counts above the core count",
+    )
+    parser.add_argument(
+        "--verbose", action="store_true", help="Show the training output"
+    )
+    parser.add_argument("--out", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    cores = args.cores or os.cpu_count() or 1
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for procs in _ints(args.procs):
+            if procs > cores and not args.oversubscribe:
+                print(f"[{procs} proc] skipped: only {cores} cores")
+                continue
+            results.append(
+                {
+                    "procs": procs,
+                    **run_procs(procs, cores, Path(tmp) / f"procs-{procs}", args),
+                }
+            )
+
+    base = next((r["samples_per_second"] for r in results if r["procs"] == 1), None)
+    print(
+        f"\n{'procs':>5} {'threads':>7} {'samples/s':>10} {'speedup':>8} {'efficiency':>10}"
+    )
+    for r in results:
+        r["speedup"] = round(r["samples_per_second"] / base, 3) if base else None
+        r["efficiency"] = round(r["speedup"] / r["procs"], 3) if base else None
+        print(
+            f"{r['procs']:>5} {r['threads_per_process']:>7} {r['samples_per_second']:>10.2f} "
+            f"{r['speedup'] if base else '-':>8} {r['efficiency'] if base else '-':>10}"
+        )
+
+    if args.out:
+        report = {
+            "model_name": args.model_name,
+            "cores": cores,
+            "torch": torch.__version__,
+            "cpu_capability": torch.backends.cpu.get_cpu_capability(),
+            "per_process_batch": args.batch,
+            "grad_accum": args.grad_accum,
+            "max_steps": args.max_steps,
+            "results": results,
+        }
+        Path(args.out).write_text(json.dumps(report, indent=2))
+        print(f"Saved results to {args.out}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,178 @@
+"""
+Measure memory per worker and throughput scaling of multi-process serving.
+
+For each worker count, starts the service both as `uvicorn main:app --workers N`
+(every worker loads its own model) and as `python serve.py --workers N` (model
+loaded once, workers forked from it). It waits for /ready, drives /classify with
+concurrent clients for a fixed duration, then samples the memory of every
+process in the tree. INFERENCE_THREADS is set to cores / N so the pool never
+oversubscribes the machine. The prediction cache and cascade are turned off so
+every request runs the model.
+
+Usage (from ai-service/):
+  python benchmarks/worker_pool_benchmark.py --workers 1,2,4 --duration 20 --out worker_pool.json
+
+Needs psutil. RSS counts shared pages in every process. PSS splits them across
+the processes that share them, so the PSS total is the real cost of the pool.
+USS is what a process holds privately, i.e. what one more worker adds.
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+import pandas as pd
+import psutil
+
+from harness import ROOT, drive_load, running_server
+
+SECRET = "worker-pool-benchmark"
+
+
+def process_memory(parent: psutil.Process) -> list:
+    """Memory of the parent and every descendant (the parent holds the preloaded model in prefork mode)."""
+    rows = []
+    for proc in [parent] + parent.children(recursive=True):
+        try:
+            mem = proc.memory_full_info()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+        rows.append(
+            {
+                "pid": proc.pid,
+                "role": "parent" if proc.pid == parent.pid else "worker",
+                "rss_mb": round(mem.rss / 1e6, 1),
+                "pss_mb": round(mem.pss / 1e6, 1),
+                "uss_mb": round(mem.uss / 1e6, 1),
+            }
+        )
+    return rows
+
+
+def server_command(mode: str, workers: int, port: int) -> list:
+    if mode == "prefork":
+        return [
+            sys.executable,
+            "serve.py",
+            "--port",
+            str(port),
+            "--workers",
+            str(workers),
+            "--log-level",
+            "warning",
+        ]
+    return [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        "main:app",
+        "--port",
+        str(port),
+        "--workers",
+        str(workers),
+        "--log-level",
+        "warning",
+    ]
+
+
+def run_config(workers: int, mode: str, args, texts) -> dict:
+    cores = os.cpu_count() or 1
+    env = {
+        **os.environ,
+        "INTERNAL_SERVICE_SECRET": SECRET,
+        "INFERENCE_THREADS": str(max(1, cores // workers)),
+        "PREDICTION_CACHE_URL": "off",
+        "CASCADE_MODE": "off",
+    }
+
+    def request(i: int):
+        return "/classify", {"title": "", "description": texts[i % len(texts)]}
+
+    command = server_command(mode, workers, args.port)
+    with running_server(command, env, args.port, args.ready_timeout) as (
+        base_url,
+        proc,
+    ):
+        drive_load(
+            base_url,
+            SECRET,
+            request,
+            args.concurrency or 2 * workers,
+            min(3.0, args.duration),
+        )  # warm every worker
+        load = drive_load(
+            base_url, SECRET, request, args.concurrency or 4 * workers, args.duration
+        )
+        memory = process_memory(psutil.Process(proc.pid))
+
+    serving = [
+        m for m in memory if m["role"] == "worker"
+    ] or memory  # 1-worker uvicorn serves in the parent
+    result = {
+        "mode": mode,
+        "workers": workers,
+        "inference_threads": int(env["INFERENCE_THREADS"]),
+        **load,
+        "processes": memory,
+        "total_pss_mb": round(sum(m["pss_mb"] for m in memory), 1),
+        "worker_uss_mb": round(sum(m["uss_mb"] for m in serving) / len(serving), 1),
+    }
+    print(
+        f"{mode:8s} workers={workers} rps={result['rps']:8.1f} p95={result['p95_ms']:7.1f}ms "
+        f"total_pss={result['total_pss_mb']:8.1f}MB uss/worker={result['worker_uss_mb']:7.1f}MB "
+        f"errors={result['errors']}"
+    )
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--workers", default="1,2,4", help="Comma-separated worker counts"
+    )
+    parser.add_argument(
+        "--modes", default="uvicorn,prefork", help="Serving modes to compare"
+    )
+    parser.add_argument("--data", default=str(ROOT / "data" / "incidents_labeled.csv"))
+    parser.add_argument(
+        "--duration", type=float, default=20.0, help="Seconds of load per configuration"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=0,
+        help="Client threads (default 4 x workers)",
+    )
+    parser.add_argument("--port", type=int, default=8011)
+    parser.add_argument("--ready-timeout", type=float, default=300.0)
+    parser.add_argument("--out", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    texts = pd.read_csv(args.data)["text"].astype(str).tolist()
+    results = []
+    for workers in [int(n) for n in args.workers.split(",")]:
+        for mode in args.modes.split(","):
+            results.append(run_config(workers, mode, args, texts))
+
+    for mode in {r["mode"] for r in results}:
+        rows = [r for r in results if r["mode"] == mode]
+        base = next((r for r in rows if r["workers"] == 1), None)
+        for r in rows:
+            r["speedup_vs_1"] = (
+                round(r["rps"] / base["rps"], 2) if base and base["rps"] else None
+            )
+
+    report = {
+        "cpu_count": os.cpu_count(),
+        "duration_s": args.duration,
+        "results": results,
+    }
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, indent=2))
+        print(f"Wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
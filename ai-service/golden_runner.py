@@ -0,0 +1,302 @@
+"""
+Golden-set regression gate for the incident classifier.
+
+Merges every data/golden_*.csv and classifies each case through /classify,
+either against a running service (--url) or in-process against main.app
+(--in-process; loads the model itself, no server needed). Requests go out
+concurrently over one pooled HTTP client. Gold labels get the keyword aliases
+(POLICE -> CRIME). Rows without a lang column are tagged from their script:
+Ethiopic only -> am, Latin only -> en, both -> mix.
+
+The run fails (exit status 1) when accuracy for any language is below its
+threshold, or when latency regresses: overall p95 above --max_p95_ms, or any
+language's p95 more than --max_latency_regression above the --baseline
+report. Per-case latency, prediction and confidence are kept in the report
+written by --save_report, which can serve as the next run's baseline.
+Latencies include queueing behind the other in-flight cases, so compare runs
+made with the same --concurrency.
+
+Usage (from ai-service/):
+  python golden_runner.py --url http://localhost:8001
+  python golden_runner.py --in-process --min_accuracy 0.9 --min_accuracy_lang am=0.85 --save_report golden_report.json
+  python golden_runner.py --in-process --baseline golden_report.json
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import re
+import secrets
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+DATA_DIR = Path(__file__).parent / "data"
+LABEL_ALIASES = {"POLICE": "CRIME"}
+ETHIOPIC = re.compile("[\u1200-\u139f\u2d80-\u2ddf]")
+LATIN = re.compile(r"[A-Za-z]")
+
+
+def infer_lang(text: str) -> str:
+    ethiopic, latin = bool(ETHIOPIC.search(text)), bool(LATIN.search(text))
+    if ethiopic and latin:
+        return "mix"
+    return "am" if ethiopic else "en"
+
+
+def load_cases(data_dir: Path) -> list:
+    cases = []
+    for path in sorted(data_dir.glob("golden_*.csv")):
+        with path.open(encoding="utf-8-sig", newline="") as f:
+            for row in csv.DictReader(f):
+                cases.append(
+                    {
+                        "source": path.name,
+                        "id": row.get("id"),
+                        "text": row["text"],
+                        "expected": LABEL_ALIASES.get(row["category"], row["category"]),
+                        "lang": row.get("lang") or infer_lang(row["text"]),
+                    }
+                )
+    return cases
+
+
+async def classify_all(
+    client: httpx.AsyncClient, cases: list, concurrency: int
+) -> list:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(case: dict) -> dict:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                res = await client.post(
+                    "/classify", json={"title": "", "description": case["text"]}
+                )
+                error = (
+                    None
+                    if res.status_code == 200
+                    else f"HTTP {res.status_code}: {res.text[:200]}"
+                )
+                data = res.json() if res.status_code == 200 else {}
+            except httpx.HTTPError as e:
+                error, data = f"{type(e).__name__}: {e}", {}
+            latency_ms = (time.perf_counter() - started) * 1000.0
+        predicted = data.get("predicted_category")
+        return {
+            **case,
+            "predicted": LABEL_ALIASES.get(predicted, predicted),
+            "confidence": data.get("confidence"),
+            "model_version": data.get("model_version"),
+            "latency_ms": round(latency_ms, 2),
+            "correct": error is None
+            and LABEL_ALIASES.get(predicted, predicted) == case["expected"],
+            "error": error,
+        }
+
+    return await asyncio.gather(*(one(case) for case in cases))
+
+
+def summarize(results: list) -> dict:
+    latencies = [r["latency_ms"] for r in results]
+    correct = sum(r["correct"] for r in results)
+    return {
+        "total": len(results),
+        "correct": correct,
+        "errors": sum(r["error"] is not None for r in results),
+        "accuracy": round(correct / len(results), 4) if results else None,
+        "p50_ms": round(float(np.percentile(latencies, 50)), 2) if latencies else None,
+        "p95_ms": round(float(np.percentile(latencies, 95)), 2) if latencies else None,
+        "max_ms": round(max(latencies), 2) if latencies else None,
+    }
+
+
+def check(report: dict, args, baseline: dict = None) -> list:
+    """Gate failures as human-readable strings."""
+    failures = []
+    for lang, summary in report["per_language"].items():
+        threshold = args.min_accuracy_lang.get(lang, args.min_accuracy)
+        summary["min_accuracy"] = threshold
+        if summary["accuracy"] < threshold:
+            failures.append(
+                f"{lang}: accuracy {summary['accuracy']:.2%} < {threshold:.2%}"
+            )
+    overall_p95 = report["overall"]["p95_ms"]
+    if args.max_p95_ms and overall_p95 > args.max_p95_ms:
+        failures.append(f"overall p95 {overall_p95:.1f}ms > {args.max_p95_ms:.1f}ms")
+    if baseline:
+        for lang, summary in report["per_language"].items():
+            before = baseline.get("per_language", {}).get(lang, {}).get("p95_ms")
+            if before and summary["p95_ms"] > before * (
+                1 + args.max_latency_regression
+            ):
+                failures.append(
+                    f"{lang}: p95 {summary['p95_ms']:.1f}ms vs baseline {before:.1f}ms "
+                    f"(> +{args.max_latency_regression:.0%})"
+                )
+    return failures
+
+
+def thresholds(value: str) -> dict:
+    out = {}
+    for item in filter(None, value.split(",")):
+        lang, _, threshold = item.partition("=")
+        out[lang.strip()] = float(threshold)
+    return out
+
+
+async def run(args) -> list:
+    headers = {}
+    secret = os.getenv("INTERNAL_SERVICE_SECRET")
+    if secret:
+        headers["Authorization"] = f"Bearer {secret}"
+    limits = httpx.Limits(
+        max_connections=args.concurrency, max_keepalive_connections=args.concurrency
+    )
+    cases = load_cases(args.data_dir)
+    if not cases:
+        raise SystemExit(f"No golden_*.csv files in {args.data_dir}")
+
+    if args.in_process:
+        import main
+
+        main.initialize_model()
+        if not main.model_ready.is_set():
+            raise SystemExit(f"Model failed to load: {main.model_load_error}")
+        # Auth is still enforced in-process; any secret works when none is configured
+        main.INTERNAL_SERVICE_SECRET = (
+            main.INTERNAL_SERVICE_SECRET or secrets.token_hex(16)
+        )
+        headers["Authorization"] = f"Bearer {main.INTERNAL_SERVICE_SECRET}"
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://golden", headers=headers
+        ) as client:
+            return await classify_all(client, cases, args.concurrency)
+
+    async with httpx.AsyncClient(
+        base_url=args.url, headers=headers, limits=limits, timeout=args.timeout
+    ) as client:
+        deadline = time.time() + args.ready_timeout
+        while True:
+            try:
+                if (await client.get("/ready")).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            if time.time() > deadline:
+                raise SystemExit(
+                    f"{args.url} not ready after {args.ready_timeout:.0f}s"
+                )
+            await asyncio.sleep(1)
+        return await classify_all(client, cases, args.concurrency)
+
+
+def main_cli():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:8001")
+    parser.add_argument(
+        "--in-process",
+        action="store_true",
+        help="Run against main.app without a server",
+    )
+    parser.add_argument("--data_dir", type=Path, default=DATA_DIR)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--timeout", type=float, default=30.0, help="Per-request timeout (seconds)"
+    )
+    parser.add_argument("--ready_timeout", type=float, default=120.0)
+    parser.add_argument(
+        "--min_accuracy",
+        type=float,
+        default=float(os.getenv("GOLDEN_MIN_ACCURACY", "0.9")),
+        help="Per-language accuracy floor (default $GOLDEN_MIN_ACCURACY or 0.9)",
+    )
+    parser.add_argument(
+        "--min_accuracy_lang",
+        type=thresholds,
+        default=thresholds(os.getenv("GOLDEN_MIN_ACCURACY_LANG", "")),
+        help="Per-language overrides, e.g. am=0.85,mix=0.8",
+    )
+    parser.add_argument(
+        "--max_p95_ms",
+        type=float,
+        default=0.0,
+        help="Fail above this overall p95 (0 = off)",
+    )
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        help="Earlier --save_report output to compare latency against",
+    )
+    parser.add_argument(
+        "--max_latency_regression",
+        type=float,
+        default=0.5,
+        help="Allowed relative p95 increase",
+    )
+    parser.add_argument(
+        "--save_report",
+        type=Path,
+        help="Write the report (with per-case results) as JSON",
+    )
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    by_lang = {}
+    for r in results:
+        by_lang.setdefault(r["lang"], []).append(r)
+    report = {
+        "target": "in-process" if args.in_process else args.url,
+        "concurrency": args.concurrency,
+        "model_versions": sorted(
+            {r["model_version"] for r in results if r["model_version"]}
+        ),
+        "overall": summarize(results),
+        "per_language": {
+            lang: summarize(rows) for lang, rows in sorted(by_lang.items())
+        },
+        "cases": results,
+    }
+    baseline = (
+        json.loads(args.baseline.read_text(encoding="utf-8")) if args.baseline else None
+    )
+    failures = check(report, args, baseline)
+    report["failures"] = failures
+
+    print(
+        f"Golden regression against {report['target']}: {len(results)} cases, model {report['model_versions']}"
+    )
+    for lang, s in [("overall", report["overall"])] + list(
+        report["per_language"].items()
+    ):
+        print(
+            f"  {lang:8s} {s['correct']:4d}/{s['total']:<4d} = {s['accuracy']:7.2%}  "
+            f"p50={s['p50_ms']:7.1f}ms p95={s['p95_ms']:7.1f}ms max={s['max_ms']:7.1f}ms"
+        )
+    misses = [r for r in results if not r["correct"]]
+    if misses:
+        print("Mismatches:")
+        for r in misses:
+            got = r["error"] or f"{r['predicted']} (conf={r['confidence']})"
+            print(
+                f"  {r['source']} id={r['id']} [{r['lang']}]: expected {r['expected']}, got {got}"
+            )
+    if args.save_report:
+        args.save_report.write_text(
+            json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8"
+        )
+        print(f"Saved report to {args.save_report}")
+    if failures:
+        print("FAILED:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+    print("PASSED")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -1,26 +1,240 @@
 import os
+import asyncio
+import csv
+import functools
+import hashlib
 import json
-from pathlib import Path
-from typing import Optional
+import threading
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path, PurePosixPath
+from typing import List, Optional, Tuple
 
-import torch
+import numpy as np
 from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel
-from transformers import AutoModelForSequenceClassification, AutoTokenizer
+from starlette.concurrency import run_in_threadpool
+from transformers import AutoTokenizer
 
-from utils.severity import infer_severity
+from utils.batching import (
+    MicroBatcher,
+    QueueFull,
+    length_grouped_batches,
+    pad_sequences,
+)
+from utils.cache import cache_key, create_cache
+from utils.cascade import keyword_evidence
+from utils.backends import load_onnx_backend, load_torch_backend, softmax
+from utils.keyword_matcher import KeywordMatcher
+from utils.metrics import MetricsRegistry
+from utils.model_registry import ModelBundle, ModelRegistry
+from utils.severity import SEVERITY_GROUPS, infer_severity
+from utils.similarity_index import SimilarityIndex
+
+PROCESS_STARTED = time.perf_counter()
 
 # --- Configuration & Constants ---
 INTERNAL_SERVICE_SECRET = os.getenv("INTERNAL_SERVICE_SECRET")
-MODEL_DIR = Path(__file__).parent / "models" / "afroxlmr_incident_classifier"
+MODELS_ROOT = Path(__file__).parent / "models"
+MODEL_DIR = MODELS_ROOT / "afroxlmr_incident_classifier"
 DEFAULT_MODEL_NAME = "Davlan/afro-xlmr-base"
-METADATA_PATH = MODEL_DIR / "metadata.json"
 KEYWORDS_PATH = Path(__file__).parent / "data" / "keywords.json"
+GOLDEN_DIR = Path(__file__).parent / "data"
+MAX_LENGTH = 128
+# "dynamic" pads each length-grouped sub-batch to its longest input; "max_length"
+# pads everything to MAX_LENGTH (previous behaviour).
+PADDING_MODE = os.getenv("PADDING_MODE", "dynamic")
+PAD_MAX_BATCH_TOKENS = int(os.getenv("PAD_MAX_BATCH_TOKENS", "1024"))
+# Micro-batching: concurrent /classify calls are grouped for up to BATCH_MAX_WAIT_MS
+# or BATCH_MAX_SIZE items, whichever comes first. BATCH_MAX_SIZE=1 disables batching.
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "16"))
+BATCH_MAX_WAIT_MS = float(os.getenv("BATCH_MAX_WAIT_MS", "5"))
+INFERENCE_TIMEOUT_S = float(os.getenv("INFERENCE_TIMEOUT_S", "30"))
+# All forward passes run on the batcher's single inference thread. Once BATCH_MAX_QUEUE
+# items are waiting, new requests get 429 + Retry-After instead of queueing; a request
+# still waiting after INFERENCE_TIMEOUT_S gets 503. INFERENCE_THREADS sets the
+# intra-op threads of that one pass (torch / onnxruntime; 0 = runtime default, i.e.
+# all cores); with several uvicorn workers use cores / workers.
+BATCH_MAX_QUEUE = int(os.getenv("BATCH_MAX_QUEUE", "256"))
+INFERENCE_THREADS = int(os.getenv("INFERENCE_THREADS", "0"))
+OVERLOAD_RETRY_AFTER_S = 1
+# /classify/batch limits: items queued for the inference thread per round (each
+# forward pass is still at most BATCH_MAX_SIZE) and items per request
+CLASSIFY_BATCH_CHUNK_SIZE = int(os.getenv("CLASSIFY_BATCH_CHUNK_SIZE", "32"))
+CLASSIFY_BATCH_MAX_ITEMS = int(os.getenv("CLASSIFY_BATCH_MAX_ITEMS", "1000"))
+# Prediction cache: memory:// (per worker), sqlite:///path (shared on one host),
+# redis://... (shared across hosts) or "off".
+PREDICTION_CACHE_URL = os.getenv("PREDICTION_CACHE_URL", "memory://")
+PREDICTION_CACHE_MAX_ENTRIES = int(os.getenv("PREDICTION_CACHE_MAX_ENTRIES", "10000"))
+PREDICTION_CACHE_TTL_S = float(os.getenv("PREDICTION_CACHE_TTL_S", "3600"))
+# INT8 serving: "none" (fp32) or "dynamic" (int8 Linear layers). With "dynamic" a
+# pre-quantized models/.../model_int8.pt is used when present, otherwise the fp32
+# weights are quantized at load time.
+QUANTIZATION = os.getenv("QUANTIZATION", "none")
+# Inference runtime: "torch" or "onnx" (needs model.onnx from training/export_onnx.py
+# and the onnxruntime package; torch is then not required at all).
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "torch")
+
+# Negation / safety phrases: highest priority, force OTHER.
+NEGATIONS = [
+    "no incident",
+    "no danger",
+    "no fire",
+    "false alarm",
+    "test only",
+    "አደጋ የለም",
+    "ምንም እሳት የለም",
+    "በስህተት",
+    "ምንም አይጠበቅም",
+    "የለም",
+]
+# Used only when keywords.json is missing or empty.
+FALLBACK_KEYWORDS = {
+    "fire": ["fire", "smoke", "flame", "burn", "እሳት", "ጭስ"],
+    "medical": ["medical", "injury", "blood", "ambulance", "ሕክምና"],
+}
+NEGATION_GROUP = ("negation",)
+# keywords.json category names that differ from the model's label set
+KEYWORD_LABEL_ALIASES = {"POLICE": "CRIME"}
+# Heuristic-first cascade: when keyword evidence (utils.cascade) reaches
+# CASCADE_THRESHOLD the model is skipped. Calibrate with training/calibrate_cascade.py.
+CASCADE_MODE = os.getenv("CASCADE_MODE", "off")
+CASCADE_THRESHOLD = float(os.getenv("CASCADE_THRESHOLD", "0.85"))
+# Startup: weights load in a background thread so /live answers immediately; /ready
+# turns 200 once loading and warm-up are done. Warm-up runs one batch of
+# WARMUP_BATCH_SIZE rows at each token length in WARMUP_LENGTHS ("" disables).
+WARMUP_LENGTHS = [
+    int(n) for n in os.getenv("WARMUP_LENGTHS", "16,64,128").split(",") if n.strip()
+]
+WARMUP_BATCH_SIZE = int(os.getenv("WARMUP_BATCH_SIZE", "4"))
+NOT_READY_RETRY_AFTER_S = 5
+# Hot-swap: POST /admin/reload loads a model directory under models/ next to the
+# running one, checks it on data/golden_*.csv and swaps it in if accuracy reaches
+# RELOAD_MIN_GOLDEN_ACCURACY. Disabled unless ADMIN_SECRET is set. Each worker
+# process holds its own model, so the swap only reaches the worker that answers.
+ADMIN_SECRET = os.getenv("ADMIN_SECRET")
+RELOAD_MIN_GOLDEN_ACCURACY = float(os.getenv("RELOAD_MIN_GOLDEN_ACCURACY", "0.7"))
+
+# Similar incidents: with SIMILAR_INCIDENTS=on, /classify embeds the text in the
+# same forward pass, returns up to SIMILAR_TOP_K incidents from the last
+# SIMILAR_WINDOW_S seconds with cosine similarity >= SIMILAR_MIN_SCORE, then adds
+# the request's incident_id to the index. The index lives in this process; a
+# background thread saves it to SIMILAR_INDEX_PATH every SIMILAR_INDEX_SAVE_S
+# seconds, and it is saved once more on shutdown.
+SIMILAR_INCIDENTS = os.getenv("SIMILAR_INCIDENTS", "off")
+SIMILAR_TOP_K = int(os.getenv("SIMILAR_TOP_K", "5"))
+SIMILAR_MIN_SCORE = float(os.getenv("SIMILAR_MIN_SCORE", "0.85"))
+SIMILAR_WINDOW_S = float(os.getenv("SIMILAR_WINDOW_S", "21600"))
+SIMILAR_INDEX_PATH = Path(
+    os.getenv(
+        "SIMILAR_INDEX_PATH",
+        str(Path(__file__).parent / ".cache" / "similar_incidents.npz"),
+    )
+)
+SIMILAR_INDEX_SAVE_S = float(os.getenv("SIMILAR_INDEX_SAVE_S", "60"))
+SIMILAR_INDEX_NPROBE = int(os.getenv("SIMILAR_INDEX_NPROBE", "8"))
 
 # --- Globals ---
-model_metadata = None
 KEYWORDS = {}
+keyword_matcher = None
+registry = ModelRegistry()
+model_ready = threading.Event()
+reload_lock = threading.Lock()
+model_load_error: Optional[str] = None
+startup_timings: dict = {}
+similar_index: Optional[SimilarityIndex] = None
+similar_index_save_lock = threading.Lock()
+similar_index_stop = threading.Event()
+
+# --- Metrics (scraped from /metrics) ---
+LATENCY_BUCKETS_S = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+)
+TOKEN_BUCKETS = (8, 16, 24, 32, 48, 64, 96, 128)
+metrics = MetricsRegistry()
+REQUEST_SECONDS = metrics.histogram(
+    "ai_request_seconds",
+    "End-to-end handler time per request.",
+    LATENCY_BUCKETS_S,
+    labels=("endpoint",),
+)
+STAGE_SECONDS = metrics.histogram(
+    "ai_stage_seconds",
+    "Time per pipeline stage; tokenize/forward/postprocess are per model batch, heuristic/cascade per item.",
+    LATENCY_BUCKETS_S,
+    labels=("stage",),
+)
+TOKENIZE_SECONDS = STAGE_SECONDS.labels("tokenize")
+FORWARD_SECONDS = STAGE_SECONDS.labels("forward")
+POSTPROCESS_SECONDS = STAGE_SECONDS.labels("postprocess")
+HEURISTIC_SECONDS = STAGE_SECONDS.labels("heuristic")
+CASCADE_SECONDS = STAGE_SECONDS.labels("cascade")
+SIMILAR_SECONDS = STAGE_SECONDS.labels("similar")
+INPUT_TOKENS = metrics.histogram(
+    "ai_input_tokens", "Tokens per model input after truncation.", TOKEN_BUCKETS
+).labels()
+CLASSIFICATIONS = metrics.counter(
+    "ai_classifications_total",
+    "Classification results by category, answer path (model, cache, cascade, empty, error-fallback) and model.",
+    labels=("category", "path", "model_version"),
+)
+MODEL_FALLBACKS = metrics.counter(
+    "ai_model_fallbacks_total",
+    "Model outputs replaced by the keyword heuristic (heuristic = base model, LABEL_ = unmapped label).",
+    labels=("path", "model_version"),
+)
+metrics.callback(
+    "ai_model_info",
+    "Model version currently served.",
+    lambda: {(registry.active.version,): 1} if registry.active else None,
+    labels=("model_version",),
+)
+metrics.callback(
+    "ai_model_ready",
+    "1 once the model is loaded and warmed up.",
+    lambda: int(model_ready.is_set()),
+)
+metrics.callback(
+    "ai_inference_queue_depth",
+    "Items waiting for the inference thread.",
+    lambda: batcher.stats()["queue_depth"],
+)
+metrics.callback(
+    "ai_inference_rejected_total",
+    "Requests refused with 429 because the inference queue was full.",
+    lambda: batcher.rejected,
+    kind="counter",
+)
+metrics.callback(
+    "ai_similar_index_vectors",
+    "Incidents in the similar-incident index.",
+    lambda: len(similar_index) if similar_index is not None else None,
+)
+metrics.callback(
+    "ai_prediction_cache_requests_total",
+    "Prediction cache lookups by result.",
+    lambda: (
+        {("hit",): prediction_cache.hits, ("miss",): prediction_cache.misses}
+        if prediction_cache
+        else None
+    ),
+    labels=("result",),
+    kind="counter",
+)
 
 # --- Helper Functions ---
 
@@ -35,76 +249,466 @@ def load_keywords():
             print(f"Failed to load keywords: {e}")
     else:
         print(f"Keywords file not found at {KEYWORDS_PATH}")
+    build_keyword_matcher()
+
+
+def build_keyword_matcher():
+    """Compile negations, category keywords and severity keywords into one automaton."""
+    global keyword_matcher
+    groups = {NEGATION_GROUP: NEGATIONS}
+    for category, words in (KEYWORDS or FALLBACK_KEYWORDS).items():
+        groups[("category", category)] = words
+    groups.update(SEVERITY_GROUPS)
+    keyword_matcher = KeywordMatcher(groups)
+    return keyword_matcher
+
+
+def keyword_hits(text: str):
+    """Every negation, category and severity keyword group found in `text` (one pass)."""
+    return keyword_matcher.groups((text or "").lower())
 
 
-def load_model():
+def model_fingerprint(model_dir: Path) -> str:
+    """Cheap identity of the weights on disk (names, sizes, mtimes), stable across workers."""
+    digest = hashlib.sha256()
+    for path in sorted(model_dir.iterdir()):
+        if path.is_file():
+            stat = path.stat()
+            digest.update(f"{path.name}:{stat.st_size}:{int(stat.st_mtime)};".encode())
+    return digest.hexdigest()[:16]
+
+
+def load_model(model_dir: Path = MODEL_DIR) -> ModelBundle:
     """
     Load a local fine-tuned model if present; otherwise fall back to the base model
     so the service keeps running even without weights.
     """
     version = None
-    global model_metadata
+    metadata = None
+    fingerprint = ""
     model_path = DEFAULT_MODEL_NAME
 
-    if MODEL_DIR.exists() and (MODEL_DIR / "config.json").exists():
-        model_path = MODEL_DIR
+    if model_dir.exists() and (model_dir / "config.json").exists():
+        model_path = model_dir
         print(f"Loading local model from {model_path}")
-        if METADATA_PATH.exists():
+        metadata_path = model_dir / "metadata.json"
+        if metadata_path.exists():
             try:
-                model_metadata = json.loads(METADATA_PATH.read_text(encoding="utf-8"))
-                version = model_metadata.get("version_tag")
+                metadata = json.loads(metadata_path.read_text(encoding="utf-8"))
+                version = metadata.get("version_tag")
             except Exception:
                 version = None
-                model_metadata = None
+                metadata = None
+        fingerprint = model_fingerprint(model_dir)
     else:
         print(f"Loading default base model {model_path}")
 
     tokenizer = AutoTokenizer.from_pretrained(str(model_path))
-    model = AutoModelForSequenceClassification.from_pretrained(str(model_path))
-    model.eval()
-    return tokenizer, model, version or str(model_path)
+    version = version or str(model_path)
+
+    if INFERENCE_BACKEND == "onnx":
+        backend = load_onnx_backend(model_dir, threads=INFERENCE_THREADS)
+        version = f"{version}-onnx"
+    else:
+        backend = load_torch_backend(
+            model_path, quantization=QUANTIZATION, threads=INFERENCE_THREADS
+        )
+        if QUANTIZATION == "dynamic":
+            version = f"{version}-int8"
+    return ModelBundle(
+        tokenizer,
+        backend,
+        version,
+        metadata,
+        source=str(model_path),
+        fingerprint=fingerprint,
+    )
 
 
-def heuristic_category(text: str) -> str:
-    t = text.lower()
+def heuristic_category(text: str, hits=None) -> str:
+    if hits is None:
+        hits = keyword_hits(text)
 
     # Negation / Safety Check (Highest Priority for OTHER)
-    negations = [
-        "no incident",
-        "no danger",
-        "no fire",
-        "false alarm",
-        "test only",
-        "አደጋ የለም",
-        "ምንም እሳት የለም",
-        "በስህተት",
-        "ምንም አይጠበቅም",
-        "የለም",
-    ]
-    if any(n in t for n in negations):
+    if NEGATION_GROUP in hits:
         return "OTHER"
 
-    # Dynamic keyword lookup
-    for category, words in KEYWORDS.items():
-        if any(w in t for w in words):
+    # Keyword lookup in keywords.json order (first matching category wins),
+    # falling back to the hardcoded lists if JSON is missing or empty
+    for category in KEYWORDS or FALLBACK_KEYWORDS:
+        if ("category", category) in hits:
             return category.upper()
 
-    # Fallback to hardcoded if JSON missing or empty
-    if not KEYWORDS:
-        if any(w in t for w in ["fire", "smoke", "flame", "burn", "እሳት", "ጭስ"]):
-            return "FIRE"
-        if any(w in t for w in ["medical", "injury", "blood", "ambulance", "ሕክምና"]):
-            return "MEDICAL"
-
     return "OTHER"
 
 
+def cascade_evidence(text: str) -> Tuple[Optional[str], float]:
+    """Stage-1 keyword evidence for `text`: (model label or None, score in [0, 1])."""
+    counts = keyword_matcher.counts((text or "").lower())
+    category_counts = {
+        c: counts.get(("category", c), 0) for c in KEYWORDS or FALLBACK_KEYWORDS
+    }
+    label, score = keyword_evidence(category_counts, NEGATION_GROUP in counts)
+    if label is None:
+        return None, 0.0
+    return KEYWORD_LABEL_ALIASES.get(label, label), score
+
+
+def cascade_prediction(text: str) -> Optional[Tuple[str, float]]:
+    """Return a keyword-only prediction when the cascade is on and evidence clears the threshold."""
+    if CASCADE_MODE != "on":
+        return None
+    with CASCADE_SECONDS.time():
+        label, score = cascade_evidence(text)
+    if label is None or score < CASCADE_THRESHOLD:
+        return None
+    return label, score
+
+
+def _forward(bundle: ModelBundle, texts: List[str], with_embeddings: bool = False):
+    """Return logits for `texts`, in input order (and their sentence embeddings with `with_embeddings`)."""
+    tokenizer, backend = bundle.tokenizer, bundle.backend
+    run = backend.logits_and_embeddings if with_embeddings else backend.logits
+    if PADDING_MODE == "max_length":
+        with TOKENIZE_SECONDS.time():
+            inputs = tokenizer(
+                texts,
+                return_tensors="np",
+                truncation=True,
+                padding="max_length",
+                max_length=MAX_LENGTH,
+            )
+        for length in inputs["attention_mask"].sum(axis=1):
+            INPUT_TOKENS.observe(int(length))
+        with FORWARD_SECONDS.time():
+            return run(inputs["input_ids"], inputs["attention_mask"])
+
+    with TOKENIZE_SECONDS.time():
+        encoded = tokenizer(texts, truncation=True, max_length=MAX_LENGTH)
+    lengths = [len(ids) for ids in encoded["input_ids"]]
+    for length in lengths:
+        INPUT_TOKENS.observe(length)
+    with FORWARD_SECONDS.time():
+        logits = np.zeros((len(texts), backend.config.num_labels), dtype=np.float32)
+        embeddings = None
+        for idx in length_grouped_batches(
+            lengths, batch_size=len(texts), max_tokens=PAD_MAX_BATCH_TOKENS
+        ):
+            input_ids, attention_mask = pad_sequences(
+                [encoded["input_ids"][i] for i in idx], tokenizer.pad_token_id
+            )
+            if not with_embeddings:
+                logits[idx] = run(input_ids, attention_mask)
+                continue
+            logits[idx], pooled = run(input_ids, attention_mask)
+            if embeddings is None:
+                embeddings = np.zeros((len(texts), pooled.shape[1]), dtype=np.float32)
+            embeddings[idx] = pooled
+    return (logits, embeddings) if with_embeddings else logits
+
+
+def _labels(
+    bundle: ModelBundle, texts: List[str], logits: np.ndarray
+) -> List[Tuple[str, float]]:
+    """(label, confidence) per row of `logits`, with the keyword fallbacks applied."""
+    started = time.perf_counter()
+    heuristic_s = 0.0
+    probs = softmax(logits)
+    results = []
+    for text, row in zip(texts, probs):
+        pred_id = int(row.argmax())
+
+        # Logic for base model or low confidence
+        fallback = None
+        if "afro-xlmr-base" in str(bundle.version) and not MODEL_DIR.exists():
+            fallback = "heuristic"
+            confidence = 0.5
+        else:
+            pred_label = bundle.backend.config.id2label.get(pred_id, "OTHER")
+            confidence = float(row[pred_id])
+
+            if pred_label.startswith("LABEL_"):
+                fallback = "LABEL_"
+        if fallback:
+            heuristic_started = time.perf_counter()
+            pred_label = heuristic_category(text)
+            elapsed = time.perf_counter() - heuristic_started
+            HEURISTIC_SECONDS.observe(elapsed)
+            heuristic_s += elapsed
+            MODEL_FALLBACKS.inc(fallback, bundle.version)
+        results.append((pred_label, confidence))
+    POSTPROCESS_SECONDS.observe(time.perf_counter() - started - heuristic_s)
+    return results
+
+
+def predict_batch(
+    texts: List[str], bundle: Optional[ModelBundle] = None
+) -> List[Tuple[str, float]]:
+    """Run batched inference over `texts` and return (label, confidence) per item."""
+    bundle = bundle or registry.active
+    return _labels(bundle, texts, _forward(bundle, texts))
+
+
+def predict_with_embeddings(
+    texts: List[str], bundle: Optional[ModelBundle] = None
+) -> List[Tuple[str, float, np.ndarray]]:
+    """predict_batch plus a unit-length sentence embedding per item, from the same forward pass."""
+    bundle = bundle or registry.active
+    logits, embeddings = _forward(bundle, texts, with_embeddings=True)
+    return [
+        (label, confidence, emb)
+        for (label, confidence), emb in zip(_labels(bundle, texts, logits), embeddings)
+    ]
+
+
+def predict_items(items: List[Tuple[ModelBundle, str, bool]]) -> List[tuple]:
+    """
+    MicroBatcher handler: items are (bundle, text, with_embeddings). Texts leased on
+    different versions run separately, as do texts that need an embedding.
+    """
+    results: List[Optional[tuple]] = [None] * len(items)
+    groups = {}
+    for i, (bundle, _, with_embeddings) in enumerate(items):
+        groups.setdefault((id(bundle), with_embeddings), (bundle, with_embeddings, []))[
+            2
+        ].append(i)
+    for bundle, with_embeddings, idx in groups.values():
+        predict = predict_with_embeddings if with_embeddings else predict_batch
+        for i, pred in zip(idx, predict([items[i][1] for i in idx], bundle)):
+            results[i] = pred
+    return results
+
+
+def cache_namespace(bundle: ModelBundle) -> str:
+    """Model identity for cache keys; changes whenever different weights are loaded."""
+    trained_at = (bundle.metadata or {}).get("trained_at", "")
+    return f"{bundle.version}:{trained_at}:{bundle.fingerprint}"
+
+
+def cached_prediction(text: str, bundle: ModelBundle) -> Optional[Tuple[str, float]]:
+    """Cached (label, confidence) for `text`; a failing cache counts as a miss."""
+    if prediction_cache is None:
+        return None
+    try:
+        hit = prediction_cache.get(cache_key(text, cache_namespace(bundle)))
+        return (hit[0], float(hit[1])) if hit else None
+    except Exception as e:
+        print(f"Prediction cache read failed: {e}")
+        return None
+
+
+def store_prediction(text: str, pred: Tuple[str, float], bundle: ModelBundle) -> None:
+    """Best effort: a failing cache must not turn a model prediction into an error."""
+    if prediction_cache is None:
+        return
+    try:
+        prediction_cache.set(
+            cache_key(text, cache_namespace(bundle)), [pred[0], pred[1]]
+        )
+    except Exception as e:
+        print(f"Prediction cache write failed: {e}")
+
+
+def warm_up(bundle: ModelBundle):
+    """Run forward passes at representative lengths so real requests don't pay for lazy kernel init."""
+    tokenizer = bundle.tokenizer
+    tokenizer("warm-up", truncation=True, max_length=MAX_LENGTH)
+    filler = tokenizer.convert_tokens_to_ids(tokenizer.tokenize("fire")[:1])[0]
+    for length in WARMUP_LENGTHS:
+        length = max(2, min(length, MAX_LENGTH))
+        row = (
+            [tokenizer.cls_token_id]
+            + [filler] * (length - 2)
+            + [tokenizer.sep_token_id]
+        )
+        input_ids, attention_mask = pad_sequences(
+            [row] * max(1, WARMUP_BATCH_SIZE), tokenizer.pad_token_id
+        )
+        bundle.backend.logits(input_ids, attention_mask)
+
+
+def load_golden_rows() -> List[dict]:
+    rows = []
+    for path in sorted(GOLDEN_DIR.glob("golden_*.csv")):
+        with path.open(encoding="utf-8") as f:
+            rows.extend(csv.DictReader(f))
+    return rows
+
+
+def golden_smoke_check(bundle: ModelBundle) -> dict:
+    """Model-only accuracy of `bundle` on data/golden_*.csv (keyword aliases applied to gold labels)."""
+    rows = load_golden_rows()
+    if not rows:
+        return {"total": 0, "correct": 0, "accuracy": None, "mismatches": []}
+    preds = predict_batch([row["text"] for row in rows], bundle)
+    mismatches = []
+    for row, (label, confidence) in zip(rows, preds):
+        gold = KEYWORD_LABEL_ALIASES.get(row["category"], row["category"])
+        if KEYWORD_LABEL_ALIASES.get(label, label) != gold:
+            mismatches.append(
+                {"id": row.get("id"), "expected": gold, "predicted": label}
+            )
+    correct = len(rows) - len(mismatches)
+    return {
+        "total": len(rows),
+        "correct": correct,
+        "accuracy": round(correct / len(rows), 4),
+        "mismatches": mismatches,
+    }
+
+
+def initialize_model(warmup: bool = True):
+    """Load weights, warm up and mark the service ready. Blocking; see start_model_loading()."""
+    global model_load_error, similar_index
+    started = time.perf_counter()
+    try:
+        bundle = load_model()
+        startup_timings["load_s"] = round(time.perf_counter() - started, 3)
+        if warmup and WARMUP_LENGTHS:
+            warm_started = time.perf_counter()
+            warm_up(bundle)
+            startup_timings["warmup_s"] = round(time.perf_counter() - warm_started, 3)
+            print(
+                f"Warm-up at lengths {WARMUP_LENGTHS} took {startup_timings['warmup_s']:.2f}s"
+            )
+    except Exception as e:
+        model_load_error = str(e)
+        print(f"Model loading failed: {e}")
+        return
+    registry.activate(bundle)
+    similar_index = open_similar_index(bundle)
+    startup_timings["time_to_ready_s"] = round(time.perf_counter() - PROCESS_STARTED, 3)
+    model_ready.set()
+    print(
+        f"Model {bundle.version} ready; time-to-ready {startup_timings['time_to_ready_s']:.2f}s"
+    )
+
+
+def start_model_loading() -> threading.Thread:
+    thread = threading.Thread(target=initialize_model, name="model-loader", daemon=True)
+    thread.start()
+    return thread
+
+
+def require_ready():
+    if not model_ready.is_set():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Model failed to load" if model_load_error else "Model loading",
+            headers={"Retry-After": str(NOT_READY_RETRY_AFTER_S)},
+        )
+
+
+def create_prediction_cache():
+    return create_cache(
+        PREDICTION_CACHE_URL,
+        max_entries=PREDICTION_CACHE_MAX_ENTRIES,
+        ttl_seconds=PREDICTION_CACHE_TTL_S,
+    )
+
+
+def create_batcher() -> MicroBatcher:
+    return MicroBatcher(
+        predict_items,
+        max_batch_size=BATCH_MAX_SIZE,
+        max_wait_ms=BATCH_MAX_WAIT_MS,
+        max_queue=BATCH_MAX_QUEUE,
+        name="inference",
+    ).start()
+
+
+def open_similar_index(bundle: ModelBundle) -> Optional[SimilarityIndex]:
+    """
+    Similar-incident index for `bundle`'s embeddings, restored from
+    SIMILAR_INDEX_PATH when the saved one was built by the same weights.
+    """
+    if SIMILAR_INCIDENTS != "on":
+        return None
+    if not getattr(bundle.backend, "supports_embeddings", False):
+        print(
+            f"SIMILAR_INCIDENTS=on but the {bundle.backend.name} backend has no embeddings; lookup disabled"
+        )
+        return None
+    tag = cache_namespace(bundle)
+    if SIMILAR_INDEX_PATH.exists():
+        try:
+            index = SimilarityIndex.load(
+                SIMILAR_INDEX_PATH,
+                window_s=SIMILAR_WINDOW_S,
+                nprobe=SIMILAR_INDEX_NPROBE,
+            )
+            if index.tag == tag:
+                print(
+                    f"Restored {len(index)} similar-incident vectors from {SIMILAR_INDEX_PATH}"
+                )
+                return index
+            print(
+                f"{SIMILAR_INDEX_PATH} holds embeddings of another model; starting an empty index"
+            )
+        except Exception as e:
+            print(f"Could not restore the similar-incident index: {e}")
+    return SimilarityIndex(
+        bundle.backend.config.hidden_size,
+        window_s=SIMILAR_WINDOW_S,
+        nprobe=SIMILAR_INDEX_NPROBE,
+        tag=tag,
+    )
+
+
+def save_similar_index(wait: bool = False) -> None:
+    """Persist the index; one writer at a time, and skipped while a save runs unless `wait`."""
+    index = similar_index
+    if index is None or not similar_index_save_lock.acquire(blocking=wait):
+        return
+    try:
+        index.save(SIMILAR_INDEX_PATH)
+    except Exception as e:
+        print(f"Saving the similar-incident index failed: {e}")
+    finally:
+        similar_index_save_lock.release()
+
+
+def start_similar_index_saver() -> Optional[threading.Thread]:
+    """Save the index every SIMILAR_INDEX_SAVE_S seconds, off the request path."""
+    if SIMILAR_INCIDENTS != "on":
+        return None
+
+    def run():
+        while not similar_index_stop.wait(SIMILAR_INDEX_SAVE_S):
+            save_similar_index()
+
+    thread = threading.Thread(target=run, name="similar-index-saver", daemon=True)
+    thread.start()
+    return thread
+
+
+def similar_lookup_enabled(bundle: ModelBundle) -> bool:
+    # Requests still on a model that was swapped out must not mix their embeddings in
+    return similar_index is not None and similar_index.tag == cache_namespace(bundle)
+
+
 # --- Initialization ---
 load_keywords()
-tokenizer, model, model_version = load_model()
+prediction_cache = create_prediction_cache()
+batcher = create_batcher()
 
 # --- FastAPI App & Security ---
-app = FastAPI()
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # serve.py loads the model before forking workers; nothing left to do there
+    if not model_ready.is_set():
+        start_model_loading()
+    saver = start_similar_index_saver()
+    yield
+    similar_index_stop.set()
+    if saver is not None:
+        saver.join()
+    save_similar_index(wait=True)
+
+
+app = FastAPI(lifespan=lifespan)
 security = HTTPBearer()
 
 
@@ -122,10 +726,32 @@ def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
         )
 
 
+def verify_admin_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    if not ADMIN_SECRET:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin endpoints disabled: ADMIN_SECRET not set",
+        )
+    if credentials.credentials != ADMIN_SECRET:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication token",
+        )
+
+
 # --- Models ---
 class ClassifyRequest(BaseModel):
     title: str
     description: str
+    # Added to the similar-incident index (SIMILAR_INCIDENTS=on) so later reports can find it
+    incident_id: Optional[str] = None
+
+
+class SimilarIncident(BaseModel):
+    incident_id: str
+    similarity: float
+    category: str
+    age_s: float
 
 
 class ClassifyResponse(BaseModel):
@@ -134,77 +760,443 @@ class ClassifyResponse(BaseModel):
     confidence: float
     model_version: str
     summary: Optional[str] = None
+    # Only set when SIMILAR_INCIDENTS=on; most similar first
+    similar_incidents: Optional[List[SimilarIncident]] = None
+
+
+class EmbedRequest(BaseModel):
+    texts: List[str]
+
+
+class ReloadRequest(BaseModel):
+    # Directory under models/; defaults to the configured model directory
+    model_dir: Optional[str] = None
 
 
 # --- Routes ---
 
 
+@app.get("/live")
+def live():
+    """Liveness probe: the process is up and serving HTTP (model may still be loading)."""
+    return {"status": "alive"}
+
+
+@app.get("/ready")
+def ready():
+    """Readiness probe: 200 once the model is loaded and warmed up, 503 before that."""
+    if model_ready.is_set():
+        return {"status": "ready", "model": registry.active.version}
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"status": "failed" if model_load_error else "loading"},
+        headers={"Retry-After": str(NOT_READY_RETRY_AFTER_S)},
+    )
+
+
+@app.get(
+    "/metrics", dependencies=[Depends(verify_token)], response_class=PlainTextResponse
+)
+def metrics_endpoint():
+    """Prometheus text exposition of this worker's metrics."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/health", dependencies=[Depends(verify_token)])
 def health():
+    active = registry.active
     return {
-        "status": "AI service running",
-        "model": model_version,
-        "metadata": model_metadata or {},
+        "status": "AI service running"
+        if model_ready.is_set()
+        else "AI service starting",
+        "ready": model_ready.is_set(),
+        "startup": {**startup_timings, "error": model_load_error},
+        "model": active.version if active else None,
+        "metadata": (active.metadata if active else None) or {},
+        "model_loaded_at": active.loaded_at if active else None,
+        "retiring_models": [
+            {"model": b.version, "in_flight": b.in_flight} for b in registry.retiring
+        ],
+        "backend": active.backend.name if active else None,
+        "quantization": QUANTIZATION,
+        "batching": batcher.stats(),
+        "cache": prediction_cache.stats() if prediction_cache else None,
+        "similar_index": similar_index.stats() if similar_index is not None else None,
     }
 
 
+def request_text(req: ClassifyRequest) -> str:
+    return (req.title.strip() + " " + req.description.strip()).strip()
+
+
+def empty_response(bundle: ModelBundle) -> ClassifyResponse:
+    return ClassifyResponse(
+        predicted_category="OTHER",
+        severity_score=1,
+        confidence=0.0,
+        model_version=f"{bundle.version}-empty",
+        summary="Empty description",
+    )
+
+
+def error_response() -> ClassifyResponse:
+    return ClassifyResponse(
+        predicted_category="OTHER",
+        severity_score=2,
+        confidence=0.0,
+        model_version="error-fallback",
+        summary="Error processing request",
+    )
+
+
+async def run_cache(fn, *args):
+    """Call a cache helper, moving it off the event loop when the cache backend does I/O."""
+    if prediction_cache is not None and prediction_cache.blocking:
+        return await run_in_threadpool(fn, *args)
+    return fn(*args)
+
+
+async def infer(
+    bundle: ModelBundle, texts: List[str], with_embeddings: bool = False
+) -> list:
+    """
+    Run `texts` on the inference thread without blocking the event loop.
+
+    Returns a (label, confidence) pair, or (label, confidence, embedding) with
+    `with_embeddings`, or the raised exception per text. Raises
+    429 when the inference queue is full and 503 when the wait exceeds
+    INFERENCE_TIMEOUT_S; both carry Retry-After so callers can back off.
+    """
+    futures = []
+    try:
+        for text in texts:
+            futures.append(batcher.submit((bundle, text, with_embeddings)))
+    except QueueFull:
+        for fut in futures:
+            fut.cancel()
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Inference queue full",
+            headers={"Retry-After": str(OVERLOAD_RETRY_AFTER_S)},
+        )
+    waiters = [asyncio.wrap_future(fut) for fut in futures]
+    try:
+        return await asyncio.wait_for(
+            asyncio.gather(*waiters, return_exceptions=True), INFERENCE_TIMEOUT_S
+        )
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Inference timed out",
+            headers={"Retry-After": str(OVERLOAD_RETRY_AFTER_S)},
+        )
+
+
+def find_similar(
+    embedding: np.ndarray, incident_id: Optional[str], category: str
+) -> List[SimilarIncident]:
+    """Recent incidents most similar to `embedding`, then index this one under `incident_id`."""
+    index = similar_index
+    now = time.time()
+    with SIMILAR_SECONDS.time():
+        hits = index.search(
+            embedding,
+            k=SIMILAR_TOP_K,
+            min_score=SIMILAR_MIN_SCORE,
+            exclude_id=incident_id,
+            now=now,
+        )
+        if incident_id:
+            index.add(incident_id, embedding, category, timestamp=now)
+    return [
+        SimilarIncident(
+            incident_id=hit["id"],
+            similarity=hit["score"],
+            category=hit["category"],
+            age_s=round(now - hit["timestamp"], 1),
+        )
+        for hit in hits
+    ]
+
+
+def counted(
+    response: ClassifyResponse, path: str, bundle: ModelBundle
+) -> ClassifyResponse:
+    CLASSIFICATIONS.inc(response.predicted_category, path, bundle.version)
+    return response
+
+
+def timed(histogram):
+    """Record the handler's total time in `histogram` (signature kept for FastAPI)."""
+
+    def decorate(handler):
+        @functools.wraps(handler)
+        async def wrapper(*args, **kwargs):
+            with histogram.time():
+                return await handler(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def build_response(
+    req: ClassifyRequest,
+    text: str,
+    pred_label: str,
+    confidence: float,
+    version: str,
+) -> ClassifyResponse:
+    severity = infer_severity(pred_label, text, hits=keyword_hits(text))
+    summary = req.title if req.title else text[:120]
+
+    return ClassifyResponse(
+        predicted_category=pred_label,
+        severity_score=severity,
+        confidence=confidence,
+        model_version=version,
+        summary=summary,
+    )
+
+
 @app.post(
     "/classify", response_model=ClassifyResponse, dependencies=[Depends(verify_token)]
 )
-def classify(req: ClassifyRequest):
-    try:
-        text = (req.title.strip() + " " + req.description.strip()).strip()
-        if not text:
-            return ClassifyResponse(
-                predicted_category="OTHER",
-                severity_score=1,
-                confidence=0.0,
-                model_version=f"{model_version}-empty",
-                summary="Empty description",
+@timed(REQUEST_SECONDS.labels("/classify"))
+async def classify(req: ClassifyRequest):
+    require_ready()
+    with registry.lease() as bundle:
+        try:
+            text = request_text(req)
+            if not text:
+                return counted(empty_response(bundle), "empty", bundle)
+
+            path, version = "cascade", f"{bundle.version}-cascade"
+            pred = cascade_prediction(text)
+            if pred is None:
+                path, version = "cache", bundle.version
+                pred = await run_cache(cached_prediction, text, bundle)
+
+            # Similar-incident lookup needs the embedding even when the label is already known
+            embedding = None
+            with_embeddings = similar_lookup_enabled(bundle)
+            if pred is None or with_embeddings:
+                result = (await infer(bundle, [text], with_embeddings))[0]
+                if isinstance(result, Exception):
+                    raise result
+                if pred is None:
+                    path, pred = "model", result[:2]
+                    await run_cache(store_prediction, text, pred, bundle)
+                if with_embeddings:
+                    embedding = result[2]
+
+            response = counted(
+                build_response(req, text, *pred, version=version), path, bundle
             )
+            if embedding is not None:
+                try:
+                    response.similar_incidents = await run_in_threadpool(
+                        find_similar,
+                        embedding,
+                        req.incident_id,
+                        response.predicted_category,
+                    )
+                except Exception as e:
+                    print(f"Similar-incident lookup failed: {e}")
+            return response
+        except HTTPException:
+            raise
+        except Exception as e:
+            print(f"Classification error: {e}")
+            return counted(error_response(), "error-fallback", bundle)
 
-        inputs = tokenizer(
-            text,
-            return_tensors="pt",
-            truncation=True,
-            padding="max_length",
-            max_length=128,
+
+@app.post(
+    "/classify/batch",
+    response_model=List[ClassifyResponse],
+    dependencies=[Depends(verify_token)],
+)
+@timed(REQUEST_SECONDS.labels("/classify/batch"))
+async def classify_batch(reqs: List[ClassifyRequest]):
+    """
+    Classify many incidents in one call (backfills, reclassification).
+
+    Items are queued for the inference thread in rounds of
+    CLASSIFY_BATCH_CHUNK_SIZE; the micro-batcher runs each round as forward passes
+    of at most BATCH_MAX_SIZE. Results come back in request order. Failures are isolated per item (the
+    batcher retries a failed micro-batch one item at a time), so only the
+    offending item gets the error-fallback response. Chunks go through the same bounded
+    inference queue as /classify, so an overloaded service answers 429/503.
+    """
+    require_ready()
+    if len(reqs) > CLASSIFY_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(reqs)} items (max {CLASSIFY_BATCH_MAX_ITEMS})",
         )
 
-        with torch.no_grad():
-            outputs = model(**inputs)
-            logits = outputs.logits
-            probs = torch.softmax(logits, dim=-1).cpu().numpy()[0]
+    with registry.lease() as bundle:
+        responses: List[Optional[ClassifyResponse]] = [None] * len(reqs)
+        pending = []
+        for i, req in enumerate(reqs):
+            try:
+                text = request_text(req)
+            except Exception as e:
+                print(f"Classification error (batch item {i}): {e}")
+                responses[i] = counted(error_response(), "error-fallback", bundle)
+                continue
+            if not text:
+                responses[i] = counted(empty_response(bundle), "empty", bundle)
+                continue
+            shortcut = cascade_prediction(text)
+            if shortcut is not None:
+                response = build_response(
+                    req, text, *shortcut, version=f"{bundle.version}-cascade"
+                )
+                responses[i] = counted(response, "cascade", bundle)
+                continue
+            hit = await run_cache(cached_prediction, text, bundle)
+            if hit is not None:
+                responses[i] = counted(
+                    build_response(req, text, *hit, version=bundle.version),
+                    "cache",
+                    bundle,
+                )
+            else:
+                pending.append((i, text))
 
-        pred_id = int(probs.argmax())
+        for start in range(0, len(pending), CLASSIFY_BATCH_CHUNK_SIZE):
+            chunk = pending[start : start + CLASSIFY_BATCH_CHUNK_SIZE]
+            # The batcher retries a failed micro-batch item by item, so an exception here is the item's own
+            preds = await infer(bundle, [text for _, text in chunk])
+            for (i, text), pred in zip(chunk, preds):
+                try:
+                    if isinstance(pred, Exception):
+                        raise pred
+                    await run_cache(store_prediction, text, pred, bundle)
+                    response = build_response(
+                        reqs[i], text, *pred, version=bundle.version
+                    )
+                    responses[i] = counted(response, "model", bundle)
+                except Exception as e:
+                    print(f"Classification error (batch item {i}): {e}")
+                    responses[i] = counted(error_response(), "error-fallback", bundle)
 
-        # Logic for base model or low confidence
-        if "afro-xlmr-base" in str(model_version) and not MODEL_DIR.exists():
-            pred_label = heuristic_category(text)
-            confidence = 0.5
-        else:
-            pred_label = model.config.id2label.get(pred_id, "OTHER")
-            confidence = float(probs[pred_id])
+    return responses
 
-            if pred_label.startswith("LABEL_"):
-                pred_label = heuristic_category(text)
 
-        severity = infer_severity(pred_label, text)
-        summary = req.title if req.title else text[:120]
+@app.post("/embed", dependencies=[Depends(verify_token)])
+@timed(REQUEST_SECONDS.labels("/embed"))
+async def embed(req: EmbedRequest):
+    """
+    Sentence embeddings from the served classifier's encoder: the last hidden
+    layer mean-pooled over tokens, unit length, so a dot product is the cosine
+    similarity. Runs through the same inference queue as /classify.
+    """
+    require_ready()
+    if len(req.texts) > CLASSIFY_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(req.texts)} items (max {CLASSIFY_BATCH_MAX_ITEMS})",
+        )
+    with registry.lease() as bundle:
+        if not getattr(bundle.backend, "supports_embeddings", False):
+            raise HTTPException(
+                status_code=status.HTTP_501_NOT_IMPLEMENTED,
+                detail=f"{bundle.backend.name} backend does not expose embeddings",
+            )
+        embeddings = []
+        for start in range(0, len(req.texts), CLASSIFY_BATCH_CHUNK_SIZE):
+            for result in await infer(
+                bundle, req.texts[start : start + CLASSIFY_BATCH_CHUNK_SIZE], True
+            ):
+                if isinstance(result, Exception):
+                    print(f"Embedding error: {result}")
+                    raise HTTPException(
+                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                        detail="Embedding failed",
+                    )
+                embeddings.append(result[2].tolist())
+        return {
+            "model_version": bundle.version,
+            "dim": len(embeddings[0]) if embeddings else 0,
+            "embeddings": embeddings,
+        }
+
 
-        return ClassifyResponse(
-            predicted_category=pred_label,
-            severity_score=severity,
-            confidence=confidence,
-            model_version=model_version,
-            summary=summary,
+@app.post("/admin/reload", dependencies=[Depends(verify_admin_token)])
+def admin_reload(req: Optional[ReloadRequest] = None):
+    """
+    Hot-swap the served model without downtime.
+
+    The new weights are loaded and warmed up next to the running model, then
+    checked on the golden smoke set. Only if accuracy reaches
+    RELOAD_MIN_GOLDEN_ACCURACY is the new version made active; requests already
+    in flight finish on the old version, whose memory is released once they drain.
+    The similar-incident index starts empty for the new weights.
+    """
+    global similar_index
+    require_ready()
+    # Checked on the path as given, not resolved: deployed model dirs are often symlinks out of models/
+    relative = PurePosixPath(req.model_dir) if req and req.model_dir else None
+    if relative is not None and (
+        relative.is_absolute() or ".." in relative.parts or "\\" in req.model_dir
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="model_dir must be a model directory under models/",
         )
-    except Exception as e:
-        print(f"Classification error: {e}")
-        return ClassifyResponse(
-            predicted_category="OTHER",
-            severity_score=2,
-            confidence=0.0,
-            model_version="error-fallback",
-            summary="Error processing request",
+    model_dir = MODELS_ROOT / relative if relative is not None else MODEL_DIR
+    if not (model_dir / "config.json").exists():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="model_dir must be a model directory under models/",
+        )
+    if not reload_lock.acquire(blocking=False):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail="Reload already in progress"
+        )
+    try:
+        started = time.perf_counter()
+        try:
+            bundle = load_model(model_dir)
+            if WARMUP_LENGTHS:
+                warm_up(bundle)
+            smoke = golden_smoke_check(bundle)
+        except Exception as e:
+            print(f"Model reload failed: {e}")
+            raise HTTPException(status_code=422, detail=f"Model failed to load: {e}")
+
+        if (
+            smoke["accuracy"] is not None
+            and smoke["accuracy"] < RELOAD_MIN_GOLDEN_ACCURACY
+        ):
+            print(
+                f"Rejected model {bundle.version}: golden accuracy {smoke['accuracy']:.2%}"
+            )
+            bundle.close()
+            return JSONResponse(
+                status_code=422,
+                content={
+                    "status": "rejected",
+                    "model": bundle.version,
+                    "golden": smoke,
+                },
+            )
+
+        previous = registry.activate(bundle)
+        if SIMILAR_INCIDENTS == "on":
+            save_similar_index(wait=True)
+            similar_index = open_similar_index(bundle)
+        print(
+            f"Swapped model {previous.version if previous else None} -> {bundle.version}"
         )
+        return {
+            "status": "swapped",
+            "model": bundle.version,
+            "previous_model": previous.version if previous else None,
+            "golden": smoke,
+            "load_s": round(time.perf_counter() - started, 3),
+        }
+    finally:
+        reload_lock.release()
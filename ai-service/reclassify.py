@@ -0,0 +1,366 @@
+"""
+Bulk offline reclassification: run an incident export through the served model
+without going through HTTP.
+
+Reads CSV (title/description columns) or NDJSON (one object per line) exports in
+--chunk_rows chunks. Within a chunk, rows are sorted by text length and cut into
+--batch_size batches, so each forward pass pads little. The batches are spread
+over --workers processes. As in serve.py, the parent loads the model once and
+forks the workers, which share the weights copy-on-write and use cores / workers
+intra-op threads each.
+
+Every row goes through the same steps as POST /classify: empty text, keyword
+cascade (CASCADE_MODE), model prediction with the heuristic fallbacks, severity
+and summary. The output line carries the same fields as the /classify response
+for the same text and model version, plus the row's `id` (--id_column), `file`
+and `row`. The prediction cache is not consulted. similar_incidents is left out,
+since the index is a live, time-windowed view.
+
+Output is NDJSON in input order, appended and fsynced chunk by chunk. After each
+chunk the read position and output size are checkpointed to --state (default
+<output>.state.json). Re-running the same command resumes there: the output is
+first truncated to the checkpointed size, dropping rows of an unfinished chunk.
+A state file written for other inputs, another model or other cascade settings
+is refused. Rows/sec is reported per chunk and for the whole run.
+
+Usage (from ai-service/):
+  python reclassify.py --input export.csv --output reclassified.ndjson --workers 4
+  python reclassify.py --input incidents-2024.ndjson incidents-2025.ndjson --output out.ndjson --model_dir models/candidate
+
+Torch backend only with --workers > 1: an ONNX Runtime session does not survive fork.
+"""
+
+import argparse
+import csv
+import gc
+import itertools
+import json
+import multiprocessing
+import os
+import time
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+import torch
+
+import main
+
+# Set in the parent before the pool forks; workers inherit it copy-on-write
+_bundle = None
+
+
+def _init_worker(threads: int) -> None:
+    torch.set_num_threads(threads)
+
+
+def _predict_one(text: str, bundle) -> Optional[Tuple[str, float]]:
+    try:
+        return main.predict_batch([text], bundle)[0]
+    except Exception as e:
+        print(f"Classification error: {e}")
+        return None
+
+
+def classify_rows(rows: List[Tuple[str, str]], bundle=None) -> List[dict]:
+    """/classify responses for (title, description) rows, in order; a failed batch is retried row by row."""
+    bundle = bundle or _bundle
+    reqs = [
+        main.ClassifyRequest(title=title, description=description)
+        for title, description in rows
+    ]
+    responses: List[Optional[main.ClassifyResponse]] = [None] * len(reqs)
+    pending = []
+    for i, req in enumerate(reqs):
+        text = main.request_text(req)
+        if not text:
+            responses[i] = main.empty_response(bundle)
+            continue
+        shortcut = main.cascade_prediction(text)
+        if shortcut is not None:
+            responses[i] = main.build_response(
+                req, text, *shortcut, version=f"{bundle.version}-cascade"
+            )
+        else:
+            pending.append((i, text))
+
+    if pending:
+        try:
+            preds = main.predict_batch([text for _, text in pending], bundle)
+        except Exception as e:
+            print(f"Batch failed, retrying individually: {e}")
+            preds = [_predict_one(text, bundle) for _, text in pending]
+        for (i, text), pred in zip(pending, preds):
+            try:
+                if pred is None:
+                    raise ValueError("no prediction")
+                responses[i] = main.build_response(
+                    reqs[i], text, *pred, version=bundle.version
+                )
+            except Exception as e:
+                print(f"Classification error: {e}")
+                responses[i] = main.error_response()
+    return [r.model_dump() for r in responses]
+
+
+def _classify_batch(job):
+    batch_index, rows = job
+    return batch_index, classify_rows(rows)
+
+
+def read_rows(path: Path, skip: int) -> Iterator[dict]:
+    """Records of a CSV or NDJSON export, after the first `skip`."""
+    with path.open(encoding="utf-8", newline="") as f:
+        if path.suffix.lower() == ".csv":
+            yield from itertools.islice(csv.DictReader(f), skip, None)
+            return
+        for line in itertools.islice(f, skip, None):
+            yield json.loads(line) if line.strip() else {}
+
+
+def _field(record: dict, column: str) -> str:
+    value = record.get(column)
+    return "" if value is None else str(value)
+
+
+def _new_state(inputs: List[Path], bundle) -> dict:
+    return {
+        "files": [str(p) for p in inputs],
+        "model": main.cache_namespace(bundle),
+        "cascade": f"{main.CASCADE_MODE}:{main.CASCADE_THRESHOLD}",
+        "position": {"file": 0, "row": 0},
+        "output_bytes": 0,
+        "rows": 0,
+        "paths": {},
+        "elapsed_s": 0.0,
+        "complete": False,
+    }
+
+
+def _save_state(state: dict, path: Path) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(state, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _path_of(response: dict) -> str:
+    version = response["model_version"]
+    if version == "error-fallback":
+        return "error-fallback"
+    for suffix in ("-empty", "-cascade"):
+        if version.endswith(suffix):
+            return suffix[1:]
+    return "model"
+
+
+def reclassify(
+    inputs: List[Path],
+    output: Path,
+    state_path: Path,
+    bundle,
+    workers: int = 1,
+    threads: int = 1,
+    chunk_rows: int = 5000,
+    batch_size: int = 32,
+    id_column: str = "id",
+    title_column: str = "title",
+    description_column: str = "description",
+    overwrite: bool = False,
+) -> dict:
+    """Classify `inputs` into `output`, resuming from `state_path`; returns the final state."""
+    global _bundle
+    state = _new_state(inputs, bundle)
+    if state_path.exists():
+        saved = json.loads(state_path.read_text(encoding="utf-8"))
+        keys = ("files", "model", "cascade")
+        if any(saved[k] != state[k] for k in keys):
+            raise SystemExit(
+                f"{state_path} belongs to a different run ({', '.join(f'{k}={saved[k]}' for k in keys)})"
+            )
+        state = saved
+        if state["complete"]:
+            print(f"{output} is already complete ({state['rows']} rows)")
+            return state
+        if not output.exists():
+            raise SystemExit(
+                f"{state_path} has no {output} to resume; delete the state file to start over"
+            )
+        print(
+            f"Resuming from {state_path}: file {state['position']['file']}, row {state['position']['row']}"
+        )
+    elif output.exists() and not overwrite:
+        raise SystemExit(
+            f"{output} exists without a state file; pass --overwrite to start over"
+        )
+
+    _bundle = bundle
+    pool = None
+    if workers > 1:
+        gc.freeze()  # keep the loaded model's pages shared after fork
+        pool = multiprocessing.get_context("fork").Pool(
+            workers, initializer=_init_worker, initargs=(threads,)
+        )
+
+    mode = "r+b" if state_path.exists() else "wb"
+    started = time.perf_counter()
+    session_rows = 0
+    try:
+        with output.open(mode) as out:
+            out.truncate(state["output_bytes"])
+            out.seek(state["output_bytes"])
+            for file_idx, path in enumerate(inputs):
+                if file_idx < state["position"]["file"]:
+                    continue
+                row = (
+                    state["position"]["row"]
+                    if file_idx == state["position"]["file"]
+                    else 0
+                )
+                records = read_rows(path, row)
+                while True:
+                    chunk = list(itertools.islice(records, chunk_rows))
+                    if not chunk:
+                        break
+                    rows = [
+                        (_field(r, title_column), _field(r, description_column))
+                        for r in chunk
+                    ]
+                    # Longest first, so batches hold rows of similar token counts
+                    order = sorted(
+                        range(len(rows)),
+                        key=lambda i: len(rows[i][0]) + len(rows[i][1]),
+                        reverse=True,
+                    )
+                    batches = [
+                        order[i : i + batch_size]
+                        for i in range(0, len(order), batch_size)
+                    ]
+                    jobs = [
+                        (b, [rows[i] for i in idx]) for b, idx in enumerate(batches)
+                    ]
+                    results = (
+                        pool.imap_unordered(_classify_batch, jobs)
+                        if pool
+                        else map(_classify_batch, jobs)
+                    )
+                    responses: List[Optional[dict]] = [None] * len(rows)
+                    for b, batch_responses in results:
+                        for i, response in zip(batches[b], batch_responses):
+                            responses[i] = response
+
+                    lines = []
+                    for n, (record, response) in enumerate(zip(chunk, responses)):
+                        item_id = record.get(id_column)
+                        lines.append(
+                            json.dumps(
+                                {
+                                    "id": item_id,
+                                    "file": path.name,
+                                    "row": row + n,
+                                    **response,
+                                },
+                                ensure_ascii=False,
+                            )
+                        )
+                        path_name = _path_of(response)
+                        state["paths"][path_name] = state["paths"].get(path_name, 0) + 1
+                    out.write(("\n".join(lines) + "\n").encode("utf-8"))
+                    out.flush()
+                    os.fsync(out.fileno())
+
+                    row += len(chunk)
+                    session_rows += len(chunk)
+                    elapsed = time.perf_counter() - started
+                    state["rows"] += len(chunk)
+                    state["position"] = {"file": file_idx, "row": row}
+                    state["output_bytes"] = out.tell()
+                    _save_state(
+                        {**state, "elapsed_s": round(state["elapsed_s"] + elapsed, 3)},
+                        state_path,
+                    )
+                    print(
+                        f"{path.name}: {row} rows, {state['rows']} total, {session_rows / elapsed:.1f} rows/s"
+                    )
+                state["position"] = {"file": file_idx + 1, "row": 0}
+    finally:
+        if pool is not None:
+            pool.terminate()
+
+    elapsed = time.perf_counter() - started
+    state["elapsed_s"] = round(state["elapsed_s"] + elapsed, 3)
+    state["complete"] = True
+    state["rows_per_s"] = round(session_rows / elapsed, 2) if elapsed else None
+    _save_state(state, state_path)
+    return state
+
+
+def main_cli():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--input",
+        type=Path,
+        nargs="+",
+        required=True,
+        help="CSV or NDJSON exports, in order",
+    )
+    parser.add_argument("--output", type=Path, required=True, help="NDJSON output")
+    parser.add_argument(
+        "--state", type=Path, help="Checkpoint file (default <output>.state.json)"
+    )
+    parser.add_argument("--model_dir", type=Path, default=main.MODEL_DIR)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=0,
+        help="Intra-op threads per worker (0 = cores / workers)",
+    )
+    parser.add_argument(
+        "--chunk_rows", type=int, default=5000, help="Rows per checkpoint"
+    )
+    parser.add_argument("--batch_size", type=int, default=32)
+    parser.add_argument("--id_column", default="id")
+    parser.add_argument("--title_column", default="title")
+    parser.add_argument("--description_column", default="description")
+    parser.add_argument(
+        "--overwrite",
+        action="store_true",
+        help="Replace an output that has no state file",
+    )
+    args = parser.parse_args()
+
+    if args.workers > 1 and main.INFERENCE_BACKEND != "torch":
+        raise SystemExit("--workers > 1 supports INFERENCE_BACKEND=torch only")
+    threads = (
+        args.threads
+        or main.INFERENCE_THREADS
+        or max(1, (os.cpu_count() or 1) // args.workers)
+    )
+
+    # No OpenMP thread pool may exist when the workers fork
+    torch.set_num_threads(1 if args.workers > 1 else threads)
+    bundle = main.load_model(args.model_dir)
+    print(
+        f"Reclassifying with {bundle.version}: {args.workers} workers x {threads} threads"
+    )
+
+    state = reclassify(
+        args.input,
+        args.output,
+        args.state or args.output.with_name(args.output.name + ".state.json"),
+        bundle,
+        workers=args.workers,
+        threads=threads,
+        chunk_rows=args.chunk_rows,
+        batch_size=args.batch_size,
+        id_column=args.id_column,
+        title_column=args.title_column,
+        description_column=args.description_column,
+        overwrite=args.overwrite,
+    )
+    print(
+        f"Wrote {state['rows']} rows to {args.output} ({state.get('rows_per_s')} rows/s this run): {state['paths']}"
+    )
+
+
+if __name__ == "__main__":
+    main_cli()
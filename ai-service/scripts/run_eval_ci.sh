@@ -1,8 +1,10 @@
 #!/usr/bin/env bash
 set -euo pipefail
 
-# Simple helper to run language-stratified eval + golden regression.
-# Assumes venv is active and model weights exist locally.
+# Language-stratified eval + golden regression gate (exits non-zero on a regression).
+# Assumes venv is active and model weights exist locally. The golden run is
+# in-process unless GOLDEN_URL points at a running service; thresholds come
+# from GOLDEN_MIN_ACCURACY / GOLDEN_MIN_ACCURACY_LANG (see golden_runner.py).
 
 python training/evaluate_model.py \
   --model models/afroxlmr_incident_classifier \
@@ -11,4 +13,14 @@ python training/evaluate_model.py \
   --batch 8 \
   --save_report models/afroxlmr_incident_classifier/eval_report_ci.json
 
-python test_amharic_golden.py
+if [[ -n "${GOLDEN_URL:-}" ]]; then
+  golden_target=(--url "$GOLDEN_URL")
+else
+  golden_target=(--in-process)
+fi
+golden_baseline=()
+if [[ -f models/afroxlmr_incident_classifier/golden_report.json ]]; then
+  golden_baseline=(--baseline models/afroxlmr_incident_classifier/golden_report.json)
+fi
+python golden_runner.py "${golden_target[@]}" "${golden_baseline[@]}" \
+  --save_report models/afroxlmr_incident_classifier/golden_report_ci.json
@@ -0,0 +1,145 @@
+"""
+Pre-fork server: load the model once, then fork worker processes that share it.
+
+`uvicorn main:app --workers N` starts N fresh interpreters, so each one imports
+torch and builds its own model. Here the parent imports main.py, loads (and, with
+QUANTIZATION=dynamic, quantizes) the weights, then forks the workers. Weights,
+tokenizer and the imported runtime are shared copy-on-write; each worker only
+adds its activations, its micro-batcher thread and its own prediction cache.
+
+The parent never runs a forward pass and keeps torch at one intra-op thread, so
+no OpenMP thread pool exists at fork time. Each worker then sets its own thread
+count (INFERENCE_THREADS, default cores / workers) and warms up. The parent
+restarts workers that die, re-forking from the loaded model, and forwards
+SIGTERM/SIGINT for a graceful shutdown.
+
+Usage (from ai-service/):
+  python serve.py --workers 4 --port 8001
+
+Torch backend only: an ONNX Runtime session's thread pool does not survive fork.
+SIMILAR_INCIDENTS=on needs --workers 1, since every worker would keep its own index.
+POST /admin/reload swaps the model in the worker that receives it only; restart
+the server to roll a new model out to every worker.
+"""
+
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+
+import torch
+import uvicorn
+
+import main
+
+
+def run_worker(sock: socket.socket, workers: int, log_level: str) -> None:
+    # Threads and connections don't survive fork: give this process its own
+    main.batcher = main.create_batcher()
+    main.prediction_cache = main.create_prediction_cache()
+    torch.set_num_threads(
+        main.INFERENCE_THREADS or max(1, (os.cpu_count() or 1) // workers)
+    )
+    if main.WARMUP_LENGTHS:
+        main.warm_up(main.registry.active)
+    config = uvicorn.Config(main.app, log_level=log_level)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def main_cli():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1))),
+        help="Worker processes (default $WEB_CONCURRENCY or the core count)",
+    )
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    if main.INFERENCE_BACKEND != "torch":
+        raise SystemExit(
+            "serve.py supports INFERENCE_BACKEND=torch only; use uvicorn --workers for onnx"
+        )
+    if main.SIMILAR_INCIDENTS == "on" and args.workers > 1:
+        raise SystemExit(
+            "SIMILAR_INCIDENTS=on keeps the index in process memory; run with --workers 1"
+        )
+
+    torch.set_num_threads(1)
+    main.initialize_model(warmup=False)
+    if not main.model_ready.is_set():
+        raise SystemExit(f"Model failed to load: {main.model_load_error}")
+    # Loading applies INFERENCE_THREADS; the workers set it for themselves after the fork
+    torch.set_num_threads(1)
+    main.batcher.stop()
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.host, args.port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+
+    # Move everything loaded so far out of the GC's reach so collections in the
+    # workers don't write to (and so un-share) the parent's pages.
+    gc.collect()
+    gc.freeze()
+
+    children = {}
+    stopping = False
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            code = 0
+            try:
+                run_worker(sock, args.workers, args.log_level)
+            except BaseException as e:
+                print(f"Worker {os.getpid()} failed: {e}")
+                code = 1
+            finally:
+                sys.stdout.flush()
+                os._exit(code)
+        children[pid] = time.time()
+
+    def shutdown(signum, _frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+
+    for _ in range(args.workers):
+        spawn()
+    print(
+        f"Serving model {main.registry.active.version} on {args.host}:{args.port} with {args.workers} workers"
+    )
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        started = children.pop(pid, None)
+        if started is None or stopping:
+            continue
+        print(f"Worker {pid} exited with status {status}; restarting")
+        if time.time() - started < 5:
+            time.sleep(1)  # don't spin if workers die on startup
+        spawn()
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+import torch
+
+from utils.backends import OnnxBackend, TorchBackend, mean_pool, softmax
+
+
+class _ToyConfig:
+    num_labels = 3
+    id2label = {0: "FIRE", 1: "MEDICAL", 2: "OTHER"}
+
+
+class _ToyClassifier(torch.nn.Module):
+    def __init__(self):
+        super().__init__()
+        torch.manual_seed(0)
+        self.config = _ToyConfig()
+        self.embed = torch.nn.Embedding(50, 8)
+        self.head = torch.nn.Linear(8, 3)
+
+    def forward(self, input_ids, attention_mask):
+        mask = attention_mask.unsqueeze(-1).float()
+        pooled = (self.embed(input_ids) * mask).sum(1) / mask.sum(1)
+        return type("Out", (), {"logits": self.head(pooled)})()
+
+
+def test_softmax_rows_sum_to_one():
+    probs = softmax(np.array([[1.0, 2.0, 3.0], [1000.0, 1000.0, 1000.0]]))
+    assert np.allclose(probs.sum(-1), 1.0)
+    assert np.allclose(probs[1], 1 / 3)
+
+
+def test_mean_pool_ignores_padding_and_is_unit_length():
+    hidden = np.random.default_rng(0).normal(size=(2, 4, 8)).astype(np.float32)
+    hidden[1, :2] = hidden[0, :2]
+    pooled = mean_pool(hidden, np.array([[1, 1, 0, 0], [1, 1, 0, 0]]))
+    assert np.allclose(pooled[0], pooled[1])
+    assert np.allclose(np.linalg.norm(pooled, axis=1), 1.0)
+
+
+def test_onnx_backend_matches_torch(tmp_path):
+    pytest.importorskip("onnxruntime")
+    model = _ToyClassifier().eval()
+    ids = torch.tensor([[3, 4, 5], [6, 7, 1]])
+    mask = torch.tensor([[1, 1, 1], [1, 1, 0]])
+
+    class _Export(torch.nn.Module):
+        def __init__(self, inner):
+            super().__init__()
+            self.inner = inner
+
+        def forward(self, input_ids, attention_mask):
+            return self.inner(input_ids, attention_mask).logits
+
+    path = tmp_path / "model.onnx"
+    torch.onnx.export(
+        _Export(model),
+        (ids, mask),
+        str(path),
+        input_names=["input_ids", "attention_mask"],
+        output_names=["logits"],
+        dynamic_axes={
+            "input_ids": {0: "b", 1: "s"},
+            "attention_mask": {0: "b", 1: "s"},
+        },
+        opset_version=14,
+    )
+
+    ref = TorchBackend(model).logits(ids.numpy(), mask.numpy())
+    got = OnnxBackend(path, model.config).logits(ids.numpy(), mask.numpy())
+    assert np.allclose(ref, got, atol=1e-5)
@@ -0,0 +1,155 @@
+import threading
+import time
+
+import pytest
+from utils.batching import (
+    MicroBatcher,
+    QueueFull,
+    length_grouped_batches,
+    pad_sequences,
+)
+
+
+def test_concurrent_submissions_share_a_batch():
+    seen = []
+
+    def process(items):
+        seen.append(list(items))
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(process, max_batch_size=8, max_wait_ms=50).start()
+    try:
+        futures = [batcher.submit(i) for i in range(5)]
+        assert [f.result(timeout=2) for f in futures] == [0, 2, 4, 6, 8]
+    finally:
+        batcher.stop()
+
+    assert seen == [[0, 1, 2, 3, 4]]
+    stats = batcher.stats()
+    assert stats["batch_size"]["count"] == 1
+    assert stats["queue_wait_ms"]["count"] == 5
+
+
+def test_batches_are_capped_at_max_size():
+    sizes = []
+
+    def process(items):
+        sizes.append(len(items))
+        return items
+
+    batcher = MicroBatcher(process, max_batch_size=3, max_wait_ms=20).start()
+    try:
+        futures = [batcher.submit(i) for i in range(7)]
+        assert [f.result(timeout=2) for f in futures] == list(range(7))
+    finally:
+        batcher.stop()
+
+    assert max(sizes) <= 3
+    assert sum(sizes) == 7
+
+
+def test_batch_failure_propagates_to_every_caller():
+    def process(items):
+        raise ValueError("boom")
+
+    batcher = MicroBatcher(process, max_batch_size=4, max_wait_ms=10).start()
+    try:
+        futures = [batcher.submit(i) for i in range(2)]
+        for f in futures:
+            with pytest.raises(ValueError):
+                f.result(timeout=2)
+    finally:
+        batcher.stop()
+
+
+def test_failing_item_does_not_fail_its_batch_mates():
+    calls = []
+
+    def process(items):
+        calls.append(list(items))
+        if "bad" in items:
+            raise ValueError("bad input")
+        return [item.upper() for item in items]
+
+    batcher = MicroBatcher(process, max_batch_size=4, max_wait_ms=50).start()
+    try:
+        futures = [batcher.submit(item) for item in ("a", "bad", "c")]
+        assert futures[0].result(timeout=2) == "A"
+        assert futures[2].result(timeout=2) == "C"
+        with pytest.raises(ValueError):
+            futures[1].result(timeout=2)
+    finally:
+        batcher.stop()
+    assert calls[0] == ["a", "bad", "c"] and ["a"] in calls and ["c"] in calls
+
+
+def test_threads_receive_their_own_results():
+    batcher = MicroBatcher(
+        lambda items: [f"out-{i}" for i in items], max_batch_size=16, max_wait_ms=5
+    ).start()
+    results = {}
+
+    def worker(i):
+        results[i] = batcher.submit(i).result(timeout=2)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(20)]
+    try:
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        batcher.stop()
+
+    assert results == {i: f"out-{i}" for i in range(20)}
+
+
+def test_length_grouped_batches_sorts_and_caps():
+    lengths = [50, 3, 40, 5, 4, 45]
+    batches = length_grouped_batches(lengths, batch_size=3)
+    assert batches == [[1, 4, 3], [2, 5, 0]]
+
+
+def test_length_grouped_batches_respects_token_budget():
+    lengths = [10, 10, 10, 100, 100]
+    batches = length_grouped_batches(lengths, batch_size=8, max_tokens=200)
+    assert batches == [[0, 1, 2], [3, 4]]
+    assert sorted(i for b in batches for i in b) == list(range(len(lengths)))
+
+
+def test_pad_sequences_pads_to_longest():
+    ids, mask = pad_sequences([[5, 6, 7], [8]], pad_id=1)
+    assert ids.tolist() == [[5, 6, 7], [8, 1, 1]]
+    assert mask.tolist() == [[1, 1, 1], [1, 0, 0]]
+
+
+def test_full_queue_rejects_and_cancelled_items_are_skipped():
+    gate = threading.Event()
+    seen = []
+
+    def process(items):
+        gate.wait(2)
+        seen.extend(items)
+        return items
+
+    batcher = MicroBatcher(
+        process, max_batch_size=1, max_wait_ms=0, max_queue=2
+    ).start()
+    try:
+        first = batcher.submit("running")
+        while batcher.stats()["queue_depth"]:
+            time.sleep(0.005)
+        queued = [batcher.submit("a"), batcher.submit("b")]
+        with pytest.raises(QueueFull):
+            batcher.submit("overflow")
+        queued[0].cancel()
+        gate.set()
+        assert first.result(timeout=2) == "running"
+        assert queued[1].result(timeout=2) == "b"
+    finally:
+        batcher.stop()
+
+    assert seen == ["running", "b"]
+    stats = batcher.stats()
+    assert stats["rejected"] == 1
+    assert stats["cancelled"] == 1
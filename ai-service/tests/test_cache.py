@@ -0,0 +1,69 @@
+import time
+
+from utils.cache import (
+    MemoryCache,
+    SQLiteCache,
+    cache_key,
+    create_cache,
+    normalize_text,
+)
+
+
+def test_normalize_text_collapses_case_and_whitespace():
+    assert normalize_text("  Fire   at  the\nMarket ") == normalize_text(
+        "fire at the\tmarket"
+    )
+    assert normalize_text("ＦＩＲＥ") == "fire"
+
+
+def test_cache_key_depends_on_model_version():
+    assert cache_key("Fire at market", "v1") == cache_key("fire  at market", "v1")
+    assert cache_key("Fire at market", "v1") != cache_key("Fire at market", "v2")
+
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # a is now most recent
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    stats = cache.stats()
+    assert stats["hits"] == 3 and stats["misses"] == 1
+
+
+def test_memory_cache_ttl_expires_entries():
+    cache = MemoryCache(max_entries=10, ttl_seconds=0.05)
+    cache.set("a", ["FIRE", 0.9])
+    assert cache.get("a") == ["FIRE", 0.9]
+    time.sleep(0.1)
+    assert cache.get("a") is None
+
+
+def test_sqlite_cache_is_shared_between_instances(tmp_path):
+    path = tmp_path / "cache.db"
+    writer = SQLiteCache(path, max_entries=2)
+    reader = SQLiteCache(path, max_entries=2)
+    writer.set("a", ["FIRE", 0.9])
+    assert reader.get("a") == ["FIRE", 0.9]
+
+    writer.set("b", ["OTHER", 0.5])
+    writer.set("c", ["CRIME", 0.7])
+    assert reader.get("c") == ["CRIME", 0.7]
+    assert sum(reader.get(k) is not None for k in ("a", "b")) == 1
+
+
+def test_create_cache_from_url(tmp_path):
+    assert create_cache("off") is None
+    assert isinstance(create_cache("memory://"), MemoryCache)
+    assert isinstance(create_cache(f"sqlite://{tmp_path / 'c.db'}"), SQLiteCache)
+
+
+def test_sqlite_cache_errors_are_a_miss_and_a_noop(tmp_path):
+    cache = SQLiteCache(tmp_path / "cache.db")
+    cache._conn().execute("DROP TABLE predictions")  # every statement now fails
+    cache.set("a", ["FIRE", 0.9])
+    assert cache.get("a") is None
+    assert cache.stats()["misses"] == 1
@@ -0,0 +1,43 @@
+from utils.cascade import NEGATION_EVIDENCE, keyword_evidence, threshold_table
+
+
+def test_no_hits_means_no_evidence():
+    assert keyword_evidence({"fire": 0, "medical": 0}, negated=False) == (None, 0.0)
+
+
+def test_negation_short_circuits_to_other():
+    assert keyword_evidence({"fire": 3}, negated=True) == ("OTHER", NEGATION_EVIDENCE)
+
+
+def test_more_distinct_keywords_raise_the_score():
+    _, one = keyword_evidence({"fire": 1}, negated=False)
+    _, three = keyword_evidence({"fire": 3}, negated=False)
+    assert one == 0.5
+    assert three > one
+
+
+def test_competing_categories_lower_the_score():
+    label, pure = keyword_evidence({"fire": 2, "medical": 0}, negated=False)
+    _, mixed = keyword_evidence({"fire": 2, "medical": 2}, negated=False)
+    assert label == "FIRE"
+    assert mixed < pure
+
+
+def test_ties_follow_category_order():
+    label, _ = keyword_evidence({"traffic": 1, "infrastructure": 1}, negated=False)
+    assert label == "TRAFFIC"
+
+
+def test_threshold_table_aliases_model_predictions():
+    # The heuristic fallback answers POLICE; the keyword stage and gold labels say CRIME
+    stage1 = [("CRIME", 0.9), ("FIRE", 0.9), (None, 0.0)]
+    rows = threshold_table(
+        stage1,
+        ["POLICE", "FIRE", "POLICE"],
+        ["CRIME", "FIRE", "POLICE"],
+        [0.8],
+        {"POLICE": "CRIME"},
+    )
+    assert rows[0]["skipped"] == 2
+    assert rows[0]["agreement_with_model"] == 1.0
+    assert rows[0]["cascade_accuracy"] == 1.0
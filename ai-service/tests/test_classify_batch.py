@@ -0,0 +1,214 @@
+import threading
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from utils.batching import MicroBatcher
+from utils.cache import MemoryCache
+from utils.model_registry import ModelBundle, ModelRegistry
+
+AUTH = {"Authorization": "Bearer test-secret"}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(main, "INTERNAL_SERVICE_SECRET", "test-secret")
+    monkeypatch.setattr(main, "prediction_cache", None)
+    registry = ModelRegistry()
+    registry.activate(ModelBundle(tokenizer=None, backend=None, version="test-model"))
+    monkeypatch.setattr(main, "registry", registry)
+    ready = threading.Event()
+    ready.set()
+    monkeypatch.setattr(main, "model_ready", ready)
+    return TestClient(main.app)
+
+
+def fake_predict_batch(texts, bundle=None):
+    if any("poison" in t for t in texts):
+        raise RuntimeError("bad row")
+    return [("FIRE" if "fire" in t.lower() else "OTHER", 0.9) for t in texts]
+
+
+def test_batch_returns_one_response_per_item_in_order(client, monkeypatch):
+    monkeypatch.setattr(main, "predict_batch", fake_predict_batch)
+    payload = [
+        {"title": "Fire", "description": "smoke at the market"},
+        {"title": "", "description": ""},
+        {"title": "Lost cat", "description": "near the park"},
+    ]
+    res = client.post("/classify/batch", json=payload, headers=AUTH)
+    assert res.status_code == 200
+    body = res.json()
+    assert [r["predicted_category"] for r in body] == ["FIRE", "OTHER", "OTHER"]
+    assert body[1]["model_version"].endswith("-empty")
+    assert body[0]["model_version"] == "test-model"
+
+
+def test_batch_isolates_failing_items(client, monkeypatch):
+    monkeypatch.setattr(main, "predict_batch", fake_predict_batch)
+    monkeypatch.setattr(main, "CLASSIFY_BATCH_CHUNK_SIZE", 2)
+    payload = [
+        {"title": "Fire", "description": "flames"},
+        {"title": "poison", "description": "row"},
+        {"title": "Fire", "description": "again"},
+    ]
+    body = client.post("/classify/batch", json=payload, headers=AUTH).json()
+    assert [r["model_version"] for r in body] == [
+        "test-model",
+        "error-fallback",
+        "test-model",
+    ]
+    assert body[0]["predicted_category"] == "FIRE"
+    assert body[2]["predicted_category"] == "FIRE"
+
+
+def test_batch_rejects_oversized_requests(client, monkeypatch):
+    monkeypatch.setattr(main, "CLASSIFY_BATCH_MAX_ITEMS", 1)
+    payload = [{"title": "a", "description": "b"}, {"title": "c", "description": "d"}]
+    res = client.post("/classify/batch", json=payload, headers=AUTH)
+    assert res.status_code == 413
+
+
+def test_batch_reuses_cached_predictions(client, monkeypatch):
+    calls = []
+
+    def counting_predict(texts, bundle=None):
+        calls.append(list(texts))
+        return fake_predict_batch(texts)
+
+    monkeypatch.setattr(main, "prediction_cache", MemoryCache(max_entries=10))
+    monkeypatch.setattr(main, "predict_batch", counting_predict)
+    payload = [{"title": "Fire", "description": "smoke at the market"}]
+    first = client.post("/classify/batch", json=payload, headers=AUTH).json()
+    payload = [{"title": "FIRE", "description": "smoke  at the market"}]
+    second = client.post("/classify/batch", json=payload, headers=AUTH).json()
+
+    assert len(calls) == 1
+    assert first[0]["predicted_category"] == second[0]["predicted_category"] == "FIRE"
+    assert main.prediction_cache.stats()["hits"] == 1
+
+
+class _BrokenCache(MemoryCache):
+    def _get(self, key):
+        raise RuntimeError("database is locked")
+
+    def _set(self, key, value):
+        raise RuntimeError("database is locked")
+
+
+def test_cache_failures_do_not_replace_model_predictions(client, monkeypatch):
+    monkeypatch.setattr(main, "prediction_cache", _BrokenCache())
+    monkeypatch.setattr(main, "predict_batch", fake_predict_batch)
+    payload = {"title": "Fire", "description": "smoke at the market"}
+
+    single = client.post("/classify", json=payload, headers=AUTH)
+    batch = client.post("/classify/batch", json=[payload], headers=AUTH)
+
+    assert single.status_code == batch.status_code == 200
+    assert single.json()["model_version"] == "test-model"
+    assert single.json()["predicted_category"] == "FIRE"
+    assert batch.json()[0]["model_version"] == "test-model"
+
+
+def test_cascade_skips_model_on_strong_keyword_evidence(client, monkeypatch):
+    calls = []
+
+    def counting_predict(texts, bundle=None):
+        calls.append(list(texts))
+        return fake_predict_batch(texts)
+
+    monkeypatch.setattr(main, "predict_batch", counting_predict)
+    monkeypatch.setattr(main, "CASCADE_MODE", "on")
+    monkeypatch.setattr(main, "CASCADE_THRESHOLD", 0.8)
+    payload = [
+        {"title": "Fire", "description": "heavy smoke and flames"},
+        {"title": "Something", "description": "happened downtown"},
+    ]
+    body = client.post("/classify/batch", json=payload, headers=AUTH).json()
+
+    assert body[0]["model_version"] == "test-model-cascade"
+    assert body[0]["predicted_category"] == "FIRE"
+    assert body[1]["model_version"] == "test-model"
+    assert calls == [["Something happened downtown"]]
+
+
+def test_full_inference_queue_returns_429_with_retry_after(client, monkeypatch):
+    stalled = MicroBatcher(fake_predict_batch, max_queue=1)  # never started
+    stalled.submit("queued")
+    monkeypatch.setattr(main, "batcher", stalled)
+    res = client.post(
+        "/classify", json={"title": "Fire", "description": "smoke"}, headers=AUTH
+    )
+    assert res.status_code == 429
+    assert res.headers["Retry-After"]
+    assert stalled.stats()["rejected"] == 1
+
+
+def test_inference_timeout_returns_503_and_cancels_queued_item(client, monkeypatch):
+    stalled = MicroBatcher(fake_predict_batch)  # never started
+    monkeypatch.setattr(main, "batcher", stalled)
+    monkeypatch.setattr(main, "INFERENCE_TIMEOUT_S", 0.05)
+    res = client.post(
+        "/classify", json={"title": "Fire", "description": "smoke"}, headers=AUTH
+    )
+    assert res.status_code == 503
+    assert res.headers["Retry-After"]
+    _, fut, _ = stalled._queue.get_nowait()
+    assert fut.cancelled()
+
+
+def test_metrics_count_results_by_category_and_path(client, monkeypatch):
+    monkeypatch.setattr(main, "predict_batch", fake_predict_batch)
+    before = main.CLASSIFICATIONS.value("FIRE", "model", "test-model")
+    payload = [
+        {"title": "Fire", "description": "smoke"},
+        {"title": "", "description": ""},
+    ]
+    client.post("/classify/batch", json=payload, headers=AUTH)
+
+    assert main.CLASSIFICATIONS.value("FIRE", "model", "test-model") == before + 1
+    res = client.get("/metrics", headers=AUTH)
+    assert res.status_code == 200
+    assert (
+        'ai_classifications_total{category="OTHER",path="empty",model_version="test-model"}'
+        in res.text
+    )
+    assert 'ai_request_seconds_count{endpoint="/classify/batch"}' in res.text
+    assert client.get("/metrics").status_code in (401, 403)
+
+
+class _FakeTokenizer:
+    pad_token_id = 1
+
+    def __call__(self, texts, truncation=True, max_length=128):
+        return {"input_ids": [[0] + [5] * len(t.split()) + [2] for t in texts]}
+
+
+class _FakeBackend:
+    name = "fake"
+    config = type(
+        "Config", (), {"num_labels": 2, "id2label": {0: "FIRE", 1: "LABEL_1"}}
+    )()
+
+    def logits(self, input_ids, attention_mask):
+        # Longer inputs lean towards the unmapped LABEL_1
+        return np.stack(
+            [np.full(len(input_ids), 3.0), attention_mask.sum(1).astype(float)], axis=1
+        )
+
+
+def test_predict_batch_records_stages_and_label_fallbacks(monkeypatch):
+    monkeypatch.setattr(main, "PADDING_MODE", "dynamic")
+    bundle = ModelBundle(_FakeTokenizer(), _FakeBackend(), version="stage-test")
+    forward_before = main.FORWARD_SECONDS.collect()[2]
+    tokens_before = main.INPUT_TOKENS.collect()[2]
+
+    preds = main.predict_batch(["fire", "smoke rising over the busy market"], bundle)
+
+    assert preds[0][0] == "FIRE"
+    assert preds[1][0] == main.heuristic_category("smoke rising over the busy market")
+    assert main.MODEL_FALLBACKS.value("LABEL_", "stage-test") == 1
+    assert main.FORWARD_SECONDS.collect()[2] == forward_before + 1
+    assert main.INPUT_TOKENS.collect()[2] == tokens_before + 2
@@ -0,0 +1,100 @@
+import numpy as np
+from sklearn.metrics import accuracy_score, f1_score, precision_recall_fscore_support
+
+from utils.evaluation import (
+    ConfusionAccumulator,
+    classification_report,
+    confusion_matrix,
+    grouped_confusion_matrices,
+)
+
+LABELS = ["FIRE", "MEDICAL", "CRIME", "TRAFFIC", "INFRASTRUCTURE", "OTHER"]
+
+
+def _random_run(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    labels = rng.integers(0, 5, n)  # OTHER never occurs
+    preds = np.where(rng.random(n) < 0.7, labels, rng.integers(0, 6, n))
+    langs = rng.choice(["am", "en", "mix"], n).tolist()
+    return labels, preds, langs
+
+
+def test_confusion_matrix_counts_true_rows_and_predicted_columns():
+    cm = confusion_matrix([0, 0, 1, 2], [0, 1, 1, 1], 3)
+    assert cm.tolist() == [[1, 1, 0], [0, 1, 0], [0, 1, 0]]
+
+
+def test_report_matches_sklearn_overall_and_per_language():
+    labels, preds, langs = _random_run()
+    report = classification_report(labels, preds, LABELS, groups=langs)
+    all_classes = list(range(len(LABELS)))
+
+    overall = report["overall"]
+    assert np.isclose(overall["accuracy"], accuracy_score(labels, preds))
+    assert np.isclose(
+        overall["macro_f1"],
+        f1_score(labels, preds, labels=all_classes, average="macro", zero_division=0),
+    )
+    precision, recall, f1, support = precision_recall_fscore_support(
+        labels, preds, labels=all_classes, zero_division=0
+    )
+    for i, name in enumerate(LABELS):
+        per_class = overall["per_class"][name]
+        assert np.isclose(per_class["precision"], precision[i])
+        assert np.isclose(per_class["recall"], recall[i])
+        assert np.isclose(per_class["f1"], f1[i])
+        assert per_class["support"] == support[i]
+    assert overall["labels"] == LABELS
+    assert np.array(overall["confusion_matrix"]).sum() == len(labels)
+
+    for lang in ("am", "en", "mix"):
+        idx = [i for i, value in enumerate(langs) if value == lang]
+        sliced = report["per_language"][lang]
+        assert sliced["count"] == len(idx)
+        assert np.isclose(
+            sliced["macro_f1"],
+            f1_score(
+                labels[idx],
+                preds[idx],
+                labels=all_classes,
+                average="macro",
+                zero_division=0,
+            ),
+        )
+
+
+def test_rows_without_a_language_count_overall_only():
+    report = classification_report(
+        [0, 1, 1], [0, 1, 0], LABELS, groups=["am", None, float("nan")]
+    )
+    assert list(report["per_language"]) == ["am"]
+    assert report["per_language"]["am"]["count"] == 1
+    assert report["overall"]["count"] == 3
+
+
+def test_grouped_matrices_sum_to_overall():
+    labels, preds, langs = _random_run(seed=1)
+    codes = np.array([["am", "en", "mix"].index(value) for value in langs])
+    slices = grouped_confusion_matrices(labels, preds, codes, len(LABELS))
+    assert slices.shape == (3, 6, 6)
+    assert np.array_equal(
+        slices.sum(axis=0), confusion_matrix(labels, preds, len(LABELS))
+    )
+
+
+def test_accumulated_chunks_and_merged_shards_match_one_pass():
+    labels, preds, langs = _random_run(seed=2)
+    expected = classification_report(labels, preds, LABELS, groups=langs)
+
+    shards = []
+    for shard in range(3):
+        acc = ConfusionAccumulator(LABELS)
+        idx = np.arange(shard, len(labels), 3)
+        for chunk in np.array_split(idx, 7):
+            acc.update(labels[chunk], preds[chunk], [langs[i] for i in chunk])
+        shards.append(
+            ConfusionAccumulator.from_dict(acc.to_dict())
+        )  # through a checkpoint
+
+    merged = shards[0].merge(shards[1:])
+    assert merged.report() == expected
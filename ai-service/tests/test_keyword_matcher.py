@@ -0,0 +1,75 @@
+import csv
+from pathlib import Path
+
+import main
+from main import heuristic_category
+from utils.keyword_matcher import KeywordMatcher
+from utils.severity import BASE_SEVERITY, HIGH_KEYWORDS, MEDIUM_KEYWORDS, infer_severity
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+
+def _texts():
+    texts = []
+    for path in sorted(DATA_DIR.glob("*.csv")):
+        with path.open(encoding="utf-8-sig") as f:
+            texts.extend(row["text"] for row in csv.DictReader(f))
+    return texts + ["", "no fire here", "ምንም እሳት የለም", "Armed weapon robbery", "FIRE!!"]
+
+
+def _reference_category(text):
+    t = text.lower()
+    if any(n in t for n in main.NEGATIONS):
+        return "OTHER"
+    for category, words in (main.KEYWORDS or main.FALLBACK_KEYWORDS).items():
+        if any(w in t for w in words):
+            return category.upper()
+    return "OTHER"
+
+
+def _reference_severity(label, text):
+    t = (text or "").lower()
+    score = BASE_SEVERITY.get(label, 2)
+    if any(w in t for w in HIGH_KEYWORDS):
+        score += 2
+    elif any(w in t for w in MEDIUM_KEYWORDS):
+        score += 1
+    return max(0, min(5, score))
+
+
+def test_matcher_finds_overlapping_and_nested_patterns():
+    matcher = KeywordMatcher(
+        {"a": ["he", "hers"], "b": ["she"], "c": ["his"], "d": ["fire"]}
+    )
+    assert matcher.groups("ushers") == {"a", "b"}
+    assert matcher.groups("no fire") == {"d"}
+    assert matcher.groups("xyz") == frozenset()
+
+
+def test_matcher_handles_geez_and_leading_space_patterns():
+    matcher = KeywordMatcher({"fire": ["እሳት"], "police": [" weapon"]})
+    assert matcher.groups("በስፍራው ትልቅ እሳት አለ") == {"fire"}
+    assert matcher.groups("weapon found") == frozenset()
+    assert matcher.groups("a weapon found") == {"police"}
+
+
+def test_heuristic_category_matches_linear_scan_on_dataset():
+    mismatches = [
+        t for t in _texts() if heuristic_category(t) != _reference_category(t)
+    ]
+    assert mismatches == []
+
+
+def test_infer_severity_matches_linear_scan_on_dataset():
+    for text in _texts():
+        for label in ("FIRE", "CRIME", "OTHER"):
+            expected = _reference_severity(label, text)
+            assert infer_severity(label, text) == expected
+            assert infer_severity(label, text, hits=main.keyword_hits(text)) == expected
+
+
+def test_matcher_counts_distinct_patterns_per_group():
+    matcher = KeywordMatcher({"fire": ["fire", "smoke", "flame"], "medical": ["blood"]})
+    counts = matcher.counts("fire fire and smoke, blood")
+    assert counts == {"fire": 2, "medical": 1}
+    assert set(counts) == matcher.groups("fire fire and smoke, blood")
@@ -0,0 +1,34 @@
+from utils.metrics import Histogram, MetricsRegistry
+
+
+def test_histogram_buckets_are_cumulative_and_inclusive():
+    hist = Histogram([1, 5, 10])
+    for value in (0.5, 1, 3, 10, 50):
+        hist.observe(value)
+    snap = hist.snapshot()
+    assert snap["buckets"] == {"1": 2, "5": 3, "10": 4, "+Inf": 5}
+    assert snap["count"] == 5
+    assert snap["sum"] == 64.5
+
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry()
+    stages = registry.histogram(
+        "demo_seconds", "Demo stage time.", (0.1, 1), labels=("stage",)
+    )
+    stages.labels("forward").observe(0.05)
+    stages.labels("forward").observe(2)
+    counter = registry.counter("demo_total", "Demo results.", labels=("category",))
+    counter.inc('FI"RE')
+    counter.inc('FI"RE')
+    registry.callback("demo_queue_depth", "Demo gauge.", lambda: 3)
+    registry.callback("demo_broken", "Skipped when the callback fails.", lambda: 1 / 0)
+
+    lines = registry.render().splitlines()
+    assert "# TYPE demo_seconds histogram" in lines
+    assert 'demo_seconds_bucket{stage="forward",le="0.1"} 1' in lines
+    assert 'demo_seconds_bucket{stage="forward",le="+Inf"} 2' in lines
+    assert 'demo_seconds_count{stage="forward"} 2' in lines
+    assert 'demo_total{category="FI\\"RE"} 2' in lines
+    assert "demo_queue_depth 3" in lines
+    assert not any(line.startswith("demo_broken") for line in lines)
@@ -0,0 +1,121 @@
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from utils.model_registry import ModelBundle, ModelRegistry
+
+ADMIN = {"Authorization": "Bearer admin-secret"}
+
+
+class _FakeBackend:
+    name = "fake"
+
+
+def bundle(version):
+    return ModelBundle(object(), _FakeBackend(), version)
+
+
+def test_swap_keeps_old_bundle_until_leases_drain():
+    registry = ModelRegistry()
+    old = bundle("v1")
+    registry.activate(old)
+
+    with registry.lease() as leased:
+        registry.activate(bundle("v2"))
+        assert registry.active.version == "v2"
+        assert leased is old and not old.closed
+
+    assert old.wait_drained(timeout=1)
+    for _ in range(100):
+        if old.closed:
+            break
+        threading.Event().wait(0.01)
+    assert old.closed and old.backend is None
+    assert registry.retiring == []
+
+
+def test_lease_without_model_raises():
+    with pytest.raises(RuntimeError):
+        with ModelRegistry().lease():
+            pass
+
+
+@pytest.fixture
+def admin_client(monkeypatch, tmp_path):
+    registry = ModelRegistry()
+    registry.activate(bundle("v1"))
+    ready = threading.Event()
+    ready.set()
+    model_dir = tmp_path / "candidate"
+    model_dir.mkdir()
+    (model_dir / "config.json").write_text("{}")
+    monkeypatch.setattr(main, "registry", registry)
+    monkeypatch.setattr(main, "model_ready", ready)
+    monkeypatch.setattr(main, "ADMIN_SECRET", "admin-secret")
+    monkeypatch.setattr(main, "MODELS_ROOT", tmp_path)
+    monkeypatch.setattr(main, "WARMUP_LENGTHS", [])
+    monkeypatch.setattr(
+        main, "load_model", lambda model_dir: bundle(f"v2:{model_dir.name}")
+    )
+    return TestClient(main.app)
+
+
+def test_reload_swaps_when_golden_check_passes(admin_client, monkeypatch):
+    monkeypatch.setattr(main, "golden_smoke_check", lambda b: {"accuracy": 1.0})
+    res = admin_client.post(
+        "/admin/reload", json={"model_dir": "candidate"}, headers=ADMIN
+    )
+    assert res.status_code == 200
+    assert res.json()["previous_model"] == "v1"
+    assert main.registry.active.version == "v2:candidate"
+
+
+def test_reload_rejects_model_failing_golden_check(admin_client, monkeypatch):
+    monkeypatch.setattr(main, "golden_smoke_check", lambda b: {"accuracy": 0.1})
+    res = admin_client.post(
+        "/admin/reload", json={"model_dir": "candidate"}, headers=ADMIN
+    )
+    assert res.status_code == 422
+    assert main.registry.active.version == "v1"
+
+
+def test_reload_refuses_paths_outside_models_root(admin_client):
+    res = admin_client.post(
+        "/admin/reload", json={"model_dir": "../../etc"}, headers=ADMIN
+    )
+    assert res.status_code == 400
+
+
+def test_reload_refuses_absolute_paths(admin_client, tmp_path):
+    res = admin_client.post(
+        "/admin/reload", json={"model_dir": str(tmp_path / "candidate")}, headers=ADMIN
+    )
+    assert res.status_code == 400
+
+
+def test_reload_follows_symlinked_model_dir(
+    admin_client, monkeypatch, tmp_path_factory
+):
+    # Deployed models are often a symlink under models/ to weights stored elsewhere
+    target = tmp_path_factory.mktemp("weights")
+    (target / "config.json").write_text("{}")
+    link = main.MODELS_ROOT / "deployed"
+    link.symlink_to(target, target_is_directory=True)
+    monkeypatch.setattr(main, "golden_smoke_check", lambda b: {"accuracy": 1.0})
+
+    res = admin_client.post(
+        "/admin/reload", json={"model_dir": "deployed"}, headers=ADMIN
+    )
+    assert res.status_code == 200 and main.registry.active.version == "v2:deployed"
+
+    monkeypatch.setattr(main, "MODEL_DIR", link)
+    assert admin_client.post("/admin/reload", headers=ADMIN).status_code == 200
+
+
+def test_reload_requires_admin_secret(admin_client, monkeypatch):
+    res = admin_client.post("/admin/reload", headers={"Authorization": "Bearer wrong"})
+    assert res.status_code == 401
+    monkeypatch.setattr(main, "ADMIN_SECRET", None)
+    assert admin_client.post("/admin/reload", headers=ADMIN).status_code == 403
@@ -0,0 +1,49 @@
+import numpy as np
+
+from utils.near_duplicates import MinHasher, find_clusters, lsh_params, normalize
+
+
+def _jaccard(a, b, k=3):
+    sa = {a[i : i + k] for i in range(len(a) - k + 1)}
+    sb = {b[i : i + k] for i in range(len(b) - k + 1)}
+    return len(sa & sb) / len(sa | sb)
+
+
+def test_normalize_folds_case_punctuation_and_geez_homophones():
+    assert normalize("  Fire at **Bole**!!  ") == "fire at bole"
+    # ሐ/ኀ/ሀ and ሠ/ሰ families are the same sound; ። is the Ethiopic full stop
+    assert normalize("ሐኪም ሠራተኛ።") == normalize("ሀኪም ሰራተኛ")
+
+
+def test_signature_agreement_estimates_jaccard():
+    a = "a large truck lost its load of goods on the ring road causing congestion"
+    b = "a large truck lost its load on the ring road causing heavy congestion"
+    sig = MinHasher(num_perm=512).signatures([a, b])
+    assert abs(np.mean(sig[0] == sig[1]) - _jaccard(a, b)) < 0.08
+
+
+def test_lsh_params_use_all_permutations_below_threshold():
+    bands, rows = lsh_params(128, 0.8)
+    assert bands * rows == 128
+    assert (1 / bands) ** (1 / rows) <= 0.8
+
+
+def test_clusters_near_copies_across_scripts_and_skips_distinct_rows():
+    texts = [
+        "Attempted car theft near Sarbet, the suspect was scared away by a security guard",
+        "House fire quickly spreading to the next building.",
+        "attempted car theft near **Sarbet**, the suspect was scared away by a security guard!",
+        "በቦሌ አካባቢ የእሳት አደጋ ተከስቷል፣ ሐኪሞች ደርሰዋል።",
+        "Water pipe burst flooding the main street in Piassa",
+        "በቦሌ አካባቢ የእሳት አደጋ ተከስቷል ሀኪሞች ደርሰዋል",
+    ]
+    clusters = sorted(find_clusters(texts, threshold=0.8))
+    assert clusters == [[0, 2], [3, 5]]
+
+
+def test_large_bucket_of_identical_rows_forms_one_cluster():
+    texts = ["Road accident on the ring road"] * 500 + [
+        "House fire quickly spreading to the next building."
+    ]
+    clusters = find_clusters(texts, chunk_rows=64)
+    assert clusters == [list(range(500))]
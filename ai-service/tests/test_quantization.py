@@ -0,0 +1,31 @@
+import torch
+
+from utils.quantization import load_quantized, quantize_dynamic_int8, save_quantized
+
+
+def _toy_model():
+    torch.manual_seed(0)
+    return torch.nn.Sequential(
+        torch.nn.Linear(16, 32), torch.nn.ReLU(), torch.nn.Linear(32, 6)
+    ).eval()
+
+
+def test_quantize_dynamic_int8_replaces_linear_layers():
+    model = _toy_model()
+    quantized = quantize_dynamic_int8(_toy_model())
+    assert not any(type(m) is torch.nn.Linear for m in quantized.modules())
+
+    x = torch.randn(4, 16)
+    with torch.no_grad():
+        assert torch.allclose(model(x), quantized(x), atol=0.05)
+        assert torch.equal(model(x).argmax(-1), quantized(x).argmax(-1))
+
+
+def test_quantized_artifact_round_trip(tmp_path):
+    quantized = quantize_dynamic_int8(_toy_model())
+    save_quantized(quantized, tmp_path)
+    restored = load_quantized(tmp_path)
+
+    x = torch.randn(2, 16)
+    with torch.no_grad():
+        assert torch.equal(quantized(x), restored(x))
@@ -0,0 +1,119 @@
+import csv
+import json
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+import reclassify
+from utils.model_registry import ModelBundle, ModelRegistry
+
+AUTH = {"Authorization": "Bearer test-secret"}
+
+ROWS = [
+    {"id": "1", "title": "Fire", "description": "smoke at the market"},
+    {"id": "2", "title": "", "description": ""},
+    {"id": "3", "title": "Lost cat", "description": "near the park, please help"},
+    {"id": "4", "title": "", "description": "Car crash with injuries on the ring road"},
+    {"id": "5", "title": "House fire", "description": "flames, people trapped"},
+]
+
+
+@pytest.fixture
+def bundle(monkeypatch):
+    monkeypatch.setattr(main, "INTERNAL_SERVICE_SECRET", "test-secret")
+    monkeypatch.setattr(main, "prediction_cache", None)
+    bundle = ModelBundle(tokenizer=None, backend=None, version="test-model")
+    registry = ModelRegistry()
+    registry.activate(bundle)
+    monkeypatch.setattr(main, "registry", registry)
+    ready = threading.Event()
+    ready.set()
+    monkeypatch.setattr(main, "model_ready", ready)
+    monkeypatch.setattr(main, "predict_batch", fake_predict_batch)
+    return bundle
+
+
+def fake_predict_batch(texts, bundle=None):
+    return [
+        ("FIRE" if "fire" in t.lower() else "OTHER", round(0.5 + len(t) / 1000, 4))
+        for t in texts
+    ]
+
+
+def write_inputs(tmp_path):
+    csv_path = tmp_path / "export.csv"
+    with csv_path.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["id", "title", "description"])
+        writer.writeheader()
+        writer.writerows(ROWS[:3])
+    ndjson_path = tmp_path / "export.ndjson"
+    ndjson_path.write_text(
+        "".join(json.dumps(r) + "\n" for r in ROWS[3:]), encoding="utf-8"
+    )
+    return [csv_path, ndjson_path]
+
+
+def read_output(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_output_matches_classify_endpoint(bundle, tmp_path):
+    out = tmp_path / "out.ndjson"
+    state = reclassify.reclassify(
+        write_inputs(tmp_path),
+        out,
+        tmp_path / "state.json",
+        bundle,
+        chunk_rows=2,
+        batch_size=2,
+    )
+    assert (
+        state["complete"]
+        and state["rows"] == 5
+        and state["paths"] == {"model": 4, "empty": 1}
+    )
+
+    client = TestClient(main.app)
+    records = read_output(out)
+    assert [r["id"] for r in records] == ["1", "2", "3", "4", "5"]
+    for row, record in zip(ROWS, records):
+        expected = client.post(
+            "/classify",
+            json={"title": row["title"], "description": row["description"]},
+            headers=AUTH,
+        )
+        assert {k: record[k] for k in expected.json()} == expected.json()
+
+
+def test_interrupted_run_resumes_without_duplicates(bundle, tmp_path, monkeypatch):
+    inputs = write_inputs(tmp_path)
+    reclassify.reclassify(
+        inputs, tmp_path / "full.ndjson", tmp_path / "full.json", bundle, chunk_rows=2
+    )
+
+    calls = []
+
+    def crash_on_third_call(texts, bundle=None):
+        calls.append(texts)
+        if len(calls) == 3:
+            raise KeyboardInterrupt
+        return fake_predict_batch(texts, bundle)
+
+    out, state_path = tmp_path / "out.ndjson", tmp_path / "state.json"
+    monkeypatch.setattr(main, "predict_batch", crash_on_third_call)
+    with pytest.raises(KeyboardInterrupt):
+        reclassify.reclassify(inputs, out, state_path, bundle, chunk_rows=2)
+    with out.open("a", encoding="utf-8") as f:
+        f.write('{"id": "partial')  # a torn write past the checkpoint
+
+    monkeypatch.setattr(main, "predict_batch", fake_predict_batch)
+    state = reclassify.reclassify(inputs, out, state_path, bundle, chunk_rows=2)
+    assert state["rows"] == 5
+    assert out.read_text(encoding="utf-8") == (tmp_path / "full.ndjson").read_text(
+        encoding="utf-8"
+    )
+
+    with pytest.raises(SystemExit):
+        reclassify.reclassify(inputs[:1], out, state_path, bundle)
@@ -0,0 +1,131 @@
+import threading
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from utils.model_registry import ModelBundle, ModelRegistry
+from utils.similarity_index import SimilarityIndex
+
+AUTH = {"Authorization": "Bearer test-secret"}
+
+
+def _clustered(n, dim=32, clusters=200, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    return centers[rng.integers(0, clusters, n)] + rng.normal(scale=0.4, size=(n, dim))
+
+
+def test_ivf_search_recalls_exact_neighbours():
+    vectors = _clustered(6000)
+    index = SimilarityIndex(32, window_s=1e9, train_size=1000)
+    index.add_batch([str(i) for i in range(len(vectors))], vectors, timestamp=0.0)
+    assert index.stats()["lists"] > 0
+
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    queries = vectors[:30] + np.random.default_rng(1).normal(scale=0.2, size=(30, 32))
+    recall = 0.0
+    for q in queries:
+        exact = {str(i) for i in np.argsort(-(unit @ (q / np.linalg.norm(q))))[:10]}
+        recall += (
+            len(exact & {hit["id"] for hit in index.search(q, k=10, now=0.0)}) / 10
+        )
+    assert recall / len(queries) >= 0.9
+
+
+def test_window_evicts_old_rows_and_duplicate_ids_are_ignored():
+    index = SimilarityIndex(8, window_s=60)
+    v = np.eye(8)
+    assert index.add("a", v[0], "FIRE", timestamp=0)
+    assert not index.add("a", v[1], "FIRE", timestamp=10)
+    index.add("b", v[0] + 0.1 * v[1], "FIRE", timestamp=30)
+    hits = index.search(v[0], k=5, now=40)
+    assert [h["id"] for h in hits] == ["a", "b"]
+    assert hits[0]["category"] == "FIRE"
+
+    assert [h["id"] for h in index.search(v[0], k=5, now=70)] == ["b"]
+    assert "a" not in index and len(index) == 1
+    assert index.search(v[0], k=5, exclude_id="b", now=70) == []
+
+
+def test_save_and_load_round_trip(tmp_path):
+    vectors = _clustered(3000)
+    index = SimilarityIndex(32, window_s=1e9, train_size=1000, tag="model-a")
+    index.add_batch(
+        [f"inc-{i}" for i in range(len(vectors))],
+        vectors,
+        ["FIRE"] * len(vectors),
+        timestamp=5.0,
+    )
+    index.save(tmp_path / "index.npz")
+
+    restored = SimilarityIndex.load(tmp_path / "index.npz")
+    assert restored.tag == "model-a" and len(restored) == len(index)
+    assert restored.search(vectors[7], k=3, now=5.0) == index.search(
+        vectors[7], k=3, now=5.0
+    )
+
+
+def test_snapshot_is_a_copy_of_the_live_rows():
+    index = SimilarityIndex(4, window_s=10)
+    index.add("a", np.array([1.0, 0, 0, 0]), "FIRE", timestamp=0.0)
+    snapshot = index.snapshot()
+    index.add("b", np.array([0, 1.0, 0, 0]), "OTHER", timestamp=20.0)  # evicts "a"
+
+    assert snapshot["ids"] == ["a"] and snapshot["categories"] == ["FIRE"]
+    assert snapshot["vectors"][0].tolist() == [127, 0, 0, 0]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(main, "INTERNAL_SERVICE_SECRET", "test-secret")
+    monkeypatch.setattr(main, "prediction_cache", None)
+    registry = ModelRegistry()
+    bundle = ModelBundle(tokenizer=None, backend=None, version="test-model")
+    registry.activate(bundle)
+    monkeypatch.setattr(main, "registry", registry)
+    ready = threading.Event()
+    ready.set()
+    monkeypatch.setattr(main, "model_ready", ready)
+    monkeypatch.setattr(
+        main, "similar_index", SimilarityIndex(4, tag=main.cache_namespace(bundle))
+    )
+    return TestClient(main.app)
+
+
+def fake_predict_with_embeddings(texts, bundle=None):
+    # "fire" texts point one way, everything else another
+    return [
+        ("FIRE", 0.9, np.array([1.0, 0.1, 0, 0]))
+        if "fire" in t.lower()
+        else ("OTHER", 0.6, np.array([0, 0, 1.0, 0]))
+        for t in texts
+    ]
+
+
+def test_classify_returns_similar_recent_incidents(client, monkeypatch):
+    monkeypatch.setattr(main, "predict_with_embeddings", fake_predict_with_embeddings)
+
+    def post(incident_id, description):
+        payload = {"title": "", "description": description, "incident_id": incident_id}
+        return client.post("/classify", json=payload, headers=AUTH).json()
+
+    assert post("1", "Fire at the market")["similar_incidents"] == []
+    post("2", "Lost cat near the park")
+    third = post("3", "Market fire, big flames")
+    assert third["predicted_category"] == "FIRE"
+    assert [s["incident_id"] for s in third["similar_incidents"]] == ["1"]
+    assert third["similar_incidents"][0]["category"] == "FIRE"
+    assert len(main.similar_index) == 3
+
+
+def test_embed_returns_one_vector_per_text(client, monkeypatch):
+    monkeypatch.setattr(main, "predict_with_embeddings", fake_predict_with_embeddings)
+    monkeypatch.setattr(
+        main.registry.active,
+        "backend",
+        type("Backend", (), {"supports_embeddings": True})(),
+    )
+    body = client.post("/embed", json={"texts": ["fire", "cat"]}, headers=AUTH).json()
+    assert body["dim"] == 4 and len(body["embeddings"]) == 2
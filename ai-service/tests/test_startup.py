@@ -0,0 +1,76 @@
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from utils.model_registry import ModelBundle, ModelRegistry
+
+
+class _FakeBackend:
+    name = "fake"
+
+
+@pytest.fixture
+def fresh_state(monkeypatch):
+    monkeypatch.setattr(main, "model_ready", threading.Event())
+    monkeypatch.setattr(main, "model_load_error", None)
+    monkeypatch.setattr(main, "startup_timings", {})
+    monkeypatch.setattr(main, "INTERNAL_SERVICE_SECRET", "test-secret")
+    monkeypatch.setattr(main, "registry", ModelRegistry())
+    return TestClient(main.app)
+
+
+def test_live_answers_before_model_is_loaded(fresh_state):
+    assert fresh_state.get("/live").status_code == 200
+    res = fresh_state.get("/ready")
+    assert res.status_code == 503
+    assert res.headers["Retry-After"]
+    assert res.json()["status"] == "loading"
+
+
+def test_classify_returns_503_until_ready(fresh_state):
+    res = fresh_state.post(
+        "/classify",
+        json={"title": "Fire", "description": "smoke"},
+        headers={"Authorization": "Bearer test-secret"},
+    )
+    assert res.status_code == 503
+    assert "Retry-After" in res.headers
+
+
+def test_initialize_model_marks_service_ready(fresh_state, monkeypatch):
+    monkeypatch.setattr(
+        main, "load_model", lambda: ModelBundle(object(), _FakeBackend(), "v-test")
+    )
+    main.initialize_model(warmup=False)
+
+    res = fresh_state.get("/ready")
+    assert res.status_code == 200
+    assert res.json() == {"status": "ready", "model": "v-test"}
+    assert "time_to_ready_s" in main.startup_timings
+
+
+def test_failed_load_is_reported(fresh_state, monkeypatch):
+    def broken():
+        raise OSError("weights missing")
+
+    monkeypatch.setattr(main, "load_model", broken)
+    main.initialize_model()
+
+    assert not main.model_ready.is_set()
+    assert fresh_state.get("/ready").json()["status"] == "failed"
+    health = fresh_state.get(
+        "/health", headers={"Authorization": "Bearer test-secret"}
+    ).json()
+    assert health["startup"]["error"] == "weights missing"
+
+
+def test_lifespan_skips_loading_when_model_preloaded(fresh_state, monkeypatch):
+    # serve.py loads the model in the parent before forking workers
+    calls = []
+    monkeypatch.setattr(main, "start_model_loading", lambda: calls.append(1))
+    main.model_ready.set()
+    with TestClient(main.app) as client:
+        assert client.get("/live").status_code == 200
+    assert calls == []
@@ -0,0 +1,48 @@
+from utils.sweep import (
+    ProgressLog,
+    parameter_grid,
+    pruned_at,
+    rank_trials,
+    should_prune,
+)
+
+
+def test_parameter_grid_is_full_product_or_seeded_sample():
+    space = {"learning_rate": [1e-5, 2e-5, 5e-5], "epochs": [2, 3], "batch": [8]}
+    grid = parameter_grid(space)
+    assert len(grid) == 6 and {"learning_rate": 5e-5, "epochs": 3, "batch": 8} in grid
+    sample = parameter_grid(space, trials=4, seed=1)
+    assert len(sample) == 4 and sample == parameter_grid(space, trials=4, seed=1)
+    assert all(p in grid for p in sample)
+
+
+def test_median_rule_needs_enough_peers_at_the_same_epoch(tmp_path):
+    log = ProgressLog(tmp_path / "progress.jsonl")
+    for trial, f1 in [("a", 0.80), ("b", 0.70), ("c", 0.60)]:
+        log.record(trial=trial, epoch=1, macro_f1=f1)
+    log.record(trial="a", epoch=2, macro_f1=0.9)
+    entries = log.read()
+
+    assert should_prune(entries, "d", 1, 0.65, min_trials=3)
+    assert not should_prune(entries, "d", 1, 0.75, min_trials=3)
+    assert not should_prune(
+        entries, "d", 2, 0.10, min_trials=3
+    )  # only one peer at epoch 2
+    assert not should_prune(entries, "d", 1, 0.65, min_trials=3, warmup_epochs=1)
+    # a trial's own reports do not count as peers
+    assert not should_prune(entries, "c", 1, 0.60, min_trials=3)
+
+
+def test_pruned_trials_and_ranking(tmp_path):
+    log = ProgressLog(tmp_path / "progress.jsonl")
+    log.record(trial="b", pruned_at=1)
+    assert pruned_at(log.read(), "b") == 1 and pruned_at(log.read(), "a") is None
+
+    ranked = rank_trials(
+        [
+            {"trial": "a", "macro_f1": 0.7},
+            {"trial": "b", "macro_f1": None},
+            {"trial": "c", "macro_f1": 0.9},
+        ]
+    )
+    assert [r["trial"] for r in ranked] == ["c", "a", "b"]
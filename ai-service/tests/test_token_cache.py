@@ -0,0 +1,52 @@
+from datasets import Dataset
+from tokenizers import Tokenizer, models, pre_tokenizers
+from transformers import PreTrainedTokenizerFast
+
+from utils.token_cache import cache_key, tokenize_cached
+
+
+def _tokenizer():
+    vocab = {"[PAD]": 0, "[UNK]": 1, "fire": 2, "near": 3, "market": 4, "crash": 5}
+    backend = Tokenizer(models.WordLevel(vocab, unk_token="[UNK]"))
+    backend.pre_tokenizer = pre_tokenizers.Whitespace()
+    return PreTrainedTokenizerFast(
+        tokenizer_object=backend, pad_token="[PAD]", unk_token="[UNK]"
+    )
+
+
+def _dataset():
+    return Dataset.from_dict(
+        {"text": ["fire near market", "crash", "market fire"], "label": [0, 3, 0]}
+    )
+
+
+def test_second_run_reads_the_same_tokens_from_cache(tmp_path, capsys):
+    tokenizer = _tokenizer()
+    first = tokenize_cached(_dataset(), tokenizer, tmp_path, max_length=8)
+    second = tokenize_cached(_dataset(), tokenizer, tmp_path, max_length=8)
+
+    out = capsys.readouterr().out
+    assert "Token cache miss" in out and "Token cache hit" in out
+    assert second["input_ids"] == first["input_ids"] == [[2, 3, 4], [5], [4, 2]]
+    assert second["label"] == [0, 3, 0]
+    assert len(list(tmp_path.iterdir())) == 1
+
+
+def test_key_depends_on_texts_and_settings_but_not_call_state():
+    tokenizer = _tokenizer()
+    texts = ["fire near market"]
+    key = cache_key(texts, tokenizer, 128, False)
+    tokenizer(
+        texts, truncation=True, max_length=16
+    )  # leaves truncation state on the backend
+
+    assert cache_key(texts, tokenizer, 128, False) == key
+    assert cache_key(texts, tokenizer, 64, False) != key
+    assert cache_key(texts, tokenizer, 128, "max_length") != key
+    assert cache_key(["fire near the market"], tokenizer, 128, False) != key
+
+
+def test_disabled_cache_still_tokenizes(tmp_path):
+    ds = tokenize_cached(_dataset(), _tokenizer(), None, max_length=2)
+    assert ds["input_ids"] == [[2, 3], [5], [4, 2]]
+    assert ds.column_names == ["text", "label", "input_ids", "attention_mask"]
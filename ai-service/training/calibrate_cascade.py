@@ -0,0 +1,113 @@
+"""
+Calibrate the heuristic-first cascade (CASCADE_MODE=on) against the model.
+
+Usage (from ai-service/):
+  python training/calibrate_cascade.py --data data/incidents_labeled.csv --save_report cascade_report.json
+
+For every candidate threshold it reports the skip rate (share of rows answered by
+keywords alone), agreement between the keyword answer and the model on skipped
+rows, end-to-end accuracy against the gold labels and expected per-request
+latency. Stage latencies are measured per row: keyword stage on its own, model
+stage as batched inference divided by batch size.
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import main  # noqa: E402
+from utils.cascade import threshold_table  # noqa: E402
+
+LABEL_ALIASES = {"POLICE": "CRIME"}
+THRESHOLDS = [0.5, 0.6, 0.7, 0.75, 0.8, 0.85, 0.875, 0.9, 0.95, 1.0]
+
+
+def main_cli():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--data", type=Path, nargs="+", default=[Path("data/incidents_labeled.csv")]
+    )
+    parser.add_argument("--batch", type=int, default=16)
+    parser.add_argument(
+        "--min_agreement",
+        type=float,
+        default=0.98,
+        help="Recommend the lowest threshold whose skipped rows agree with the model at least this often",
+    )
+    parser.add_argument(
+        "--save_report", type=Path, help="Optional path to save JSON report"
+    )
+    args = parser.parse_args()
+
+    main.initialize_model(warmup=False)
+    if not main.model_ready.is_set():
+        raise SystemExit(f"Model failed to load: {main.model_load_error}")
+
+    df = pd.concat([pd.read_csv(p) for p in args.data], ignore_index=True)
+    texts = df["text"].astype(str).tolist()
+    gold = df["category"].tolist()
+
+    stage1, stage1_ms = [], []
+    for text in texts:
+        t0 = time.perf_counter()
+        stage1.append(main.cascade_evidence(text))
+        stage1_ms.append((time.perf_counter() - t0) * 1000.0)
+
+    model_preds, model_ms = [], []
+    for i in range(0, len(texts), args.batch):
+        chunk = texts[i : i + args.batch]
+        t0 = time.perf_counter()
+        model_preds.extend(label for label, _ in main.predict_batch(chunk))
+        model_ms.extend([(time.perf_counter() - t0) * 1000.0 / len(chunk)] * len(chunk))
+
+    mean_stage1 = float(np.mean(stage1_ms))
+    mean_model = float(np.mean(model_ms))
+    model_accuracy = float(
+        np.mean(
+            [
+                LABEL_ALIASES.get(pred, pred) == LABEL_ALIASES.get(label, label)
+                for pred, label in zip(model_preds, gold)
+            ]
+        )
+    )
+
+    rows = threshold_table(stage1, model_preds, gold, THRESHOLDS, LABEL_ALIASES)
+    for row in rows:
+        row["expected_latency_ms"] = round(
+            mean_stage1 + (1 - row["skip_rate"]) * mean_model, 4
+        )
+
+    eligible = [
+        r
+        for r in rows
+        if r["skipped"] and r["agreement_with_model"] >= args.min_agreement
+    ]
+    report = {
+        "model": main.registry.active.version,
+        "data": [str(p) for p in args.data],
+        "rows": len(texts),
+        "model_accuracy": round(model_accuracy, 4),
+        "stage_latency_ms": {
+            "keywords": round(mean_stage1, 4),
+            "model": round(mean_model, 4),
+        },
+        "thresholds": rows,
+        "recommended_threshold": min(r["threshold"] for r in eligible)
+        if eligible
+        else None,
+    }
+
+    print(json.dumps(report, indent=2))
+    if args.save_report:
+        args.save_report.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Saved report to {args.save_report}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,163 @@
+"""
+Compare fp32 and dynamic-INT8 serving on accuracy, latency and model size.
+
+Usage (from ai-service/):
+  python training/compare_quantization.py --model models/afroxlmr_incident_classifier \
+    --data data/incidents_labeled.csv --extra_data data/incidents_am_aug.csv \
+    --golden data/golden_amharic.csv data/golden_multilingual.csv \
+    --save_report models/afroxlmr_incident_classifier/quantization_report.json --save_artifact
+
+Exits non-zero when the golden macro-F1 drop exceeds --max_f1_drop, so it can gate
+switching a deployment to QUANTIZATION=dynamic.
+"""
+
+import argparse
+import copy
+import io
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import torch
+from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+from evaluate_model import LABEL_NAMES, load_dataset, predict
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from utils.evaluation import classification_report  # noqa: E402
+from utils.quantization import quantize_dynamic_int8, save_quantized  # noqa: E402
+
+
+def model_size_mb(model) -> float:
+    buf = io.BytesIO()
+    torch.save(model.state_dict(), buf)
+    return round(buf.tell() / (1024 * 1024), 2)
+
+
+def score(model, tokenizer, df, batch_size: int):
+    preds = predict(model, tokenizer, df["text"].astype(str).tolist(), batch_size)
+    groups = df["lang"].tolist() if "lang" in df.columns else None
+    report = classification_report(
+        df["label"].to_numpy(), preds, LABEL_NAMES, groups=groups
+    )
+    return report, preds
+
+
+def latency(model, tokenizer, texts, samples: int):
+    """Per-request latency as served by /classify: one text per forward pass."""
+    timings = []
+    for text in texts[:samples]:
+        inputs = tokenizer(text, truncation=True, max_length=128, return_tensors="pt")
+        t0 = time.perf_counter()
+        with torch.no_grad():
+            model(**inputs)
+        timings.append((time.perf_counter() - t0) * 1000.0)
+    return {
+        "samples": len(timings),
+        "p50_ms": round(float(np.percentile(timings, 50)), 2),
+        "p95_ms": round(float(np.percentile(timings, 95)), 2),
+        "mean_ms": round(float(np.mean(timings)), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--model", type=Path, default=Path("models/afroxlmr_incident_classifier")
+    )
+    parser.add_argument(
+        "--data", type=Path, nargs="+", default=[Path("data/incidents_labeled.csv")]
+    )
+    parser.add_argument(
+        "--extra_data", type=Path, nargs="*", help="Additional CSVs to include"
+    )
+    parser.add_argument(
+        "--golden",
+        type=Path,
+        nargs="*",
+        default=[Path("data/golden_amharic.csv"), Path("data/golden_multilingual.csv")],
+    )
+    parser.add_argument("--batch", type=int, default=8)
+    parser.add_argument("--latency_samples", type=int, default=200)
+    parser.add_argument(
+        "--max_f1_drop",
+        type=float,
+        default=0.02,
+        help="Allowed golden macro-F1 drop (absolute)",
+    )
+    parser.add_argument(
+        "--save_report", type=Path, help="Optional path to save JSON report"
+    )
+    parser.add_argument(
+        "--save_artifact",
+        action="store_true",
+        help="Write model_int8.pt into --model so QUANTIZATION=dynamic skips the fp32 load",
+    )
+    args = parser.parse_args()
+
+    tokenizer = AutoTokenizer.from_pretrained(args.model)
+    fp32 = AutoModelForSequenceClassification.from_pretrained(args.model)
+    fp32.eval()
+    int8 = quantize_dynamic_int8(copy.deepcopy(fp32))
+
+    eval_df, _ = load_dataset(args.data + (args.extra_data or []))
+    golden_df, _ = load_dataset(args.golden) if args.golden else (None, None)
+    latency_texts = eval_df["text"].astype(str).tolist()
+
+    report = {"model": str(args.model), "variants": {}}
+    golden_preds = {}
+    for name, model in (("fp32", fp32), ("int8", int8)):
+        entry = {"size_mb": model_size_mb(model)}
+        entry["eval"], _ = score(model, tokenizer, eval_df, args.batch)
+        if golden_df is not None:
+            entry["golden"], golden_preds[name] = score(
+                model, tokenizer, golden_df, args.batch
+            )
+        entry["latency"] = latency(
+            model, tokenizer, latency_texts, args.latency_samples
+        )
+        report["variants"][name] = entry
+
+    fp, q = report["variants"]["fp32"], report["variants"]["int8"]
+    report["delta"] = {
+        "eval_macro_f1": round(
+            q["eval"]["overall"]["macro_f1"] - fp["eval"]["overall"]["macro_f1"], 4
+        ),
+        "size_ratio": round(q["size_mb"] / fp["size_mb"], 3),
+        "latency_p50_speedup": round(
+            fp["latency"]["p50_ms"] / q["latency"]["p50_ms"], 2
+        ),
+    }
+    if golden_df is not None:
+        report["delta"]["golden_macro_f1"] = round(
+            q["golden"]["overall"]["macro_f1"] - fp["golden"]["overall"]["macro_f1"], 4
+        )
+        report["delta"]["golden_agreement"] = round(
+            float(
+                np.mean(
+                    np.array(golden_preds["fp32"]) == np.array(golden_preds["int8"])
+                )
+            ),
+            4,
+        )
+
+    print(json.dumps(report, indent=2))
+    if args.save_report:
+        Path(args.save_report).write_text(
+            json.dumps(report, indent=2), encoding="utf-8"
+        )
+        print(f"Saved report to {args.save_report}")
+    if args.save_artifact:
+        print(f"Saved INT8 artifact to {save_quantized(int8, args.model)}")
+
+    drop = -report["delta"].get("golden_macro_f1", report["delta"]["eval_macro_f1"])
+    if drop > args.max_f1_drop:
+        raise SystemExit(
+            f"INT8 macro-F1 drop {drop:.4f} exceeds allowed {args.max_f1_drop}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,380 @@
+"""
+Distil the fine-tuned incident classifier into a smaller student.
+
+The student is either the teacher truncated to --student_layers encoder layers
+(evenly spaced layers copied from the teacher, same tokenizer and embeddings) or
+any compact encoder given with --student_model. It is trained on the teacher's
+temperature-softened logits mixed with the hard labels, on the same train split
+as train_incident_classifier.py. The output directory holds the same files and
+metadata.json format as the teacher, so the service can serve it unchanged:
+write it under models/ and POST /admin/reload {"model_dir": "<dir name>"}, or
+copy it over models/afroxlmr_incident_classifier (the directory loaded at
+startup) and restart.
+
+Usage (inside a virtualenv, from training/):
+  python distill_incident_classifier.py --teacher ../models/afroxlmr_incident_classifier \
+    --data ../data/incidents_labeled.csv --extra_data ../data/incidents_am_aug.csv \
+    --student_layers 4 --output ../models/afroxlmr_incident_student
+
+Writes distillation_report.json next to the student: size, parameter count,
+single-request latency, inference memory and overall/per-language macro-F1 for
+teacher and student on the validation split and golden sets. Memory is measured
+in a fresh process per model (loaded from its saved directory, then predicting
+the validation split): RSS before loading, after loading and at peak, and
+model_peak_mb = peak - before, the part attributable to the model.
+"""
+
+import argparse
+import copy
+import json
+import multiprocessing
+import os
+import re
+import resource
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+from sklearn.metrics import accuracy_score, f1_score
+from transformers import (
+    AutoModelForSequenceClassification,
+    AutoTokenizer,
+    DataCollatorWithPadding,
+    Trainer,
+    TrainingArguments,
+)
+
+from compare_quantization import latency, model_size_mb, score
+from evaluate_model import LABEL_NAMES, predict
+from evaluate_model import load_dataset as load_eval_dataset
+from train_incident_classifier import load_dataset
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from utils.batching import length_grouped_batches, pad_sequences  # noqa: E402
+from utils.token_cache import tokenize_cached  # noqa: E402
+
+LAYER_KEY = re.compile(r"^(.*\.layer\.)(\d+)(\..*)$")
+
+
+def truncated_student(teacher, num_layers: int):
+    """Copy of `teacher` keeping `num_layers` evenly spaced encoder layers (first and last included)."""
+    total = teacher.config.num_hidden_layers
+    if not 0 < num_layers < total:
+        raise SystemExit(f"--student_layers must be between 1 and {total - 1}")
+    keep = [int(i) for i in np.linspace(0, total - 1, num_layers).round()]
+    config = copy.deepcopy(teacher.config)
+    config.num_hidden_layers = num_layers
+    student = AutoModelForSequenceClassification.from_config(config)
+
+    state = {}
+    for key, value in teacher.state_dict().items():
+        match = LAYER_KEY.match(key)
+        if match is None:
+            state[key] = value
+        elif int(match.group(2)) in keep:
+            state[
+                f"{match.group(1)}{keep.index(int(match.group(2)))}{match.group(3)}"
+            ] = value
+    student.load_state_dict(state)
+    print(f"Student keeps teacher layers {keep} of {total}")
+    return student, keep
+
+
+def teacher_logits(model, tokenizer, texts, batch_size: int) -> np.ndarray:
+    """Teacher logits for `texts`, computed once up front rather than every epoch."""
+    encoded = tokenizer(list(texts), truncation=True, max_length=128)["input_ids"]
+    out = np.zeros((len(texts), model.config.num_labels), dtype=np.float32)
+    for idx in length_grouped_batches([len(ids) for ids in encoded], batch_size):
+        input_ids, attention_mask = pad_sequences(
+            [encoded[i] for i in idx], tokenizer.pad_token_id
+        )
+        with torch.no_grad():
+            logits = model(
+                input_ids=torch.from_numpy(input_ids),
+                attention_mask=torch.from_numpy(attention_mask),
+            ).logits
+        out[idx] = logits.float().numpy()
+    return out
+
+
+class DistillationTrainer(Trainer):
+    """Trainer whose loss mixes KL to the teacher's softened logits with cross-entropy on the labels."""
+
+    def __init__(self, *args, temperature: float = 2.0, alpha: float = 0.5, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.temperature = temperature
+        self.alpha = alpha
+
+    def compute_loss(self, model, inputs, return_outputs=False, **kwargs):
+        soft_targets = inputs.pop("teacher_logits")
+        outputs = model(**inputs)
+        t = self.temperature
+        distill = F.kl_div(
+            F.log_softmax(outputs.logits / t, dim=-1),
+            F.softmax(soft_targets / t, dim=-1),
+            reduction="batchmean",
+        ) * (t * t)
+        loss = self.alpha * distill + (1 - self.alpha) * outputs.loss
+        return (loss, outputs) if return_outputs else loss
+
+
+def _rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        pages = int(f.read().split()[1])
+    return round(pages * os.sysconf("SC_PAGE_SIZE") / 2**20, 1)
+
+
+def _memory_probe(model_dir: str, texts, batch_size: int, results) -> None:
+    before = _rss_mb()
+    model = AutoModelForSequenceClassification.from_pretrained(model_dir).eval()
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    loaded = _rss_mb()
+    predict(model, tokenizer, texts, batch_size)
+    peak = round(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+    )  # KiB on Linux
+    results.put(
+        {
+            "rss_before_load_mb": before,
+            "rss_loaded_mb": loaded,
+            "peak_rss_mb": peak,
+            "model_peak_mb": round(peak - before, 1),
+        }
+    )
+
+
+def inference_memory(model_dir: Path, texts, batch_size: int) -> dict:
+    """RSS of a fresh process that loads `model_dir` and predicts `texts` (see the module docstring)."""
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    proc = ctx.Process(
+        target=_memory_probe, args=(str(model_dir), list(texts), batch_size, results)
+    )
+    proc.start()
+    try:
+        return results.get(timeout=1800)
+    finally:
+        proc.join()
+
+
+def side_by_side(models, val_df, golden_df, batch_size: int, latency_samples: int):
+    report = {}
+    texts = val_df["text"].astype(str).tolist()
+    for name, (model, tokenizer, model_dir) in models.items():
+        entry = {
+            "parameters": sum(p.numel() for p in model.parameters()),
+            "size_mb": model_size_mb(model),
+            "memory": inference_memory(model_dir, texts, batch_size),
+        }
+        entry["eval"], _ = score(model, tokenizer, val_df, batch_size)
+        if golden_df is not None:
+            entry["golden"], _ = score(model, tokenizer, golden_df, batch_size)
+        entry["latency"] = latency(model, tokenizer, texts, latency_samples)
+        report[name] = entry
+
+    teacher, student = report["teacher"], report["student"]
+    report["delta"] = {
+        "size_ratio": round(student["size_mb"] / teacher["size_mb"], 3),
+        "model_peak_memory_ratio": round(
+            student["memory"]["model_peak_mb"] / teacher["memory"]["model_peak_mb"], 3
+        ),
+        "latency_p50_speedup": round(
+            teacher["latency"]["p50_ms"] / student["latency"]["p50_ms"], 2
+        ),
+        "eval_macro_f1": round(
+            student["eval"]["overall"]["macro_f1"]
+            - teacher["eval"]["overall"]["macro_f1"],
+            4,
+        ),
+        "eval_macro_f1_per_language": {
+            lang: round(
+                m["macro_f1"] - teacher["eval"]["per_language"][lang]["macro_f1"], 4
+            )
+            for lang, m in student["eval"]["per_language"].items()
+            if lang in teacher["eval"]["per_language"]
+        },
+    }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--teacher", default="../models/afroxlmr_incident_classifier")
+    parser.add_argument(
+        "--data",
+        default="../data/incidents_labeled.csv",
+        help="CSV with text,category,severity",
+    )
+    parser.add_argument(
+        "--extra_data",
+        nargs="*",
+        help="Optional additional CSV files to append for training (same schema as --data)",
+    )
+    parser.add_argument("--output", default="../models/afroxlmr_incident_student")
+    parser.add_argument(
+        "--student_layers",
+        type=int,
+        default=4,
+        help="Encoder layers kept from the teacher",
+    )
+    parser.add_argument(
+        "--student_model",
+        default=None,
+        help="Train this pretrained encoder as the student instead of truncating the teacher",
+    )
+    parser.add_argument("--temperature", type=float, default=2.0)
+    parser.add_argument(
+        "--alpha",
+        type=float,
+        default=0.5,
+        help="Weight of the distillation loss vs. hard labels",
+    )
+    parser.add_argument("--epochs", type=int, default=5)
+    parser.add_argument("--batch", type=int, default=16)
+    parser.add_argument("--learning_rate", type=float, default=5e-5)
+    parser.add_argument(
+        "--version_tag", default=None, help="Version tag to store in metadata.json"
+    )
+    parser.add_argument(
+        "--golden",
+        nargs="*",
+        default=["../data/golden_amharic.csv", "../data/golden_multilingual.csv"],
+    )
+    parser.add_argument("--latency_samples", type=int, default=200)
+    parser.add_argument(
+        "--token_cache",
+        default=str(Path(__file__).resolve().parent.parent / ".cache" / "tokenized"),
+        help="Directory for tokenized datasets reused across runs ('' disables)",
+    )
+    args = parser.parse_args()
+
+    ds, label2id, id2label = load_dataset(
+        args.data, LABEL_NAMES, extra_paths=args.extra_data
+    )
+    teacher_tokenizer = AutoTokenizer.from_pretrained(args.teacher)
+    teacher = AutoModelForSequenceClassification.from_pretrained(args.teacher)
+    teacher.eval()
+    teacher_meta_path = Path(args.teacher) / "metadata.json"
+    teacher_meta = (
+        json.loads(teacher_meta_path.read_text(encoding="utf-8"))
+        if teacher_meta_path.exists()
+        else {}
+    )
+
+    if args.student_model:
+        tokenizer = AutoTokenizer.from_pretrained(args.student_model)
+        student = AutoModelForSequenceClassification.from_pretrained(
+            args.student_model,
+            num_labels=len(LABEL_NAMES),
+            id2label=id2label,
+            label2id=label2id,
+        )
+        kept_layers = None
+    else:
+        tokenizer = teacher_tokenizer
+        student, kept_layers = truncated_student(teacher, args.student_layers)
+
+    def add_teacher_logits(split):
+        logits = teacher_logits(teacher, teacher_tokenizer, split["text"], args.batch)
+        return split.add_column("teacher_logits", logits.tolist())
+
+    train_ds = tokenize_cached(
+        add_teacher_logits(ds["train"]), tokenizer, args.token_cache or None
+    )
+    val_ds = tokenize_cached(
+        add_teacher_logits(ds["test"]), tokenizer, args.token_cache or None
+    )
+    cols = ["input_ids", "attention_mask", "label", "teacher_logits"]
+    train_ds.set_format(type="torch", columns=cols)
+    val_ds.set_format(type="torch", columns=cols)
+
+    def compute_metrics(pred):
+        labels = pred.label_ids
+        preds = np.argmax(pred.predictions, axis=-1)
+        return {
+            "accuracy": accuracy_score(labels, preds),
+            "macro_f1": f1_score(labels, preds, average="macro"),
+        }
+
+    training_args = TrainingArguments(
+        output_dir=args.output,
+        evaluation_strategy="epoch",
+        save_strategy="epoch",
+        logging_strategy="steps",
+        logging_steps=50,
+        per_device_train_batch_size=args.batch,
+        per_device_eval_batch_size=args.batch,
+        num_train_epochs=args.epochs,
+        learning_rate=args.learning_rate,
+        weight_decay=0.01,
+        load_best_model_at_end=True,
+        metric_for_best_model="macro_f1",
+        save_total_limit=2,
+        group_by_length=True,
+        # teacher_logits is not a model input; keep it for compute_loss
+        remove_unused_columns=False,
+    )
+
+    trainer = DistillationTrainer(
+        model=student,
+        args=training_args,
+        train_dataset=train_ds,
+        eval_dataset=val_ds,
+        tokenizer=tokenizer,
+        data_collator=DataCollatorWithPadding(tokenizer),
+        compute_metrics=compute_metrics,
+        temperature=args.temperature,
+        alpha=args.alpha,
+    )
+    trainer.train()
+    trainer.save_model(args.output)
+    tokenizer.save_pretrained(args.output)
+    student.eval()
+
+    val_df = ds["test"].to_pandas()
+    golden_df = load_eval_dataset(args.golden)[0] if args.golden else None
+    report = side_by_side(
+        {
+            "teacher": (teacher, teacher_tokenizer, args.teacher),
+            "student": (student, tokenizer, args.output),
+        },
+        val_df,
+        golden_df,
+        args.batch,
+        args.latency_samples,
+    )
+
+    metadata = {
+        "trained_at": datetime.utcnow().isoformat() + "Z",
+        "base_model": args.student_model or str(args.teacher),
+        "version_tag": args.version_tag
+        or f"{teacher_meta.get('version_tag', 'unversioned')}-student",
+        "train_rows": len(ds["train"]),
+        "val_rows": len(ds["test"]),
+        "padding": "dynamic",
+        "label2id": label2id,
+        "id2label": id2label,
+        "metrics": report["student"]["eval"],
+        "distillation": {
+            "teacher": str(args.teacher),
+            "teacher_version": teacher_meta.get("version_tag"),
+            "student_layers": kept_layers,
+            "temperature": args.temperature,
+            "alpha": args.alpha,
+        },
+    }
+    out = Path(args.output)
+    (out / "metadata.json").write_text(json.dumps(metadata, indent=2), encoding="utf-8")
+    (out / "distillation_report.json").write_text(
+        json.dumps(report, indent=2), encoding="utf-8"
+    )
+
+    print("\nSaved student model + tokenizer to", args.output)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -3,100 +3,338 @@ Evaluate a trained incident classifier with per-language metrics.
 
 Usage:
   python evaluate_model.py --model ../models/afroxlmr_incident_classifier --data ../data/incidents_labeled.csv --extra_data ../data/incidents_am_aug.csv
+
+Streaming mode for large exports (memory independent of the number of rows):
+reads each CSV in --chunk_rows chunks, predicts chunk by chunk and only keeps
+running confusion matrices. With --state the counts and read position are
+checkpointed after every chunk, so an interrupted run resumes where it stopped.
+--num_shards/--shard_index split the rows across processes (row i of each file
+goes to shard i % num_shards). Merge the shard states with --merge:
+
+  python evaluate_model.py --stream --data export.csv --num_shards 4 --shard_index 0 --state shard0.json
+  ...
+  python evaluate_model.py --merge shard0.json shard1.json shard2.json shard3.json --save_report report.json
 """
 
 import argparse
 import json
+import os
+import sys
 from pathlib import Path
 
 import pandas as pd
-from datasets import Dataset
 import torch
+from datasets import Dataset
 from transformers import AutoModelForSequenceClassification, AutoTokenizer
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from utils.batching import length_grouped_batches, pad_sequences  # noqa: E402
+from utils.evaluation import ConfusionAccumulator, classification_report  # noqa: E402
+from utils.token_cache import tokenize_cached  # noqa: E402
+
 LABEL_NAMES = ["FIRE", "MEDICAL", "CRIME", "TRAFFIC", "INFRASTRUCTURE", "OTHER"]
+# Older golden files use the keyword-category name for crime reports.
+LABEL_ALIASES = {"POLICE": "CRIME"}
+
+
+def _label_rows(df):
+    """Map categories to label ids, dropping rows with unknown categories. Returns (df, dropped categories)."""
+    label2id = {l: i for i, l in enumerate(LABEL_NAMES)}
+    df["category"] = df["category"].replace(LABEL_ALIASES)
+    df["label"] = df["category"].map(label2id)
+    unknown = []
+    if df["label"].isnull().any():
+        unknown = df.loc[df["label"].isnull(), "category"].unique().tolist()
+        df = df[~df["label"].isnull()].reset_index(drop=True)
+    df["label"] = df["label"].astype(int)
+    return df, unknown
 
 
 def load_dataset(paths):
     dfs = [pd.read_csv(p) for p in paths]
-    df = pd.concat(dfs, ignore_index=True)
-    label2id = {l: i for i, l in enumerate(LABEL_NAMES)}
-    df["label"] = df["category"].map(label2id).astype(int)
-    return df, label2id
+    df, unknown_cats = _label_rows(pd.concat(dfs, ignore_index=True))
+    if unknown_cats:
+        print(f"Dropping rows with unknown categories: {unknown_cats}")
+    return df, {name: i for i, name in enumerate(LABEL_NAMES)}
 
 
-def _metrics(labels, preds, num_labels: int):
-    total = len(labels)
-    correct = sum(1 for a, b in zip(labels, preds) if a == b)
-    accuracy = correct / total if total else 0.0
+def predict(
+    model, tokenizer, texts, batch_size: int, padding: str = "dynamic", encoded=None
+):
+    """
+    Return predicted class ids for `texts`, in input order. With dynamic padding,
+    `encoded` may hold the texts' input_ids already (e.g. from the token cache).
+    """
+    preds = [0] * len(texts)
+    if padding == "max_length":
+        for i in range(0, len(texts), batch_size):
+            inputs = tokenizer(
+                list(texts[i : i + batch_size]),
+                truncation=True,
+                padding="max_length",
+                max_length=128,
+                return_tensors="pt",
+            )
+            with torch.no_grad():
+                preds[i : i + batch_size] = (
+                    model(**inputs).logits.argmax(dim=-1).cpu().tolist()
+                )
+        return preds
 
-    per_label_f1 = []
-    for cls in range(num_labels):
-        tp = sum(1 for a, p in zip(labels, preds) if a == cls and p == cls)
-        fp = sum(1 for a, p in zip(labels, preds) if a != cls and p == cls)
-        fn = sum(1 for a, p in zip(labels, preds) if a == cls and p != cls)
-        precision = tp / (tp + fp) if (tp + fp) else 0.0
-        recall = tp / (tp + fn) if (tp + fn) else 0.0
-        f1 = (2 * precision * recall / (precision + recall)) if (precision + recall) else 0.0
-        per_label_f1.append(f1)
-    macro_f1 = sum(per_label_f1) / num_labels if num_labels else 0.0
-    return {"accuracy": accuracy, "macro_f1": macro_f1}
+    # Dynamic padding: group rows of similar length and pad each batch only to its longest row.
+    if encoded is None:
+        encoded = tokenizer(list(texts), truncation=True, max_length=128)["input_ids"]
+    for idx in length_grouped_batches([len(ids) for ids in encoded], batch_size):
+        input_ids, attention_mask = pad_sequences(
+            [encoded[i] for i in idx], tokenizer.pad_token_id
+        )
+        with torch.no_grad():
+            outputs = model(
+                input_ids=torch.from_numpy(input_ids),
+                attention_mask=torch.from_numpy(attention_mask),
+            )
+        for i, pred in zip(idx, outputs.logits.argmax(dim=-1).cpu().tolist()):
+            preds[i] = pred
+    return preds
 
 
-def evaluate(model_path: Path, data_paths, batch_size: int):
+def evaluate(
+    model_path: Path,
+    data_paths,
+    batch_size: int,
+    padding: str = "dynamic",
+    token_cache=None,
+):
     df, label2id = load_dataset(data_paths)
     tokenizer = AutoTokenizer.from_pretrained(model_path)
     model = AutoModelForSequenceClassification.from_pretrained(model_path)
     model.eval()
 
-    def preprocess(batch):
-        return tokenizer(batch["text"], truncation=True, padding="max_length", max_length=128)
+    texts = df["text"].astype(str).tolist()
+    encoded = None
+    if token_cache and padding == "dynamic":
+        encoded = tokenize_cached(
+            Dataset.from_dict({"text": texts}), tokenizer, token_cache
+        )["input_ids"]
+    all_preds = predict(
+        model, tokenizer, texts, batch_size, padding=padding, encoded=encoded
+    )
 
-    ds = Dataset.from_pandas(df[["text", "label", "lang"]] if "lang" in df.columns else df[["text", "label"]])
-    ds = ds.map(preprocess, batched=True)
-    ds.set_format(type="torch", columns=["input_ids", "attention_mask", "label"])
+    groups = df["lang"].tolist() if "lang" in df.columns else None
+    report = classification_report(
+        df["label"].to_numpy(), all_preds, LABEL_NAMES, groups=groups
+    )
+    return report
 
-    # Manual batching to avoid full-mem load
-    all_preds: list[int] = []
-    for i in range(0, len(ds), batch_size):
-        batch = ds.select(range(i, min(i + batch_size, len(ds))))
-        with torch.no_grad():  # type: ignore[name-defined]
-            outputs = model(
-                input_ids=batch["input_ids"],
-                attention_mask=batch["attention_mask"],
+
+def _new_state(data_paths, shard_index: int, num_shards: int) -> dict:
+    return {
+        "files": [str(p) for p in data_paths],
+        "shard_index": shard_index,
+        "num_shards": num_shards,
+        "position": {"file": 0, "row": 0},
+        "rows": 0,
+        "dropped": 0,
+        "complete": False,
+        "counts": ConfusionAccumulator(LABEL_NAMES).to_dict(),
+    }
+
+
+def _save_state(state: dict, path: Path) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(state), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def evaluate_stream(
+    model_path: Path,
+    data_paths,
+    batch_size: int,
+    chunk_rows: int = 10000,
+    shard_index: int = 0,
+    num_shards: int = 1,
+    state_path: Path = None,
+):
+    """
+    Evaluate `data_paths` chunk by chunk and return the final state; see the module
+    docstring. If `state_path` exists it must describe the same files and shard.
+    """
+    state = _new_state(data_paths, shard_index, num_shards)
+    if state_path and state_path.exists():
+        saved = json.loads(state_path.read_text(encoding="utf-8"))
+        keys = ("files", "shard_index", "num_shards")
+        if any(saved[k] != state[k] for k in keys):
+            raise SystemExit(
+                f"{state_path} belongs to a different run ({', '.join(f'{k}={saved[k]}' for k in keys)})"
             )
-            preds = outputs.logits.argmax(dim=-1).cpu().tolist()
-            all_preds.extend(preds)
-
-    labels = list(ds["label"])
-    base_metrics = _metrics(labels, all_preds, num_labels=len(LABEL_NAMES))
-
-    per_lang = {}
-    if "lang" in df.columns:
-        for lang in df["lang"].unique():
-            mask = df["lang"] == lang
-            idx = [i for i, flag in enumerate(mask) if flag]
-            l_labels = [labels[i] for i in idx]
-            l_preds = [all_preds[i] for i in idx]
-            per_lang[lang] = {**_metrics(l_labels, l_preds, num_labels=len(LABEL_NAMES)), "count": int(mask.sum())}
-
-    report = {"overall": base_metrics, "per_language": per_lang}
-    return report
+        state = saved
+        if state["complete"]:
+            print(f"{state_path} is already complete ({state['rows']} rows)")
+            return state
+        print(
+            f"Resuming from {state_path}: file {state['position']['file']}, row {state['position']['row']}"
+        )
+
+    tokenizer = AutoTokenizer.from_pretrained(model_path)
+    model = AutoModelForSequenceClassification.from_pretrained(model_path)
+    model.eval()
+    counts = ConfusionAccumulator.from_dict(state["counts"])
+    unknown_cats = set()
+
+    for file_idx, path in enumerate(data_paths):
+        if file_idx < state["position"]["file"]:
+            continue
+        row = state["position"]["row"] if file_idx == state["position"]["file"] else 0
+        # Skip already-scored rows without parsing them into frames
+        reader = pd.read_csv(path, chunksize=chunk_rows, skiprows=range(1, row + 1))
+        for chunk in reader:
+            positions = pd.RangeIndex(row, row + len(chunk))
+            row += len(chunk)
+            chunk = chunk[(positions % num_shards == shard_index)].reset_index(
+                drop=True
+            )
+            total = len(chunk)
+            chunk, unknown = _label_rows(chunk)
+            unknown_cats.update(unknown)
+            if len(chunk):
+                preds = predict(
+                    model, tokenizer, chunk["text"].astype(str).tolist(), batch_size
+                )
+                groups = chunk["lang"].tolist() if "lang" in chunk.columns else None
+                counts.update(chunk["label"].to_numpy(), preds, groups)
+
+            state["rows"] += len(chunk)
+            state["dropped"] += total - len(chunk)
+            state["position"] = {"file": file_idx, "row": row}
+            state["counts"] = counts.to_dict()
+            if state_path:
+                _save_state(state, state_path)
+            print(f"{path}: {row} rows read, {state['rows']} scored")
+        state["position"] = {"file": file_idx + 1, "row": 0}
+
+    state["complete"] = True
+    state["counts"] = counts.to_dict()
+    if state_path:
+        _save_state(state, state_path)
+    if unknown_cats:
+        print(f"Dropped rows with unknown categories: {sorted(map(str, unknown_cats))}")
+    return state
+
+
+def merge_states(state_paths):
+    """Combine shard states into one report. Every shard of the run must be present and complete."""
+    states = [json.loads(Path(p).read_text(encoding="utf-8")) for p in state_paths]
+    first = states[0]
+    shards = sorted(s["shard_index"] for s in states)
+    if any(
+        s["files"] != first["files"] or s["num_shards"] != first["num_shards"]
+        for s in states
+    ):
+        raise SystemExit("States come from different runs (files or num_shards differ)")
+    if shards != list(range(first["num_shards"])):
+        raise SystemExit(f"Expected shards 0..{first['num_shards'] - 1}, got {shards}")
+    incomplete = [str(p) for p, s in zip(state_paths, states) if not s["complete"]]
+    if incomplete:
+        raise SystemExit(f"Incomplete shards (resume them first): {incomplete}")
+    counts = ConfusionAccumulator.from_dict(first["counts"]).merge(
+        ConfusionAccumulator.from_dict(s["counts"]) for s in states[1:]
+    )
+    return _stream_report(counts, states)
+
+
+def _stream_report(counts: ConfusionAccumulator, states) -> dict:
+    return {
+        **counts.report(),
+        "rows": sum(s["rows"] for s in states),
+        "dropped_rows": sum(s["dropped"] for s in states),
+        "shards": len(states),
+    }
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
-    parser.add_argument("--model", type=Path, default=Path("../models/afroxlmr_incident_classifier"))
-    parser.add_argument("--data", type=Path, nargs="+", default=[Path("../data/incidents_labeled.csv")])
-    parser.add_argument("--extra_data", type=Path, nargs="*", help="Additional CSVs to include")
+    parser.add_argument(
+        "--model", type=Path, default=Path("../models/afroxlmr_incident_classifier")
+    )
+    parser.add_argument(
+        "--data", type=Path, nargs="+", default=[Path("../data/incidents_labeled.csv")]
+    )
+    parser.add_argument(
+        "--extra_data", type=Path, nargs="*", help="Additional CSVs to include"
+    )
     parser.add_argument("--batch", type=int, default=8)
-    parser.add_argument("--save_report", type=Path, help="Optional path to save JSON report")
+    parser.add_argument(
+        "--padding",
+        choices=["dynamic", "max_length"],
+        default="dynamic",
+        help="dynamic: length-grouped batches padded to their longest row; max_length: pad every row to 128",
+    )
+    parser.add_argument(
+        "--save_report", type=Path, help="Optional path to save JSON report"
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Read the CSVs in chunks (dynamic padding only)",
+    )
+    parser.add_argument(
+        "--chunk_rows",
+        type=int,
+        default=10000,
+        help="Rows read per chunk in --stream mode",
+    )
+    parser.add_argument("--num_shards", type=int, default=1)
+    parser.add_argument("--shard_index", type=int, default=0)
+    parser.add_argument(
+        "--state",
+        type=Path,
+        help="Checkpoint file for --stream; resumes from it if present",
+    )
+    parser.add_argument(
+        "--merge",
+        type=Path,
+        nargs="+",
+        help="Merge --stream state files into one report",
+    )
+    parser.add_argument(
+        "--token_cache",
+        default=str(Path(__file__).resolve().parent.parent / ".cache" / "tokenized"),
+        help="Directory for tokenized datasets reused across runs ('' disables; not used with --stream)",
+    )
     args = parser.parse_args()
 
     paths = args.data + (args.extra_data or [])
-    report = evaluate(args.model, paths, batch_size=args.batch)
+    if args.merge:
+        report = merge_states(args.merge)
+    elif args.stream:
+        if not 0 <= args.shard_index < args.num_shards:
+            parser.error("--shard_index must be in [0, --num_shards)")
+        if args.padding != "dynamic":
+            parser.error("--stream supports --padding dynamic only")
+        state = evaluate_stream(
+            args.model,
+            paths,
+            batch_size=args.batch,
+            chunk_rows=args.chunk_rows,
+            shard_index=args.shard_index,
+            num_shards=args.num_shards,
+            state_path=args.state,
+        )
+        report = _stream_report(
+            ConfusionAccumulator.from_dict(state["counts"]), [state]
+        )
+    else:
+        report = evaluate(
+            args.model,
+            paths,
+            batch_size=args.batch,
+            padding=args.padding,
+            token_cache=args.token_cache,
+        )
 
     print(json.dumps(report, indent=2))
     if args.save_report:
-        Path(args.save_report).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        Path(args.save_report).write_text(
+            json.dumps(report, indent=2), encoding="utf-8"
+        )
         print(f"Saved report to {args.save_report}")
@@ -0,0 +1,186 @@
+"""
+Export the fine-tuned incident classifier to ONNX and check parity with torch.
+
+Usage (from ai-service/, after pip install -r requirements-export.txt):
+  python training/export_onnx.py --model models/afroxlmr_incident_classifier --optimize
+
+Writes model.onnx (and model.optimized.onnx with --optimize) next to the torch
+weights, so INFERENCE_BACKEND=onnx can serve from the same directory. Parity is
+checked on data/golden_*.csv: max absolute logit difference must stay below --atol
+and every argmax must match, otherwise the script exits non-zero.
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import torch
+from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from utils.backends import ONNX_MODEL_NAME, ONNX_OPTIMIZED_MODEL_NAME, TorchBackend  # noqa: E402
+from utils.batching import length_grouped_batches, pad_sequences  # noqa: E402
+
+MAX_LENGTH = 128
+
+
+def export(model, tokenizer, out_path: Path, opset: int):
+    sample = tokenizer(
+        ["fire near the market", "እሳት"], padding=True, return_tensors="pt"
+    )
+    torch.onnx.export(
+        model,
+        (sample["input_ids"], sample["attention_mask"]),
+        str(out_path),
+        input_names=["input_ids", "attention_mask"],
+        output_names=["logits"],
+        dynamic_axes={
+            "input_ids": {0: "batch", 1: "sequence"},
+            "attention_mask": {0: "batch", 1: "sequence"},
+            "logits": {0: "batch"},
+        },
+        opset_version=opset,
+        do_constant_folding=True,
+    )
+
+
+def optimize(src: Path, dst: Path):
+    """Run onnxruntime's offline graph optimizations (fusions, constant folding)."""
+    import onnxruntime as ort
+
+    options = ort.SessionOptions()
+    # EXTENDED fusions are portable across CPUs; ENABLE_ALL layout changes are applied at load time.
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED
+    options.optimized_model_filepath = str(dst)
+    ort.InferenceSession(str(src), options, providers=["CPUExecutionProvider"])
+
+
+def logits_for(backend, tokenizer, texts, batch_size: int) -> np.ndarray:
+    encoded = tokenizer(texts, truncation=True, max_length=MAX_LENGTH)["input_ids"]
+    out = np.zeros((len(texts), backend.config.num_labels), dtype=np.float32)
+    for idx in length_grouped_batches([len(ids) for ids in encoded], batch_size):
+        input_ids, attention_mask = pad_sequences(
+            [encoded[i] for i in idx], tokenizer.pad_token_id
+        )
+        out[idx] = backend.logits(input_ids, attention_mask)
+    return out
+
+
+def request_latency(backend, tokenizer, texts, repeats: int = 5):
+    """p50/p99 of single-text forward passes, the shape /classify serves."""
+    timings = []
+    for _ in range(repeats):
+        for text in texts:
+            input_ids, attention_mask = pad_sequences(
+                [tokenizer(text, truncation=True, max_length=MAX_LENGTH)["input_ids"]],
+                tokenizer.pad_token_id,
+            )
+            t0 = time.perf_counter()
+            backend.logits(input_ids, attention_mask)
+            timings.append((time.perf_counter() - t0) * 1000.0)
+    return {
+        "p50_ms": round(float(np.percentile(timings, 50)), 3),
+        "p99_ms": round(float(np.percentile(timings, 99)), 3),
+    }
+
+
+def check_parity(torch_backend, onnx_path: Path, tokenizer, texts, batch_size: int):
+    from utils.backends import OnnxBackend
+
+    onnx_backend = OnnxBackend(onnx_path, torch_backend.config)
+    ref = logits_for(torch_backend, tokenizer, texts, batch_size)
+    got = logits_for(onnx_backend, tokenizer, texts, batch_size)
+    return {
+        "onnx_model": onnx_path.name,
+        "rows": len(texts),
+        "max_abs_diff": float(np.abs(ref - got).max()) if len(texts) else 0.0,
+        "argmax_agreement": float((ref.argmax(-1) == got.argmax(-1)).mean())
+        if len(texts)
+        else 1.0,
+        "latency": request_latency(onnx_backend, tokenizer, texts),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--model", type=Path, default=Path("models/afroxlmr_incident_classifier")
+    )
+    parser.add_argument(
+        "--output", type=Path, help="Output directory (defaults to --model)"
+    )
+    parser.add_argument("--opset", type=int, default=14)
+    parser.add_argument(
+        "--optimize", action="store_true", help="Also write a graph-optimized model"
+    )
+    parser.add_argument(
+        "--golden",
+        type=Path,
+        nargs="*",
+        default=sorted(
+            (Path(__file__).resolve().parent.parent / "data").glob("golden_*.csv")
+        ),
+    )
+    parser.add_argument("--batch", type=int, default=8)
+    parser.add_argument(
+        "--atol", type=float, default=1e-3, help="Max allowed absolute logit difference"
+    )
+    args = parser.parse_args()
+
+    out_dir = args.output or args.model
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    tokenizer = AutoTokenizer.from_pretrained(args.model)
+    model = AutoModelForSequenceClassification.from_pretrained(args.model)
+    model.eval()
+    if out_dir != args.model:
+        tokenizer.save_pretrained(out_dir)
+        model.config.save_pretrained(out_dir)
+
+    onnx_path = out_dir / ONNX_MODEL_NAME
+    export(model, tokenizer, onnx_path, args.opset)
+    print(f"Exported {onnx_path} ({onnx_path.stat().st_size / 1e6:.1f} MB)")
+    targets = [onnx_path]
+    if args.optimize:
+        optimized = out_dir / ONNX_OPTIMIZED_MODEL_NAME
+        optimize(onnx_path, optimized)
+        print(f"Wrote graph-optimized {optimized}")
+        targets.append(optimized)
+
+    texts = []
+    for path in args.golden:
+        texts.extend(pd.read_csv(path)["text"].astype(str).tolist())
+
+    torch_backend = TorchBackend(model)
+    report = {
+        "golden": [str(p) for p in args.golden],
+        "atol": args.atol,
+        "torch_latency": request_latency(torch_backend, tokenizer, texts),
+        "parity": [],
+    }
+    for path in targets:
+        report["parity"].append(
+            check_parity(torch_backend, path, tokenizer, texts, args.batch)
+        )
+    print(json.dumps(report, indent=2))
+    (out_dir / "onnx_parity.json").write_text(
+        json.dumps(report, indent=2), encoding="utf-8"
+    )
+
+    failed = [
+        p
+        for p in report["parity"]
+        if p["max_abs_diff"] > args.atol or p["argmax_agreement"] < 1.0
+    ]
+    if failed:
+        raise SystemExit(
+            f"ONNX parity check failed for {[p['onnx_model'] for p in failed]}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,370 @@
+"""
+Hyperparameter sweep for the incident classifier.
+
+Runs train_incident_classifier.py once per combination of learning rate, epochs,
+batch size and weight decay (or a seeded random sample of --trials of them),
+--parallel trials at a time. Each trial gets cores / parallel intra-op threads,
+an optional address-space cap (--trial_memory_gb, POSIX only) and an optional
+wall-clock limit (--trial_timeout_s).
+
+Weak trials stop early: after every epoch a trial reports its validation
+macro-F1 to a shared progress file and stops when it is below the median of at
+least --prune_min_trials other trials at the same epoch (utils/sweep.py).
+
+The dataset is tokenized once, up front, into the token cache; every trial then
+loads the same memory-mapped Arrow files. The split is the training script's
+(test_size 0.2, seed 42), so all trials are scored on the same validation rows.
+
+Outputs under --work_dir: trials/<id>/ (model, metadata.json, train.log),
+progress.jsonl and leaderboard.json, rewritten as trials finish. The best trial
+is then promoted to --output in the layout the service loads (weights,
+tokenizer, metadata.json with a "sweep" block). An existing --output is moved
+aside to <output>.prev first so no stale ONNX/INT8 artifacts survive. Load it
+with POST /admin/reload.
+
+Usage:
+  python sweep_incident_classifier.py --data ../data/incidents_labeled.csv --extra_data ../data/incidents_am_aug.csv \\
+      --learning_rates 1e-5,2e-5,3e-5,5e-5 --epochs 2,3,4 --batches 8,16 --parallel 4
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+
+from transformers import AutoTokenizer
+
+from train_incident_classifier import load_dataset
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from utils.sweep import ProgressLog, parameter_grid, pruned_at, rank_trials  # noqa: E402
+from utils.token_cache import tokenize_cached  # noqa: E402
+
+TRAIN_SCRIPT = Path(__file__).resolve().parent / "train_incident_classifier.py"
+LABEL_NAMES = ["FIRE", "MEDICAL", "CRIME", "TRAFFIC", "INFRASTRUCTURE", "OTHER"]
+
+
+def _floats(value: str):
+    return [float(v) for v in value.split(",") if v.strip()]
+
+
+def _ints(value: str):
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def memory_cap(limit_bytes: int):
+    """
+    preexec_fn capping a trial's address space, or None when no cap applies.
+    RLIMIT_AS is POSIX-only: without the resource module (Windows) the cap is off.
+    """
+    if not limit_bytes:
+        return None
+    try:
+        import resource
+    except ImportError:
+        print(
+            "--trial_memory_gb needs the POSIX resource module; trial memory limit is off"
+        )
+        return None
+
+    def cap():
+        resource.setrlimit(resource.RLIMIT_AS, (limit_bytes, limit_bytes))
+
+    return cap
+
+
+def warm_token_cache(args) -> None:
+    """Tokenize the train/validation split once so every trial reads it from the cache."""
+    ds, _, _ = load_dataset(args.data, LABEL_NAMES, extra_paths=args.extra_data)
+    tokenizer = AutoTokenizer.from_pretrained(args.model_name)
+    padding = False if args.padding == "dynamic" else "max_length"
+    for split in ("train", "test"):
+        tokenize_cached(
+            ds[split], tokenizer, args.token_cache, max_length=128, padding=padding
+        )
+
+
+def run_trial(
+    trial: str, params: dict, threads: int, work_dir: Path, args, preexec_fn=None
+) -> dict:
+    out_dir = work_dir / "trials" / trial
+    out_dir.mkdir(parents=True, exist_ok=True)
+    cmd = [
+        sys.executable,
+        str(TRAIN_SCRIPT),
+        "--data",
+        str(args.data),
+        "--model_name",
+        args.model_name,
+        "--output",
+        str(out_dir),
+        "--learning_rate",
+        str(params["learning_rate"]),
+        "--epochs",
+        str(params["epochs"]),
+        "--batch",
+        str(params["batch"]),
+        "--weight_decay",
+        str(params["weight_decay"]),
+        "--padding",
+        args.padding,
+        "--bf16",
+        args.bf16,
+        "--threads",
+        str(threads),
+        "--token_cache",
+        args.token_cache,
+        "--version_tag",
+        trial,
+        "--sweep_progress",
+        str(work_dir / "progress.jsonl"),
+        "--trial_id",
+        trial,
+        "--prune_min_trials",
+        str(args.prune_min_trials),
+        "--prune_warmup_epochs",
+        str(args.prune_warmup_epochs),
+    ]
+    if args.extra_data:
+        cmd += ["--extra_data", *[str(p) for p in args.extra_data]]
+    env = {**os.environ, "OMP_NUM_THREADS": str(threads)}
+
+    started = time.perf_counter()
+    status = "completed"
+    with (out_dir / "train.log").open("w", encoding="utf-8") as log:
+        try:
+            proc = subprocess.run(
+                cmd,
+                env=env,
+                stdout=log,
+                stderr=subprocess.STDOUT,
+                preexec_fn=preexec_fn,
+                timeout=args.trial_timeout_s or None,
+            )
+            if proc.returncode != 0:
+                status = "failed"
+        except subprocess.TimeoutExpired:
+            status = "timeout"
+    for checkpoint in out_dir.glob("checkpoint-*"):
+        shutil.rmtree(
+            checkpoint, ignore_errors=True
+        )  # the best weights are already saved at the top level
+
+    result = {
+        "trial": trial,
+        "params": params,
+        "status": status,
+        "macro_f1": None,
+        "accuracy": None,
+    }
+    meta_path = out_dir / "metadata.json"
+    if status == "completed" and meta_path.exists():
+        metadata = json.loads(meta_path.read_text(encoding="utf-8"))
+        overall = metadata["metrics"]["overall"]
+        result.update(
+            macro_f1=round(overall["macro_f1"], 4),
+            accuracy=round(overall["accuracy"], 4),
+            per_language_macro_f1={
+                lang: round(m["macro_f1"], 4)
+                for lang, m in metadata["metrics"].get("per_language", {}).items()
+            },
+            epochs_run=metadata["training"]["epochs_run"],
+        )
+        stopped = pruned_at(ProgressLog(work_dir / "progress.jsonl").read(), trial)
+        if stopped is not None:
+            result.update(status="pruned", pruned_at_epoch=stopped)
+    result.update(
+        runtime_s=round(time.perf_counter() - started, 1), output=str(out_dir)
+    )
+    return result
+
+
+def write_leaderboard(work_dir: Path, results: list, args) -> Path:
+    path = work_dir / "leaderboard.json"
+    board = {
+        "model_name": args.model_name,
+        "data": [str(args.data), *[str(p) for p in args.extra_data or []]],
+        "metric": "validation macro_f1",
+        "trials": rank_trials(results),
+    }
+    path.write_text(json.dumps(board, indent=2), encoding="utf-8")
+    return path
+
+
+def promote(best: dict, output: Path, leaderboard: Path, version_tag: str) -> None:
+    """Copy the best trial to `output` as a fresh directory; a previous model there moves to <output>.prev."""
+    staging = output.with_name(output.name + ".staging")
+    shutil.rmtree(staging, ignore_errors=True)
+    shutil.copytree(
+        best["output"],
+        staging,
+        ignore=shutil.ignore_patterns("checkpoint-*", "train.log"),
+    )
+    meta_path = staging / "metadata.json"
+    metadata = json.loads(meta_path.read_text(encoding="utf-8"))
+    metadata["version_tag"] = version_tag
+    metadata["sweep"] = {
+        "trial": best["trial"],
+        "params": best["params"],
+        "status": best["status"],
+        "leaderboard": str(leaderboard),
+    }
+    meta_path.write_text(json.dumps(metadata, indent=2), encoding="utf-8")
+
+    if output.exists() or output.is_symlink():
+        previous = output.with_name(output.name + ".prev")
+        if previous.is_symlink() or previous.is_file():
+            previous.unlink()
+        else:
+            shutil.rmtree(previous, ignore_errors=True)
+        os.rename(output, previous)
+        print(f"Moved the previous model to {previous}")
+    os.rename(staging, output)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--data", type=Path, default=Path("../data/incidents_labeled.csv")
+    )
+    parser.add_argument("--extra_data", type=Path, nargs="*")
+    parser.add_argument("--model_name", default="Davlan/afro-xlmr-base")
+    parser.add_argument(
+        "--output", type=Path, default=Path("../models/afroxlmr_incident_classifier")
+    )
+    parser.add_argument(
+        "--work_dir",
+        type=Path,
+        help="Trial outputs, progress and leaderboard (default ../.cache/sweeps/<UTC timestamp>)",
+    )
+    parser.add_argument("--learning_rates", default="1e-5,2e-5,3e-5,5e-5")
+    parser.add_argument("--epochs", default="2,3,4")
+    parser.add_argument("--batches", default="8,16")
+    parser.add_argument("--weight_decays", default="0.01")
+    parser.add_argument(
+        "--trials",
+        type=int,
+        default=0,
+        help="Random sample of this many combinations (0 = all)",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--parallel",
+        type=int,
+        default=0,
+        help="Concurrent trials (0 = one per core, at most the trial count)",
+    )
+    parser.add_argument(
+        "--trial_memory_gb",
+        type=float,
+        default=0,
+        help="Address-space cap per trial (0 = none; POSIX only)",
+    )
+    parser.add_argument(
+        "--trial_timeout_s",
+        type=float,
+        default=0,
+        help="Wall-clock limit per trial (0 = none)",
+    )
+    parser.add_argument(
+        "--prune_min_trials",
+        type=int,
+        default=3,
+        help="Other trials needed at an epoch before pruning",
+    )
+    parser.add_argument(
+        "--prune_warmup_epochs",
+        type=int,
+        default=0,
+        help="Never prune at or before this epoch",
+    )
+    parser.add_argument(
+        "--padding", choices=["dynamic", "max_length"], default="dynamic"
+    )
+    parser.add_argument("--bf16", choices=["auto", "on", "off"], default="auto")
+    parser.add_argument(
+        "--token_cache",
+        default=str(Path(__file__).resolve().parent.parent / ".cache" / "tokenized"),
+        help="Directory for the shared tokenized dataset",
+    )
+    parser.add_argument(
+        "--version_tag",
+        help="Version tag of the promoted model (default sweep-<timestamp>-<trial>)",
+    )
+    parser.add_argument(
+        "--no_promote", action="store_true", help="Only write the leaderboard"
+    )
+    args = parser.parse_args()
+    if not args.token_cache:
+        parser.error(
+            "--token_cache is required: trials share the tokenized dataset through it"
+        )
+
+    stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
+    work_dir = (
+        args.work_dir
+        or Path(__file__).resolve().parent.parent / ".cache" / "sweeps" / stamp
+    )
+    work_dir.mkdir(parents=True, exist_ok=True)
+    space = {
+        "learning_rate": _floats(args.learning_rates),
+        "epochs": _ints(args.epochs),
+        "batch": _ints(args.batches),
+        "weight_decay": _floats(args.weight_decays),
+    }
+    grid = parameter_grid(space, args.trials, args.seed)
+    cores = os.cpu_count() or 1
+    parallel = min(len(grid), args.parallel or cores)
+    threads = max(1, cores // parallel)
+    print(
+        f"Sweep of {len(grid)} trials, {parallel} at a time with {threads} threads each, in {work_dir}"
+    )
+
+    # Trials are forked after the tokenizer has been used here
+    os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+    warm_token_cache(args)
+
+    preexec_fn = memory_cap(int(args.trial_memory_gb * 1024**3))
+    results = []
+    with ThreadPoolExecutor(max_workers=parallel) as pool:
+        futures = {
+            pool.submit(
+                run_trial, f"t{i:03d}", params, threads, work_dir, args, preexec_fn
+            ): params
+            for i, params in enumerate(grid)
+        }
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            write_leaderboard(work_dir, results, args)
+            print(
+                f"[{len(results)}/{len(grid)}] {result['trial']} {result['status']} "
+                f"macro_f1={result['macro_f1']} {result['params']}"
+            )
+
+    leaderboard = write_leaderboard(work_dir, results, args)
+    print(f"Saved leaderboard to {leaderboard}")
+    ranked = rank_trials(results)
+    best = ranked[0] if ranked and ranked[0]["macro_f1"] is not None else None
+    if best is None:
+        print("No trial finished; nothing to promote")
+        sys.exit(1)
+    print(f"Best: {best['trial']} macro_f1={best['macro_f1']} {best['params']}")
+    if not args.no_promote:
+        promote(
+            best,
+            args.output,
+            leaderboard,
+            args.version_tag or f"sweep-{stamp}-{best['trial']}",
+        )
+        print(f"Promoted {best['trial']} to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,23 +6,43 @@ Usage (inside a virtualenv):
   python train_incident_classifier.py --data ../data/incidents_labeled.csv --extra_data ../data/incidents_am_aug.csv --output ../models/afroxlmr_incident_classifier
 
 This is sized for a small GPU/Colab. Adjust batch sizes/epochs as needed.
+
+Data-parallel training on multi-core CPU hosts (DDP over gloo), one process per
+group of cores; each process sees 1/N of every epoch:
+  torchrun --standalone --nproc_per_node 4 train_incident_classifier.py --data ... --grad_accum 2
+
+Every process uses --threads intra-op threads (default: cores / processes per
+node). --bf16 auto turns on bf16 autocast when the CPU (or GPU) has native bf16
+support. The effective batch is --batch x --grad_accum x processes. Only rank 0
+writes checkpoints, the tokenizer and metadata.json; metadata.json records the
+world size, effective batch and measured training throughput.
 """
 
 import argparse
 import json
+import os
+import sys
+import time
 from datetime import datetime
 from pathlib import Path
 import numpy as np
 import pandas as pd
+import torch
 from datasets import Dataset
 from sklearn.metrics import accuracy_score, f1_score
 from transformers import (
     AutoModelForSequenceClassification,
     AutoTokenizer,
+    DataCollatorWithPadding,
     Trainer,
+    TrainerCallback,
     TrainingArguments,
 )
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from utils.sweep import ProgressLog, should_prune  # noqa: E402
+from utils.token_cache import tokenize_cached  # noqa: E402
+
 
 def load_dataset(path: str, label_names, extra_paths=None):
     df_list = [pd.read_csv(path)]
@@ -51,9 +71,67 @@ def load_dataset(path: str, label_names, extra_paths=None):
     return ds, label2id, id2label
 
 
+def bf16_supported(use_cpu: bool) -> bool:
+    if not use_cpu:
+        return torch.cuda.is_bf16_supported()
+    # oneDNN runs bf16 natively on AVX512-BF16 / AMX cores; elsewhere it is emulated and slower than fp32
+    return torch.ops.mkldnn._is_mkldnn_bf16_supported()
+
+
+class ThroughputCallback(TrainerCallback):
+    """Wall time spent in optimizer steps only (evaluation and checkpointing excluded)."""
+
+    def __init__(self):
+        self.steps = 0
+        self.seconds = 0.0
+        self._started = None
+        self.epochs = 0.0
+
+    def on_step_begin(self, args, state, control, **kwargs):
+        self._started = time.perf_counter()
+
+    def on_step_end(self, args, state, control, **kwargs):
+        if self._started is not None:
+            self.seconds += time.perf_counter() - self._started
+            self.steps += 1
+            self._started = None
+        self.epochs = state.epoch or 0.0
+
+
+class MedianStoppingCallback(TrainerCallback):
+    """Reports each epoch's macro-F1 to a sweep's progress file and stops below the median of the other trials."""
+
+    def __init__(
+        self, progress: ProgressLog, trial: str, min_trials: int, warmup_epochs: int
+    ):
+        self.progress = progress
+        self.trial = trial
+        self.min_trials = min_trials
+        self.warmup_epochs = warmup_epochs
+
+    def on_evaluate(self, args, state, control, metrics=None, **kwargs):
+        if not metrics or "eval_macro_f1" not in metrics:
+            return
+        epoch, value = int(round(state.epoch)), float(metrics["eval_macro_f1"])
+        others = self.progress.read()
+        self.progress.record(trial=self.trial, epoch=epoch, macro_f1=value)
+        if epoch < args.num_train_epochs and should_prune(
+            others, self.trial, epoch, value, self.min_trials, self.warmup_epochs
+        ):
+            print(
+                f"Trial {self.trial}: macro-F1 {value:.4f} below the sweep median at epoch {epoch}, stopping"
+            )
+            self.progress.record(trial=self.trial, pruned_at=epoch)
+            control.should_training_stop = True
+
+
 def main():
     parser = argparse.ArgumentParser()
-    parser.add_argument("--data", default="../data/incidents_labeled.csv", help="CSV with text,category,severity")
+    parser.add_argument(
+        "--data",
+        default="../data/incidents_labeled.csv",
+        help="CSV with text,category,severity",
+    )
     parser.add_argument(
         "--extra_data",
         nargs="*",
@@ -63,28 +141,121 @@ def main():
     parser.add_argument("--output", default="../models/afroxlmr_incident_classifier")
     parser.add_argument("--epochs", type=int, default=3)
     parser.add_argument("--batch", type=int, default=8)
-    parser.add_argument("--version_tag", default=None, help="Version tag to store in metadata.json")
+    parser.add_argument("--learning_rate", type=float, default=2e-5)
+    parser.add_argument("--weight_decay", type=float, default=0.01)
+    parser.add_argument(
+        "--version_tag", default=None, help="Version tag to store in metadata.json"
+    )
+    parser.add_argument(
+        "--padding",
+        choices=["dynamic", "max_length"],
+        default="dynamic",
+        help="dynamic: pad each length-grouped batch to its longest row; max_length: pad every row to 128",
+    )
+    parser.add_argument(
+        "--grad_accum", type=int, default=1, help="Gradient accumulation steps"
+    )
+    parser.add_argument(
+        "--bf16",
+        choices=["auto", "on", "off"],
+        default="auto",
+        help="bf16 autocast; auto = on when the hardware supports bf16 natively",
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=0,
+        help="Intra-op threads per process (0 = cores / processes)",
+    )
+    parser.add_argument(
+        "--max_steps",
+        type=int,
+        default=-1,
+        help="Stop after this many optimizer steps (-1 = epochs)",
+    )
+    parser.add_argument(
+        "--token_cache",
+        default=str(Path(__file__).resolve().parent.parent / ".cache" / "tokenized"),
+        help="Directory for tokenized datasets reused across runs ('' disables)",
+    )
+    # Set by sweep_incident_classifier.py for each trial
+    parser.add_argument("--sweep_progress", help=argparse.SUPPRESS)
+    parser.add_argument("--trial_id", default="", help=argparse.SUPPRESS)
+    parser.add_argument(
+        "--prune_min_trials", type=int, default=3, help=argparse.SUPPRESS
+    )
+    parser.add_argument(
+        "--prune_warmup_epochs", type=int, default=0, help=argparse.SUPPRESS
+    )
     args = parser.parse_args()
 
     label_names = ["FIRE", "MEDICAL", "CRIME", "TRAFFIC", "INFRASTRUCTURE", "OTHER"]
-    ds, label2id, id2label = load_dataset(args.data, label_names, extra_paths=args.extra_data)
+    dynamic_padding = args.padding == "dynamic"
 
-    tokenizer = AutoTokenizer.from_pretrained(args.model_name)
+    # Set by torchrun; 1 for a plain `python train_incident_classifier.py`
+    world_size = int(os.environ.get("WORLD_SIZE", "1"))
+    local_world_size = int(os.environ.get("LOCAL_WORLD_SIZE", "1"))
+    use_cpu = not torch.cuda.is_available()
+    if use_cpu:
+        torch.set_num_threads(
+            args.threads or max(1, (os.cpu_count() or 1) // local_world_size)
+        )
+    bf16 = args.bf16 == "on" or (args.bf16 == "auto" and bf16_supported(use_cpu))
 
-    def preprocess(batch):
-        return tokenizer(
-            batch["text"],
-            truncation=True,
-            padding="max_length",
-            max_length=128,
+    training_args = TrainingArguments(
+        output_dir=args.output,
+        evaluation_strategy="epoch",
+        save_strategy="epoch",
+        logging_strategy="steps",
+        logging_steps=50,
+        per_device_train_batch_size=args.batch,
+        per_device_eval_batch_size=args.batch,
+        gradient_accumulation_steps=args.grad_accum,
+        num_train_epochs=args.epochs,
+        max_steps=args.max_steps,
+        learning_rate=args.learning_rate,
+        weight_decay=args.weight_decay,
+        load_best_model_at_end=True,
+        metric_for_best_model="macro_f1",
+        save_total_limit=2,
+        # Length-grouped sampling keeps similarly sized rows together so dynamic
+        # padding has little to pad.
+        group_by_length=dynamic_padding,
+        use_cpu=use_cpu,
+        bf16=bf16,
+        # Only under torchrun: a backend without a process group breaks plain single-process runs
+        ddp_backend="gloo" if use_cpu and world_size > 1 else None,
+        # Every XLM-R parameter gets a gradient; skipping the unused-parameter search saves a graph walk per step
+        ddp_find_unused_parameters=False,
+    )
+    is_main = training_args.process_index == 0
+
+    # Rank 0 tokenizes (and fills the token cache) first; the other ranks then read the cache
+    with training_args.main_process_first(desc="tokenize"):
+        ds, label2id, id2label = load_dataset(
+            args.data, label_names, extra_paths=args.extra_data
         )
+        tokenizer = AutoTokenizer.from_pretrained(args.model_name)
 
-    train_ds_raw = ds["train"]
-    val_ds_raw = ds["test"]
-    val_langs = val_ds_raw["lang"] if "lang" in val_ds_raw.column_names else None
+        train_ds_raw = ds["train"]
+        val_ds_raw = ds["test"]
+        val_langs = val_ds_raw["lang"] if "lang" in val_ds_raw.column_names else None
 
-    train_ds = train_ds_raw.map(preprocess, batched=True)
-    val_ds = val_ds_raw.map(preprocess, batched=True)
+        padding = False if dynamic_padding else "max_length"
+        train_ds = tokenize_cached(
+            train_ds_raw,
+            tokenizer,
+            args.token_cache or None,
+            max_length=128,
+            padding=padding,
+        )
+        val_ds = tokenize_cached(
+            val_ds_raw,
+            tokenizer,
+            args.token_cache or None,
+            max_length=128,
+            padding=padding,
+        )
     cols = ["input_ids", "attention_mask", "label"]
     train_ds.set_format(type="torch", columns=cols)
     val_ds.set_format(type="torch", columns=cols)
@@ -104,38 +275,36 @@ def main():
             "macro_f1": f1_score(labels, preds, average="macro"),
         }
 
-    training_args = TrainingArguments(
-        output_dir=args.output,
-        evaluation_strategy="epoch",
-        save_strategy="epoch",
-        logging_strategy="steps",
-        logging_steps=50,
-        per_device_train_batch_size=args.batch,
-        per_device_eval_batch_size=args.batch,
-        num_train_epochs=args.epochs,
-        learning_rate=2e-5,
-        weight_decay=0.01,
-        load_best_model_at_end=True,
-        metric_for_best_model="macro_f1",
-        save_total_limit=2,
-    )
-
+    throughput = ThroughputCallback()
+    callbacks = [throughput]
+    if args.sweep_progress:
+        progress = ProgressLog(Path(args.sweep_progress))
+        callbacks.append(
+            MedianStoppingCallback(
+                progress, args.trial_id, args.prune_min_trials, args.prune_warmup_epochs
+            )
+        )
     trainer = Trainer(
         model=model,
         args=training_args,
         train_dataset=train_ds,
         eval_dataset=val_ds,
         tokenizer=tokenizer,
+        data_collator=DataCollatorWithPadding(tokenizer) if dynamic_padding else None,
         compute_metrics=compute_metrics,
+        callbacks=callbacks,
     )
 
-    trainer.train()
-    trainer.save_model(args.output)
-    tokenizer.save_pretrained(args.output)
+    train_result = trainer.train()
+    trainer.save_model(args.output)  # writes on rank 0 only
 
-    # Language-stratified evaluation (if lang column exists)
+    # Language-stratified evaluation (if lang column exists); every rank takes part,
+    # the predictions are gathered in dataset order
     metrics_report = {}
     eval_out = trainer.predict(val_ds)
+    if not is_main:
+        return
+    tokenizer.save_pretrained(args.output)
     overall_preds = np.argmax(eval_out.predictions, axis=-1)
     overall_labels = eval_out.label_ids
     metrics_report["overall"] = {
@@ -146,7 +315,7 @@ def main():
     if val_langs:
         per_lang = {}
         for lang in set(val_langs):
-            idx = [i for i, l in enumerate(val_langs) if l == lang]
+            idx = [i for i, row_lang in enumerate(val_langs) if row_lang == lang]
             lang_labels = overall_labels[idx]
             lang_preds = overall_preds[idx]
             per_lang[lang] = {
@@ -163,6 +332,10 @@ def main():
         "version_tag": args.version_tag or "unversioned",
         "train_rows": len(train_ds_raw),
         "val_rows": len(val_ds_raw),
+        "padding": args.padding,
+        "training": training_report(
+            args, training_args, throughput, train_result, world_size, bf16
+        ),
         "label2id": label2id,
         "id2label": id2label,
         "metrics": metrics_report,
@@ -174,5 +347,33 @@ def main():
     print("Eval metrics:", json.dumps(metrics_report, indent=2))
 
 
+def training_report(
+    args, training_args, throughput, train_result, world_size: int, bf16: bool
+) -> dict:
+    effective_batch = args.batch * args.grad_accum * world_size
+    return {
+        "world_size": world_size,
+        "device": "cpu" if training_args.use_cpu else "cuda",
+        "threads_per_process": torch.get_num_threads()
+        if training_args.use_cpu
+        else None,
+        "bf16": bf16,
+        "learning_rate": args.learning_rate,
+        "weight_decay": args.weight_decay,
+        "epochs_run": round(throughput.epochs, 2),
+        "grad_accum": args.grad_accum,
+        "effective_batch": effective_batch,
+        "optimizer_steps": throughput.steps,
+        "step_seconds": round(throughput.seconds, 3),
+        # Optimizer steps only; the last step of an epoch may be short, so this is a slight overestimate
+        "samples_per_second": round(
+            throughput.steps * effective_batch / throughput.seconds, 3
+        )
+        if throughput.seconds
+        else None,
+        "train_runtime_s": train_result.metrics.get("train_runtime"),
+    }
+
+
 if __name__ == "__main__":
     main()
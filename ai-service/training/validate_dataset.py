@@ -1,18 +1,34 @@
 """
 Quick dataset validation and audit for incident classification data.
 
+Besides exact duplicates, rows of all files are clustered into near-duplicates
+(MinHash/LSH over character shingles, see utils/near_duplicates.py). The report
+lists the largest clusters, clusters spanning several files, clusters with
+conflicting labels, and clusters that straddle the train/validation split made
+by train_incident_classifier.py (same file order, test_size and seed), i.e.
+validation rows with a near-copy in the training data. --dedup_output writes
+the combined rows keeping only the first row of each cluster.
+
 Usage:
   python validate_dataset.py --data ../data/incidents_labeled.csv
   python validate_dataset.py --data ../data/incidents_labeled.csv --extra ../data/incidents_am_aug.csv
+  python validate_dataset.py --extra ../data/incidents_am_aug.csv --near_dup_threshold 0.7 \\
+      --near_dup_report near_dups.json --dedup_output ../data/incidents_dedup.csv
 """
 
 import argparse
+import json
+import sys
 from collections import Counter
 from pathlib import Path
 from typing import Iterable, List, Optional
 
+import numpy as np
 import pandas as pd
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from utils.near_duplicates import find_clusters  # noqa: E402
+
 LABEL_NAMES = ["FIRE", "MEDICAL", "CRIME", "TRAFFIC", "INFRASTRUCTURE", "OTHER"]
 
 
@@ -65,29 +81,175 @@ def validate(df: pd.DataFrame, name: str) -> None:
     )
 
 
-def main(data: Path, extra: Optional[Iterable[Path]]) -> None:
+def split_assignment(df: pd.DataFrame, test_size: float, seed: int) -> np.ndarray:
+    """
+    "train"/"validation" per row as train_incident_classifier.load_dataset
+    splits the same concatenated rows; rows it drops (unknown category) get None.
+    """
+    from datasets import Dataset
+
+    kept = np.flatnonzero(df["category"].isin(LABEL_NAMES).to_numpy())
+    split = Dataset.from_dict({"row": kept}).train_test_split(
+        test_size=test_size, seed=seed
+    )
+    out = np.full(len(df), None, dtype=object)
+    out[split["train"]["row"]] = "train"
+    out[split["test"]["row"]] = "validation"
+    return out
+
+
+def near_duplicate_audit(df: pd.DataFrame, args) -> List[List[int]]:
+    texts = df["text"].fillna("").astype(str).tolist()
+    clusters = find_clusters(
+        texts,
+        threshold=args.near_dup_threshold,
+        num_perm=args.num_perm,
+        shingle_size=args.shingle,
+    )
+    clusters.sort(key=len, reverse=True)
+    splits = split_assignment(df, args.test_size, args.seed)
+
+    summaries = []
+    for members in clusters:
+        rows = df.iloc[members]
+        summaries.append(
+            {
+                "size": len(members),
+                "sources": sorted(rows["source"].unique().tolist()),
+                "categories": sorted(rows["category"].astype(str).unique().tolist()),
+                "splits": sorted({s for s in splits[members] if s}),
+                "rows": [
+                    {
+                        "source": r.source,
+                        "row": int(r.source_row),
+                        "category": r.category,
+                        "split": splits[i],
+                        "text": r.text,
+                    }
+                    for i, r in zip(members, rows.itertuples())
+                ],
+            }
+        )
+    cross_file = [c for c in summaries if len(c["sources"]) > 1]
+    conflicting = [c for c in summaries if len(c["categories"]) > 1]
+    leaking = [c for c in summaries if len(c["splits"]) > 1]
+    leaked_rows = sum(
+        sum(r["split"] == "validation" for r in c["rows"]) for c in leaking
+    )
+    redundant = sum(c["size"] - 1 for c in summaries)
+
+    print(
+        f"\n=== Near duplicates (Jaccard >= {args.near_dup_threshold}, {args.shingle}-char shingles) ==="
+    )
+    print(
+        f"Clusters: {len(clusters)} covering {redundant + len(clusters)} rows ({redundant} redundant)"
+    )
+    print(f"Clusters spanning several files: {len(cross_file)}")
+    print(f"Clusters with conflicting categories: {len(conflicting)}")
+    print(
+        f"Clusters across the train/validation split (test_size={args.test_size}, seed={args.seed}): "
+        f"{len(leaking)}, {leaked_rows} validation rows with a near-copy in train"
+    )
+    for c in summaries[: args.show_clusters]:
+        print(
+            f"  size={c['size']} files={c['sources']} categories={c['categories']} splits={c['splits']}"
+        )
+        for r in c["rows"][:3]:
+            print(f"    {r['source']}:{r['row']} [{r['category']}] {r['text'][:80]!r}")
+
+    if args.near_dup_report:
+        report = {
+            "threshold": args.near_dup_threshold,
+            "shingle": args.shingle,
+            "num_perm": args.num_perm,
+            "clusters": len(clusters),
+            "redundant_rows": redundant,
+            "cross_file_clusters": len(cross_file),
+            "conflicting_clusters": len(conflicting),
+            "cross_split_clusters": len(leaking),
+            "leaked_validation_rows": leaked_rows,
+            "details": summaries,
+        }
+        args.near_dup_report.write_text(
+            json.dumps(report, indent=2, ensure_ascii=False, default=str),
+            encoding="utf-8",
+        )
+        print(f"Saved near-duplicate report to {args.near_dup_report}")
+    return clusters
+
+
+def main(data: Path, extra: Optional[Iterable[Path]], args=None) -> None:
     base = load_csv(data)
     validate(base, f"{data.name}")
 
+    frames = [base.assign(source=data.name, source_row=range(len(base)))]
     merged = base.copy()
     if extra:
         for p in extra:
             df_extra = load_csv(p)
             validate(df_extra, f"{p.name}")
             merged = pd.concat([merged, df_extra], ignore_index=True)
+            frames.append(
+                df_extra.assign(source=p.name, source_row=range(len(df_extra)))
+            )
 
         print("\n=== Combined dataset ===")
         validate(merged, "combined")
 
+    if args is None or not args.near_dup_threshold:
+        return
+    tagged = pd.concat(frames, ignore_index=True)
+    clusters = near_duplicate_audit(tagged, args)
+    if args.dedup_output:
+        drop = [i for members in clusters for i in members[1:]]
+        merged.drop(index=drop).to_csv(args.dedup_output, index=False)
+        print(
+            f"Wrote {len(merged) - len(drop)} rows ({len(drop)} near duplicates dropped) to {args.dedup_output}"
+        )
+
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
-    parser.add_argument("--data", type=Path, default=Path("../data/incidents_labeled.csv"))
+    parser.add_argument(
+        "--data", type=Path, default=Path("../data/incidents_labeled.csv")
+    )
     parser.add_argument(
         "--extra",
         type=Path,
         nargs="*",
         help="Optional extra CSV files to include in audit (same schema as base).",
     )
+    parser.add_argument(
+        "--near_dup_threshold",
+        type=float,
+        default=0.8,
+        help="Estimated Jaccard similarity for near duplicates (0 skips the near-duplicate audit).",
+    )
+    parser.add_argument(
+        "--shingle", type=int, default=3, help="Characters per shingle."
+    )
+    parser.add_argument(
+        "--num_perm", type=int, default=128, help="MinHash permutations."
+    )
+    parser.add_argument(
+        "--test_size",
+        type=float,
+        default=0.2,
+        help="Validation fraction used by training.",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=42, help="Split seed used by training."
+    )
+    parser.add_argument(
+        "--show_clusters", type=int, default=10, help="Largest clusters to print."
+    )
+    parser.add_argument(
+        "--near_dup_report", type=Path, help="Write all clusters as JSON."
+    )
+    parser.add_argument(
+        "--dedup_output",
+        type=Path,
+        help="Write the combined rows without near duplicates.",
+    )
     args = parser.parse_args()
-    main(args.data, args.extra)
+    main(args.data, args.extra, args)
@@ -0,0 +1,154 @@
+"""
+Inference backends for the incident classifier.
+
+Both backends take padded numpy `input_ids` / `attention_mask` arrays and return
+numpy logits, so tokenization, batching and post-processing in main.py don't
+care which runtime is underneath. torch and onnxruntime are imported lazily,
+so an ONNX-only image (requirements-onnx.txt) can leave torch out entirely.
+"""
+
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+ONNX_MODEL_NAME = "model.onnx"
+ONNX_OPTIMIZED_MODEL_NAME = "model.optimized.onnx"
+
+
+def softmax(logits: np.ndarray) -> np.ndarray:
+    shifted = logits - logits.max(axis=-1, keepdims=True)
+    exp = np.exp(shifted)
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+
+def mean_pool(hidden: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+    """Unit-length sentence embeddings: encoder output averaged over non-padding tokens."""
+    mask = attention_mask[..., None].astype(np.float32)
+    pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1.0)
+    return pooled / np.maximum(np.linalg.norm(pooled, axis=-1, keepdims=True), 1e-12)
+
+
+class TorchBackend:
+    name = "torch"
+    supports_embeddings = True
+
+    def __init__(self, model):
+        self.model = model
+        self.config = model.config
+
+    def logits(self, input_ids: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        import torch
+
+        with torch.no_grad():
+            outputs = self.model(
+                input_ids=torch.from_numpy(input_ids),
+                attention_mask=torch.from_numpy(attention_mask),
+            )
+        return outputs.logits.float().cpu().numpy()
+
+    def logits_and_embeddings(self, input_ids: np.ndarray, attention_mask: np.ndarray):
+        """Logits plus mean-pooled last-layer embeddings from the same forward pass."""
+        import torch
+
+        with torch.no_grad():
+            outputs = self.model(
+                input_ids=torch.from_numpy(input_ids),
+                attention_mask=torch.from_numpy(attention_mask),
+                output_hidden_states=True,
+            )
+        hidden = outputs.hidden_states[-1].float().cpu().numpy()
+        return outputs.logits.float().cpu().numpy(), mean_pool(hidden, attention_mask)
+
+
+class OnnxBackend:
+    name = "onnx"
+
+    def __init__(self, onnx_path: Path, config, threads: int = 0):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.path = Path(onnx_path)
+        self.session = ort.InferenceSession(
+            str(self.path), options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        # Exports from training/export_onnx.py only have logits
+        self.supports_embeddings = "last_hidden_state" in {
+            o.name for o in self.session.get_outputs()
+        }
+        self.config = config
+
+    def logits(self, input_ids: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        feed = {
+            "input_ids": input_ids.astype(np.int64),
+            "attention_mask": attention_mask.astype(np.int64),
+        }
+        feed = {k: v for k, v in feed.items() if k in self.input_names}
+        return self.session.run(["logits"], feed)[0]
+
+    def logits_and_embeddings(self, input_ids: np.ndarray, attention_mask: np.ndarray):
+        if not self.supports_embeddings:
+            raise NotImplementedError(f"{self.path} has no last_hidden_state output")
+        feed = {
+            "input_ids": input_ids.astype(np.int64),
+            "attention_mask": attention_mask.astype(np.int64),
+        }
+        feed = {k: v for k, v in feed.items() if k in self.input_names}
+        logits, hidden = self.session.run(["logits", "last_hidden_state"], feed)
+        return logits, mean_pool(hidden, attention_mask)
+
+
+def find_onnx_model(model_dir: Path) -> Optional[Path]:
+    """Prefer the graph-optimized export when both exist."""
+    for name in (ONNX_OPTIMIZED_MODEL_NAME, ONNX_MODEL_NAME):
+        path = Path(model_dir) / name
+        if path.exists():
+            return path
+    return None
+
+
+def load_torch_backend(
+    model_path, quantization: str = "none", threads: int = 0
+) -> TorchBackend:
+    import torch
+    from transformers import AutoModelForSequenceClassification
+
+    from utils.quantization import (
+        QUANTIZED_ARTIFACT_NAME,
+        load_quantized,
+        quantize_dynamic_int8,
+    )
+
+    if threads:
+        torch.set_num_threads(threads)
+    if quantization == "dynamic":
+        artifact = Path(str(model_path)) / QUANTIZED_ARTIFACT_NAME
+        if artifact.exists():
+            print(f"Loading pre-quantized INT8 model from {artifact}")
+            return TorchBackend(load_quantized(artifact.parent))
+        model = AutoModelForSequenceClassification.from_pretrained(str(model_path))
+        model.eval()
+        print("Applying dynamic INT8 quantization to linear layers")
+        return TorchBackend(quantize_dynamic_int8(model))
+
+    model = AutoModelForSequenceClassification.from_pretrained(str(model_path))
+    model.eval()
+    return TorchBackend(model)
+
+
+def load_onnx_backend(model_dir: Path, threads: int = 0) -> OnnxBackend:
+    from transformers import AutoConfig
+
+    onnx_path = find_onnx_model(model_dir)
+    if onnx_path is None:
+        raise FileNotFoundError(
+            f"No ONNX export in {model_dir}; run training/export_onnx.py first"
+        )
+    print(f"Loading ONNX model from {onnx_path}")
+    return OnnxBackend(
+        onnx_path, AutoConfig.from_pretrained(str(model_dir)), threads=threads
+    )
@@ -0,0 +1,197 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Sequence, Tuple
+
+import numpy as np
+
+from utils.metrics import Histogram
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+QUEUE_WAIT_MS_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 250, 500, 1000)
+QUEUE_DEPTH_BUCKETS = (0, 1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+
+
+class QueueFull(RuntimeError):
+    """Raised by MicroBatcher.submit when `max_queue` items are already waiting."""
+
+
+class MicroBatcher:
+    """
+    Collect concurrent inference requests into batches.
+
+    Callers submit single items and receive a Future. A background thread waits
+    for the first item, keeps gathering until `max_batch_size` items are queued or
+    `max_wait_ms` has elapsed, then runs `process_batch` once for the whole group
+    and resolves each caller's Future with its own result. If the batch raises,
+    its items are retried one at a time, so only the item that fails on its own
+    gets the exception.
+
+    With `max_queue` set, submit() raises QueueFull instead of queueing without
+    bound, so callers can shed load. Items whose Future was cancelled while
+    queued (e.g. the caller timed out) are dropped before the forward pass.
+    """
+
+    def __init__(
+        self,
+        process_batch: Callable[[List[Any]], Sequence[Any]],
+        max_batch_size: int = 16,
+        max_wait_ms: float = 5.0,
+        name: str = "micro-batcher",
+        max_queue: int = 0,
+    ):
+        self.process_batch = process_batch
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait_s = max(0.0, float(max_wait_ms)) / 1000.0
+        self.name = name
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self.queue_wait_ms = Histogram(QUEUE_WAIT_MS_BUCKETS)
+        self.queue_depth = Histogram(QUEUE_DEPTH_BUCKETS)
+        self.max_queue = max(0, int(max_queue))
+        self.rejected = 0
+        self.cancelled = 0
+        self._queue: "queue.Queue" = queue.Queue(self.max_queue)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self) -> "MicroBatcher":
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name=self.name, daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def submit(self, item: Any) -> Future:
+        fut: Future = Future()
+        self.queue_depth.observe(self._queue.qsize())
+        try:
+            self._queue.put_nowait((item, fut, time.perf_counter()))
+        except queue.Full:
+            self.rejected += 1
+            raise QueueFull(
+                f"{self.name} queue is full ({self.max_queue} items)"
+            ) from None
+        return fut
+
+    def stats(self) -> dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_s * 1000.0,
+            "max_queue": self.max_queue,
+            "queue_depth": self._queue.qsize(),
+            "queue_depth_at_submit": self.queue_depth.snapshot(),
+            "rejected": self.rejected,
+            "cancelled": self.cancelled,
+            "batch_size": self.batch_sizes.snapshot(),
+            "queue_wait_ms": self.queue_wait_ms.snapshot(),
+        }
+
+    def _collect(self) -> list:
+        try:
+            first = self._queue.get(timeout=0.1)
+        except queue.Empty:
+            return []
+        pending = [first]
+        deadline = time.perf_counter() + self.max_wait_s
+        while len(pending) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining <= 0:
+                    pending.append(self._queue.get_nowait())
+                else:
+                    pending.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return pending
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            pending = self._collect()
+            live = [
+                entry for entry in pending if entry[1].set_running_or_notify_cancel()
+            ]
+            self.cancelled += len(pending) - len(live)
+            pending = live
+            if not pending:
+                continue
+
+            started = time.perf_counter()
+            self.batch_sizes.observe(len(pending))
+            for _, _, enqueued in pending:
+                self.queue_wait_ms.observe((started - enqueued) * 1000.0)
+
+            try:
+                results = self._process([item for item, _, _ in pending])
+            except Exception as e:
+                if len(pending) == 1:
+                    pending[0][1].set_exception(e)
+                    continue
+                # One bad input must not fail everyone who shared its batch
+                for item, fut, _ in pending:
+                    try:
+                        fut.set_result(self._process([item])[0])
+                    except Exception as item_error:
+                        fut.set_exception(item_error)
+                continue
+
+            for (_, fut, _), result in zip(pending, results):
+                fut.set_result(result)
+
+    def _process(self, items: list) -> Sequence[Any]:
+        results = self.process_batch(items)
+        if len(results) != len(items):
+            raise RuntimeError(
+                f"process_batch returned {len(results)} results for {len(items)} items"
+            )
+        return results
+
+
+def length_grouped_batches(
+    lengths: Sequence[int], batch_size: int, max_tokens: int = 0
+) -> List[List[int]]:
+    """
+    Group item indices into batches of similar length.
+
+    Items are sorted by length and cut into consecutive batches of at most
+    `batch_size` items. When `max_tokens` is set, a batch is also closed once
+    its padded size (items * longest item) would exceed that budget, so a few
+    long inputs don't drag a large batch of short ones up to their length.
+    """
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    batches: List[List[int]] = []
+    current: List[int] = []
+    longest = 0
+    for idx in order:
+        candidate = max(longest, lengths[idx])
+        too_many = len(current) >= batch_size
+        too_big = bool(max_tokens) and candidate * (len(current) + 1) > max_tokens
+        if current and (too_many or too_big):
+            batches.append(current)
+            current, candidate = [], lengths[idx]
+        current.append(idx)
+        longest = candidate
+    if current:
+        batches.append(current)
+    return batches
+
+
+def pad_sequences(
+    sequences: Sequence[Sequence[int]], pad_id: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Right-pad token id lists to the longest one; returns (input_ids, attention_mask)."""
+    longest = max((len(seq) for seq in sequences), default=0)
+    input_ids = np.full((len(sequences), longest), pad_id, dtype=np.int64)
+    attention_mask = np.zeros((len(sequences), longest), dtype=np.int64)
+    for row, seq in enumerate(sequences):
+        input_ids[row, : len(seq)] = seq
+        attention_mask[row, : len(seq)] = 1
+    return input_ids, attention_mask
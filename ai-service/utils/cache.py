@@ -0,0 +1,274 @@
+"""
+Prediction cache for /classify, keyed on normalized text plus model identity.
+
+Keys hash the text after NFKC normalization, case folding and whitespace
+collapsing, together with a model namespace (main.cache_namespace: version tag,
+trained_at and a fingerprint of the weight files), so loading new weights never
+serves old entries. Backends: per-process LRU, SQLite shared by the workers of
+one host, or Redis shared across hosts. Entries expire after an optional TTL.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form used for cache keys: NFKC, case-folded, whitespace collapsed."""
+    t = unicodedata.normalize("NFKC", text or "")
+    return " ".join(t.casefold().split())
+
+
+def cache_key(text: str, model_version: str) -> str:
+    payload = f"{model_version}\x00{normalize_text(text)}".encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+class PredictionCache:
+    """
+    Base class for prediction caches. Values must be JSON-serializable.
+
+    Subclasses implement `_get`, `_set` and `clear`; hit/miss counting lives here so
+    every backend reports the same stats (counters are per process).
+    """
+
+    backend = "base"
+    # True when get/set do I/O (files, network) and should stay off the event loop
+    blocking = True
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 0):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = max(0.0, float(ttl_seconds))
+        self.hits = 0
+        self.misses = 0
+        self._counter_lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self._get(key)
+        with self._counter_lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self._set(key, value)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "backend": self.backend,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+    def _expired(self, stored_at: float) -> bool:
+        return bool(self.ttl_seconds) and time.time() - stored_at > self.ttl_seconds
+
+    def _get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def _set(self, key: str, value: Any) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class MemoryCache(PredictionCache):
+    """In-process LRU cache with optional TTL."""
+
+    backend = "memory"
+    blocking = False
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 0):
+        super().__init__(max_entries, ttl_seconds)
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, stored_at = entry
+            if self._expired(stored_at):
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def _set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (value, time.time())
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteCache(PredictionCache):
+    """
+    File-backed LRU cache that several uvicorn workers on one host can share.
+
+    Uses SQLite in WAL mode; recency is tracked per row and the least recently
+    used rows are trimmed once the table exceeds `max_entries`.
+    """
+
+    backend = "sqlite"
+
+    def __init__(self, path: Path, max_entries: int = 10000, ttl_seconds: float = 0):
+        super().__init__(max_entries, ttl_seconds)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS predictions ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+            " stored_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_predictions_accessed ON predictions(accessed_at)"
+        )
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=5, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def _get(self, key: str) -> Optional[Any]:
+        try:
+            conn = self._conn()
+            row = conn.execute(
+                "SELECT value, stored_at FROM predictions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, stored_at = row
+            if self._expired(stored_at):
+                conn.execute("DELETE FROM predictions WHERE key = ?", (key,))
+                return None
+            conn.execute(
+                "UPDATE predictions SET accessed_at = ? WHERE key = ?",
+                (time.time(), key),
+            )
+            return json.loads(value)
+        except Exception as e:
+            print(f"Prediction cache read failed: {e}")
+            return None
+
+    def _set(self, key: str, value: Any) -> None:
+        now = time.time()
+        try:
+            conn = self._conn()
+            conn.execute(
+                "INSERT OR REPLACE INTO predictions (key, value, stored_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, now),
+            )
+            (count,) = conn.execute("SELECT COUNT(*) FROM predictions").fetchone()
+            if count > self.max_entries:
+                conn.execute(
+                    "DELETE FROM predictions WHERE key IN ("
+                    " SELECT key FROM predictions ORDER BY accessed_at ASC LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+        except Exception as e:
+            print(f"Prediction cache write failed: {e}")
+
+    def clear(self) -> None:
+        self._conn().execute("DELETE FROM predictions")
+
+
+class RedisCache(PredictionCache):
+    """
+    Redis-backed cache shared by every worker and replica.
+
+    TTL maps to Redis key expiry; size-bounded LRU eviction is delegated to the
+    server (`maxmemory` + `maxmemory-policy allkeys-lru`). Requires the optional
+    `redis` package.
+    """
+
+    backend = "redis"
+
+    def __init__(
+        self,
+        url: str,
+        max_entries: int = 10000,
+        ttl_seconds: float = 0,
+        prefix: str = "ai:pred:",
+    ):
+        super().__init__(max_entries, ttl_seconds)
+        try:
+            import redis  # type: ignore
+        except ImportError as e:
+            raise RuntimeError(
+                "redis:// prediction cache requires the 'redis' package"
+            ) from e
+        self._client = redis.Redis.from_url(url, socket_timeout=0.5)
+        self.prefix = prefix
+
+    def _get(self, key: str) -> Optional[Any]:
+        try:
+            value = self._client.get(self.prefix + key)
+        except Exception as e:
+            print(f"Prediction cache read failed: {e}")
+            return None
+        return json.loads(value) if value is not None else None
+
+    def _set(self, key: str, value: Any) -> None:
+        try:
+            ttl = int(self.ttl_seconds) or None
+            self._client.set(self.prefix + key, json.dumps(value), ex=ttl)
+        except Exception as e:
+            print(f"Prediction cache write failed: {e}")
+
+    def clear(self) -> None:
+        try:
+            for key in self._client.scan_iter(match=self.prefix + "*", count=500):
+                self._client.delete(key)
+        except Exception as e:
+            print(f"Prediction cache clear failed: {e}")
+
+
+def create_cache(
+    url: str, max_entries: int = 10000, ttl_seconds: float = 0
+) -> Optional[PredictionCache]:
+    """
+    Build a cache from a URL-style setting:
+      ""/"off"/"none"           -> no cache
+      "memory://"               -> per-process LRU
+      "sqlite:///abs/cache.db"  -> file shared by workers on one host
+                                   ("sqlite://rel/cache.db" for a relative path)
+      "redis://host:6379/0"     -> shared Redis
+    """
+    url = (url or "").strip()
+    if url.lower() in ("", "off", "none", "false", "0"):
+        return None
+    if url.startswith("memory://"):
+        return MemoryCache(max_entries, ttl_seconds)
+    if url.startswith("sqlite://"):
+        return SQLiteCache(Path(url[len("sqlite://") :]), max_entries, ttl_seconds)
+    if url.startswith(("redis://", "rediss://")):
+        return RedisCache(url, max_entries, ttl_seconds)
+    raise ValueError(f"Unsupported prediction cache URL: {url}")
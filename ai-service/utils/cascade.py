@@ -0,0 +1,81 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Evidence assigned to an explicit negation / false-alarm phrase.
+NEGATION_EVIDENCE = 0.9
+
+
+def keyword_evidence(
+    category_counts: Dict[str, int], negated: bool
+) -> Tuple[Optional[str], float]:
+    """
+    Score how decisively keyword hits point at one category, in [0, 1].
+
+    The score is purity * strength: purity is the share of matched keywords that
+    belong to the leading category (1.0 when no other category matched) and
+    strength grows with the number of distinct keywords it matched (1 -> 0.5,
+    2 -> 0.75, 3 -> 0.875 ...). Ties go to the category listed first, matching
+    heuristic_category's priority. Returns (None, 0.0) when nothing matched.
+    """
+    if negated:
+        return "OTHER", NEGATION_EVIDENCE
+
+    total = sum(category_counts.values())
+    if not total:
+        return None, 0.0
+
+    best_category, best = None, 0
+    for category, count in category_counts.items():
+        if count > best:
+            best_category, best = category, count
+
+    purity = best / total
+    strength = 1.0 - 0.5**best
+    return best_category.upper(), round(purity * strength, 4)
+
+
+def threshold_table(
+    stage1: Sequence[Tuple[Optional[str], float]],
+    model_preds: Sequence[str],
+    gold: Sequence[str],
+    thresholds: Sequence[float],
+    aliases: Dict[str, str],
+) -> List[dict]:
+    """
+    Skip rate, keyword-vs-model agreement on skipped rows and end-to-end accuracy
+    per cascade threshold. `aliases` is applied to keyword, model and gold labels
+    alike, so a heuristic or base-model fallback answering POLICE agrees with CRIME.
+    """
+
+    def aliased(values):
+        return np.array([aliases.get(v, v) for v in values])
+
+    labels = aliased([label or "" for label, _ in stage1])
+    scores = np.array([score for _, score in stage1])
+    model_arr = aliased(model_preds)
+    gold_arr = aliased(gold)
+
+    rows = []
+    for threshold in thresholds:
+        skip = (labels != "") & (scores >= threshold)
+        final = np.where(skip, labels, model_arr)
+        rows.append(
+            {
+                "threshold": threshold,
+                "skip_rate": round(float(skip.mean()), 4),
+                "skipped": int(skip.sum()),
+                "agreement_with_model": round(
+                    float((labels[skip] == model_arr[skip]).mean()), 4
+                )
+                if skip.any()
+                else None,
+                "keyword_accuracy_on_skipped": round(
+                    float((labels[skip] == gold_arr[skip]).mean()), 4
+                )
+                if skip.any()
+                else None,
+                "cascade_accuracy": round(float((final == gold_arr).mean()), 4),
+            }
+        )
+    return rows
@@ -0,0 +1,178 @@
+"""
+Classification metrics computed from confusion matrices.
+
+One np.bincount over (group, label, prediction) codes builds a confusion matrix
+per slice (e.g. per language) in a single pass; accuracy, per-class
+precision/recall/F1 and macro-F1 then fall out of the matrix diagonals and
+marginals, so large evaluation sets cost a handful of array operations instead
+of Python loops per class. ConfusionAccumulator keeps the matrices as running
+counts, so a dataset can be scored chunk by chunk (or shard by shard, merging
+the results) with memory independent of its size.
+"""
+
+from typing import Dict, Iterable, Optional, Sequence
+
+import numpy as np
+
+
+def confusion_matrix(labels, preds, num_labels: int) -> np.ndarray:
+    """Counts with true labels on rows and predictions on columns."""
+    labels = np.asarray(labels, dtype=np.int64)
+    preds = np.asarray(preds, dtype=np.int64)
+    return np.bincount(
+        labels * num_labels + preds, minlength=num_labels * num_labels
+    ).reshape(num_labels, num_labels)
+
+
+def grouped_confusion_matrices(labels, preds, groups, num_labels: int) -> np.ndarray:
+    """
+    One confusion matrix per group, shape (num_groups, num_labels, num_labels).
+
+    `groups` holds integer codes in [0, num_groups); rows with a negative code
+    (e.g. a missing language) are left out.
+    """
+    labels = np.asarray(labels, dtype=np.int64)
+    preds = np.asarray(preds, dtype=np.int64)
+    groups = np.asarray(groups, dtype=np.int64)
+    keep = groups >= 0
+    num_groups = int(groups.max()) + 1 if keep.any() else 0
+    codes = (groups[keep] * num_labels + labels[keep]) * num_labels + preds[keep]
+    return np.bincount(codes, minlength=num_groups * num_labels * num_labels).reshape(
+        num_groups, num_labels, num_labels
+    )
+
+
+def _safe_divide(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    return np.divide(num, den, out=np.zeros(num.shape, dtype=np.float64), where=den > 0)
+
+
+def metrics_from_confusion(
+    cm: np.ndarray, label_names: Optional[Sequence[str]] = None
+) -> Dict:
+    """
+    Accuracy and macro-F1 from a confusion matrix, plus per-class metrics when
+    `label_names` is given. Macro-F1 averages over every class, counting classes
+    that never occur as 0.
+    """
+    tp = np.diag(cm).astype(np.float64)
+    predicted = cm.sum(axis=0)
+    support = cm.sum(axis=1)
+    total = int(support.sum())
+    precision = _safe_divide(tp, predicted)
+    recall = _safe_divide(tp, support)
+    f1 = _safe_divide(2 * precision * recall, precision + recall)
+
+    out = {
+        "accuracy": float(tp.sum() / total) if total else 0.0,
+        "macro_f1": float(f1.mean()) if len(f1) else 0.0,
+    }
+    if label_names is not None:
+        out["per_class"] = {
+            name: {
+                "precision": float(precision[i]),
+                "recall": float(recall[i]),
+                "f1": float(f1[i]),
+                "support": int(support[i]),
+            }
+            for i, name in enumerate(label_names)
+        }
+    return out
+
+
+class ConfusionAccumulator:
+    """Running confusion matrices, overall and per group (e.g. language)."""
+
+    def __init__(self, label_names: Sequence[str]):
+        self.label_names = list(label_names)
+        size = len(self.label_names)
+        self.overall = np.zeros((size, size), dtype=np.int64)
+        self.groups: Dict[str, np.ndarray] = {}
+
+    def update(self, labels, preds, groups=None) -> None:
+        """
+        Add a batch. `groups` is any sequence of hashable values aligned with
+        `labels` (e.g. the lang column); rows with a missing group only count
+        towards the overall matrix.
+        """
+        num_labels = len(self.label_names)
+        self.overall += confusion_matrix(labels, preds, num_labels)
+        if groups is None:
+            return
+        codes, names = _factorize(groups)
+        for name, cm in zip(
+            names, grouped_confusion_matrices(labels, preds, codes, num_labels)
+        ):
+            if name in self.groups:
+                self.groups[name] += cm
+            else:
+                self.groups[name] = cm
+
+    def merge(self, others: Iterable["ConfusionAccumulator"]) -> "ConfusionAccumulator":
+        for other in others:
+            if other.label_names != self.label_names:
+                raise ValueError(
+                    f"Label mismatch: {other.label_names} != {self.label_names}"
+                )
+            self.overall += other.overall
+            for name, cm in other.groups.items():
+                self.groups[name] = (
+                    self.groups[name] + cm if name in self.groups else cm.copy()
+                )
+        return self
+
+    def report(self) -> Dict:
+        """Overall metrics with per-class scores and the confusion matrix, and the same metrics per group."""
+        per_language = {
+            name: {
+                **metrics_from_confusion(cm, self.label_names),
+                "count": int(cm.sum()),
+            }
+            for name, cm in self.groups.items()
+        }
+        overall = {
+            **metrics_from_confusion(self.overall, self.label_names),
+            "count": int(self.overall.sum()),
+            "labels": list(self.label_names),
+            "confusion_matrix": self.overall.tolist(),
+        }
+        return {"overall": overall, "per_language": per_language}
+
+    def to_dict(self) -> Dict:
+        return {
+            "labels": self.label_names,
+            "overall": self.overall.tolist(),
+            "groups": {name: cm.tolist() for name, cm in self.groups.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ConfusionAccumulator":
+        acc = cls(data["labels"])
+        acc.overall = np.asarray(data["overall"], dtype=np.int64)
+        acc.groups = {
+            name: np.asarray(cm, dtype=np.int64) for name, cm in data["groups"].items()
+        }
+        return acc
+
+
+def classification_report(
+    labels, preds, label_names: Sequence[str], groups=None
+) -> Dict:
+    """
+    Metrics for one in-memory set of predictions; see ConfusionAccumulator.report().
+    Slices of `groups` are reported under "per_language".
+    """
+    acc = ConfusionAccumulator(label_names)
+    acc.update(labels, preds, groups)
+    return acc.report()
+
+
+def _factorize(values):
+    """Integer codes for `values` in first-seen order; None/NaN get -1."""
+    index: Dict = {}
+    codes = np.empty(len(values), dtype=np.int64)
+    for i, value in enumerate(values):
+        if value is None or value != value:
+            codes[i] = -1
+        else:
+            codes[i] = index.setdefault(value, len(index))
+    return codes, list(index)
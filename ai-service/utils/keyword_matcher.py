@@ -0,0 +1,99 @@
+"""
+Aho-Corasick multi-pattern matching for the keyword heuristics.
+
+`heuristic_category` and `infer_severity` only need to know *which* keyword groups
+occur in a text (negation, each category, severity tiers), so patterns are compiled
+into one automaton whose states carry the set of groups they complete. A single
+left-to-right pass over the text then yields every group hit, instead of one
+substring scan per keyword.
+"""
+
+from collections import Counter, deque
+from typing import Dict, FrozenSet, Hashable, Iterable, List, Set
+
+
+class KeywordMatcher:
+    """Substring matcher: reports every group with at least one pattern occurring in the text."""
+
+    def __init__(self, groups: Dict[Hashable, Iterable[str]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._out: List[Set[Hashable]] = [set()]
+        self._out_ids: List[Set[int]] = [set()]
+        self._always: Set[Hashable] = set()
+        self._always_ids: Set[int] = set()
+        self._pattern_groups: List[Hashable] = []
+        for group, patterns in groups.items():
+            for pattern in patterns:
+                self._add(pattern, group)
+        self._fail = self._build()
+        self._out_frozen: List[FrozenSet[Hashable]] = [frozenset(o) for o in self._out]
+        self._out_ids_frozen: List[FrozenSet[int]] = [
+            frozenset(o) for o in self._out_ids
+        ]
+
+    @property
+    def pattern_count(self) -> int:
+        return len(self._pattern_groups)
+
+    def _add(self, pattern: str, group: Hashable) -> None:
+        pattern_id = len(self._pattern_groups)
+        self._pattern_groups.append(group)
+        if not pattern:
+            # `"" in text` is always true; keep that behaviour.
+            self._always.add(group)
+            self._always_ids.add(pattern_id)
+            return
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._out.append(set())
+                self._out_ids.append(set())
+            state = nxt
+        self._out[state].add(group)
+        self._out_ids[state].add(pattern_id)
+
+    def _build(self) -> List[int]:
+        fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in self._goto[f]:
+                    f = fail[f]
+                fallback = self._goto[f].get(ch, 0)
+                fail[nxt] = fallback if fallback != nxt else 0
+                self._out[nxt] |= self._out[fail[nxt]]
+                self._out_ids[nxt] |= self._out_ids[fail[nxt]]
+        return fail
+
+    def groups(self, text: str) -> FrozenSet[Hashable]:
+        """Return every group that has a pattern occurring in `text` (case-sensitive)."""
+        goto, fail, out = self._goto, self._fail, self._out_frozen
+        hits = set(self._always)
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                hits |= out[state]
+        return frozenset(hits)
+
+    def counts(self, text: str) -> Counter:
+        """Number of *distinct* patterns of each group occurring in `text`."""
+        goto, fail, out = self._goto, self._fail, self._out_ids_frozen
+        found = set(self._always_ids)
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found |= out[state]
+        return Counter(self._pattern_groups[i] for i in found)
@@ -0,0 +1,235 @@
+"""
+In-process metrics with Prometheus text exposition.
+
+Histograms and counters are plain Python objects guarded by a lock, so recording
+costs about a microsecond and needs no client library or push gateway.
+MetricsRegistry.render() produces the text format (version 0.0.4) that
+Prometheus scrapes from /metrics. Values are per process; with several workers
+each scrape sees the worker that answered it.
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+
+class Histogram:
+    """Thread-safe cumulative histogram with fixed upper-bound buckets."""
+
+    def __init__(self, buckets: Iterable[float]):
+        self.buckets: List[float] = sorted(float(b) for b in buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[idx] += 1
+            self._sum += value
+            self._count += 1
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        """Observe the wall time of the block, in seconds."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+    def collect(self) -> Tuple[List[Tuple[float, int]], float, int]:
+        """(cumulative count per upper bound, sum, count), unrounded."""
+        with self._lock:
+            counts = list(self._counts)
+            total = self._count
+            value_sum = self._sum
+        cumulative = []
+        running = 0
+        for bound, count in zip(self.buckets, counts):
+            running += count
+            cumulative.append((bound, running))
+        return cumulative, value_sum, total
+
+    def snapshot(self) -> Dict:
+        cumulative, value_sum, total = self.collect()
+        buckets = {f"{bound:g}": count for bound, count in cumulative}
+        buckets["+Inf"] = total
+        return {
+            "buckets": buckets,
+            "count": total,
+            "sum": round(value_sum, 3),
+            "mean": round(value_sum / total, 3) if total else 0.0,
+        }
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Sequence, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return f"{value:g}" if isinstance(value, float) else str(value)
+
+
+class _Family:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Family):
+    """Monotonic counter with one series per label combination."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        super().__init__(name, help_text, labels)
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, *label_values, amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values) -> float:
+        return self._values.get(label_values, 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        lines = self.header()
+        for values, count in items:
+            lines.append(
+                f"{self.name}{_labels(self.label_names, values)} {_number(count)}"
+            )
+        return lines
+
+
+class HistogramFamily(_Family):
+    """Histograms sharing buckets, one per label combination (see labels())."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        buckets: Iterable[float],
+        labels: Sequence[str] = (),
+    ):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(buckets)
+        self._children: Dict[tuple, Histogram] = {}
+
+    def labels(self, *label_values) -> Histogram:
+        child = self._children.get(label_values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(label_values, Histogram(self.buckets))
+        return child
+
+    def render(self) -> List[str]:
+        with self._lock:
+            children = sorted(self._children.items())
+        lines = self.header()
+        for values, hist in children:
+            cumulative, value_sum, total = hist.collect()
+            labels = _labels(self.label_names, values)
+            for bound, count in cumulative + [("+Inf", total)]:
+                le = 'le="%s"' % (bound if bound == "+Inf" else f"{bound:g}")
+                lines.append(
+                    f"{self.name}_bucket{_labels(self.label_names, values, le)} {count}"
+                )
+            lines.append(f"{self.name}_sum{labels} {_number(value_sum)}")
+            lines.append(f"{self.name}_count{labels} {total}")
+        return lines
+
+
+class CallbackMetric(_Family):
+    """
+    Gauge (or counter) read from `fn` at scrape time, for values that live elsewhere
+    (queue depth, cache hit counts). `fn` returns a number, or a dict mapping label
+    value tuples to numbers when the metric has labels.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        fn: Callable,
+        labels: Sequence[str] = (),
+        kind: str = "gauge",
+    ):
+        super().__init__(name, help_text, labels)
+        self.fn = fn
+        self.kind = kind
+
+    def render(self) -> List[str]:
+        try:
+            value = self.fn()
+        except Exception:
+            return []
+        if value is None:
+            return []
+        series = value if isinstance(value, dict) else {(): value}
+        lines = self.header()
+        for values, number in series.items():
+            lines.append(
+                f"{self.name}{_labels(self.label_names, values)} {_number(number)}"
+            )
+        return lines
+
+
+class MetricsRegistry:
+    """Owns metric families and renders them in Prometheus text format."""
+
+    def __init__(self):
+        self._families: List[_Family] = []
+
+    def _add(self, family):
+        self._families.append(family)
+        return family
+
+    def counter(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Counter:
+        return self._add(Counter(name, help_text, labels))
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        buckets: Iterable[float],
+        labels: Sequence[str] = (),
+    ) -> HistogramFamily:
+        return self._add(HistogramFamily(name, help_text, buckets, labels))
+
+    def callback(
+        self,
+        name: str,
+        help_text: str,
+        fn: Callable,
+        labels: Sequence[str] = (),
+        kind: str = "gauge",
+    ) -> CallbackMetric:
+        return self._add(CallbackMetric(name, help_text, fn, labels, kind))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for family in self._families:
+            lines.extend(family.render())
+        return "\n".join(lines) + "\n"
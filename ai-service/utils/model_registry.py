@@ -0,0 +1,109 @@
+import gc
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator, List, Optional
+
+
+class ModelBundle:
+    """One loaded model version: tokenizer, inference backend and metadata, with in-flight lease counting."""
+
+    def __init__(
+        self,
+        tokenizer: Any,
+        backend: Any,
+        version: str,
+        metadata: Optional[dict] = None,
+        source: str = "",
+        fingerprint: str = "",
+    ):
+        self.tokenizer = tokenizer
+        self.backend = backend
+        self.version = version
+        self.metadata = metadata
+        self.source = source
+        self.fingerprint = fingerprint
+        self.loaded_at = time.time()
+        self.closed = False
+        self._leases = 0
+        self._cond = threading.Condition()
+
+    @property
+    def in_flight(self) -> int:
+        return self._leases
+
+    def acquire(self) -> None:
+        with self._cond:
+            self._leases += 1
+
+    def release(self) -> None:
+        with self._cond:
+            self._leases -= 1
+            if self._leases <= 0:
+                self._cond.notify_all()
+
+    def wait_drained(self, timeout: Optional[float] = None) -> bool:
+        with self._cond:
+            return self._cond.wait_for(lambda: self._leases <= 0, timeout)
+
+    def close(self) -> None:
+        """Drop references to the weights so their memory can be reclaimed."""
+        self.tokenizer = None
+        self.backend = None
+        self.closed = True
+        gc.collect()
+
+
+class ModelRegistry:
+    """
+    Holds the active ModelBundle and swaps it atomically.
+
+    Requests take a lease on the bundle that is active when they start and keep
+    using it until they finish, even if a new version is activated meanwhile.
+    A replaced bundle is closed by a background thread once its last lease is
+    released, so old weights are freed only after in-flight work drains.
+    """
+
+    def __init__(self, drain_warn_after_s: float = 300.0):
+        self._active: Optional[ModelBundle] = None
+        self._lock = threading.Lock()
+        self.drain_warn_after_s = drain_warn_after_s
+        self.retiring: List[ModelBundle] = []
+
+    @property
+    def active(self) -> Optional[ModelBundle]:
+        return self._active
+
+    @contextmanager
+    def lease(self) -> Iterator[ModelBundle]:
+        with self._lock:
+            bundle = self._active
+            if bundle is None:
+                raise RuntimeError("No model loaded")
+            bundle.acquire()
+        try:
+            yield bundle
+        finally:
+            bundle.release()
+
+    def activate(self, bundle: ModelBundle) -> Optional[ModelBundle]:
+        with self._lock:
+            previous, self._active = self._active, bundle
+        if previous is not None and previous is not bundle:
+            self.retiring.append(previous)
+            threading.Thread(
+                target=self._retire, args=(previous,), name="model-retire", daemon=True
+            ).start()
+        return previous
+
+    def _retire(self, bundle: ModelBundle) -> None:
+        if not bundle.wait_drained(self.drain_warn_after_s):
+            print(
+                f"Model {bundle.version} still has {bundle.in_flight} in-flight requests "
+                f"after {self.drain_warn_after_s:.0f}s; waiting"
+            )
+            bundle.wait_drained()
+        if bundle in self.retiring:
+            self.retiring.remove(bundle)
+        bundle.close()
+        print(f"Released model {bundle.version}")
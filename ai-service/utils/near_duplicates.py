@@ -0,0 +1,191 @@
+"""
+Near-duplicate detection with MinHash signatures and LSH banding.
+
+Texts are normalized (NFKC, case-folded, punctuation stripped including the
+Ethiopic word and sentence marks, Ge'ez homophone letters such as ሐ/ኀ/ሀ folded to
+one form) and cut into overlapping character shingles. Each Ge'ez fidel is a
+single code point, so a 3-character shingle spans three syllables, which keeps
+spelling variants and re-ordered clauses of augmented Amharic rows close.
+
+Shingle hashing, MinHash and candidate generation run as numpy operations.
+Rows whose signatures agree on every value of at least one band become
+candidates, and candidates with an estimated Jaccard similarity at or above
+the threshold are merged into clusters. The cost grows with n log n (one sort
+per band) rather than n², so millions of rows are feasible.
+"""
+
+import re
+import unicodedata
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+MAX_HASH = np.uint64((1 << 32) - 1)
+
+# (first code point of a variant letter family, first code point of the canonical family)
+GEEZ_HOMOPHONES = [
+    (0x1210, 0x1200),
+    (0x1280, 0x1200),
+    (0x1220, 0x1230),
+    (0x12D0, 0x12A0),
+    (0x1340, 0x1338),
+]
+_HOMOPHONE_TABLE = {
+    variant + order: canonical + order
+    for variant, canonical in GEEZ_HOMOPHONES
+    for order in range(7)
+}
+_PUNCTUATION = re.compile(r"[፠-፨]|[^\w\s]")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize(text: str) -> str:
+    text = (
+        unicodedata.normalize("NFKC", str(text)).casefold().translate(_HOMOPHONE_TABLE)
+    )
+    text = _PUNCTUATION.sub(" ", text)
+    return _SPACES.sub(" ", text).strip()
+
+
+def lsh_params(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """
+    (bands, rows per band) with bands * rows == num_perm whose S-curve midpoint
+    (1/bands)^(1/rows) is the highest one not above `threshold`, so likely pairs
+    become candidates and the signature check removes false positives.
+    """
+    options = [(num_perm // r, r) for r in range(1, num_perm + 1) if num_perm % r == 0]
+    below = [(b, r) for b, r in options if (1 / b) ** (1 / r) <= threshold]
+    return (
+        max(below, key=lambda br: (1 / br[0]) ** (1 / br[1])) if below else options[0]
+    )
+
+
+class MinHasher:
+    def __init__(self, num_perm: int = 128, shingle_size: int = 3, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        # Multiply-shift hashing: the high 32 bits of a * h + b (mod 2^64), a odd
+        self.a = rng.integers(0, 1 << 63, num_perm, dtype=np.uint64) * np.uint64(
+            2
+        ) + np.uint64(1)
+        self.b = rng.integers(0, 1 << 63, num_perm, dtype=np.uint64)
+
+    def shingle_hashes(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """32-bit hashes of every shingle of every text, and the offset of each text's first shingle."""
+        k = self.shingle_size
+        texts = [t.ljust(k) for t in texts]  # shorter texts become one padded shingle
+        lengths = np.fromiter((len(t) for t in texts), dtype=np.int64, count=len(texts))
+        chars = np.frombuffer(
+            "".join(texts).encode("utf-32-le"), dtype=np.uint32
+        ).astype(np.uint64)
+
+        # Polynomial hash of each k-character window (uint64 arithmetic wraps)
+        windows = len(chars) - k + 1
+        h = np.zeros(windows, dtype=np.uint64)
+        for j in range(k):
+            h = h * np.uint64(1000003) + chars[j : j + windows]
+        h = (h ^ (h >> np.uint64(32))) & MAX_HASH
+
+        # Keep windows that start and end inside the same text
+        counts = lengths - k + 1
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        first = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        positions = np.repeat(starts - first, counts) + np.arange(counts.sum())
+        return h[positions], first
+
+    def signatures(self, texts: Sequence[str]) -> np.ndarray:
+        """MinHash signatures of already normalized texts, shape (len(texts), num_perm)."""
+        if not len(texts):
+            return np.zeros((0, self.num_perm), dtype=np.uint32)
+        hashes, first = self.shingle_hashes(texts)
+        sig = np.empty((len(texts), self.num_perm), dtype=np.uint32)
+        values = np.empty_like(hashes)
+        shift = np.uint64(32)
+        for p in range(self.num_perm):
+            np.multiply(hashes, self.a[p], out=values)
+            np.add(values, self.b[p], out=values)
+            np.right_shift(values, shift, out=values)
+            sig[:, p] = np.minimum.reduceat(values, first)
+        return sig
+
+
+def _find(parent: np.ndarray, i: int) -> int:
+    root = i
+    while parent[root] != root:
+        root = parent[root]
+    while parent[i] != root:
+        parent[i], i = root, parent[i]
+    return root
+
+
+def _band_pairs(band: np.ndarray) -> np.ndarray:
+    """
+    Candidate pairs of rows with identical band values. Each row of a bucket is
+    paired with the bucket's first row and with its predecessor, which keeps the
+    number of pairs linear in the bucket size; the other bands catch what this
+    misses inside large buckets.
+    """
+    keys = (
+        np.ascontiguousarray(band)
+        .view(np.dtype((np.void, band.dtype.itemsize * band.shape[1])))
+        .ravel()
+    )
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    same = np.concatenate(([False], sorted_keys[1:] == sorted_keys[:-1]))
+    leader = order[np.maximum.accumulate(np.where(same, 0, np.arange(len(order))))]
+    members = np.flatnonzero(same)
+    pairs = np.concatenate(
+        [
+            np.stack([leader[members], order[members]], axis=1),
+            np.stack([order[members - 1], order[members]], axis=1),
+        ]
+    )
+    return np.sort(pairs, axis=1)
+
+
+def find_clusters(
+    texts: Sequence[str],
+    threshold: float = 0.8,
+    num_perm: int = 128,
+    shingle_size: int = 3,
+    chunk_rows: int = 20000,
+    seed: int = 1,
+) -> List[List[int]]:
+    """
+    Clusters (lists of row indices, ascending) of texts whose estimated Jaccard
+    similarity over character shingles is at least `threshold`. Rows without a
+    near duplicate are left out.
+    """
+    hasher = MinHasher(num_perm, shingle_size, seed)
+    normalized = [normalize(t) for t in texts]
+    sig = np.concatenate(
+        [
+            hasher.signatures(normalized[i : i + chunk_rows])
+            for i in range(0, len(normalized), chunk_rows)
+        ]
+        or [np.zeros((0, num_perm), dtype=np.uint32)]
+    )
+    bands, rows = lsh_params(num_perm, threshold)
+    pairs = np.unique(
+        np.concatenate(
+            [_band_pairs(sig[:, b * rows : (b + 1) * rows]) for b in range(bands)]
+            or [np.zeros((0, 2), int)]
+        ),
+        axis=0,
+    )
+
+    parent = np.arange(len(texts))
+    for start in range(0, len(pairs), chunk_rows):
+        chunk = pairs[start : start + chunk_rows]
+        similar = (sig[chunk[:, 0]] == sig[chunk[:, 1]]).mean(axis=1) >= threshold
+        for i, j in chunk[similar].tolist():
+            ri, rj = _find(parent, i), _find(parent, j)
+            if ri != rj:
+                parent[max(ri, rj)] = min(ri, rj)
+
+    clusters: Dict[int, List[int]] = {}
+    for i in range(len(texts)):
+        clusters.setdefault(_find(parent, i), []).append(i)
+    return [members for members in clusters.values() if len(members) > 1]
@@ -0,0 +1,42 @@
+from pathlib import Path
+
+import torch
+
+QUANTIZED_ARTIFACT_NAME = "model_int8.pt"
+
+
+def quantize_dynamic_int8(model: torch.nn.Module) -> torch.nn.Module:
+    """
+    Apply dynamic INT8 quantization to every nn.Linear layer.
+
+    Weights are stored as int8 and activations are quantized on the fly, which
+    roughly quarters the size of the encoder's linear layers on CPU. Embeddings
+    and LayerNorm stay in fp32.
+    """
+    engines = torch.backends.quantized.supported_engines
+    if "fbgemm" in engines:
+        torch.backends.quantized.engine = "fbgemm"
+    elif "qnnpack" in engines:
+        torch.backends.quantized.engine = "qnnpack"
+    quantized = torch.quantization.quantize_dynamic(
+        model, {torch.nn.Linear}, dtype=torch.qint8
+    )
+    quantized.eval()
+    return quantized
+
+
+def save_quantized(model: torch.nn.Module, model_dir: Path) -> Path:
+    """Pickle a quantized model next to its fp32 weights so serving can skip the fp32 load."""
+    path = Path(model_dir) / QUANTIZED_ARTIFACT_NAME
+    torch.save(model, path)
+    return path
+
+
+def load_quantized(model_dir: Path) -> torch.nn.Module:
+    model = torch.load(
+        Path(model_dir) / QUANTIZED_ARTIFACT_NAME,
+        map_location="cpu",
+        weights_only=False,
+    )
+    model.eval()
+    return model
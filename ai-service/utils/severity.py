@@ -1,45 +1,66 @@
-def infer_severity(base_label: str, text: str) -> int:
-    """Simple heuristic to map label + keywords to a 0-5 severity."""
-    t = (text or "").lower()
-
-    base_map = {
-        "FIRE": 3,
-        "MEDICAL": 3,
-        "CRIME": 2,
-        "TRAFFIC": 3,
-        "INFRASTRUCTURE": 2,
-        "OTHER": 2,
-    }
-    score = base_map.get(base_label, 2)
-
-    high_keywords = [
-        "dead",
-        "death",
-        "killed",
-        "died",
-        "ሞት",
-        "ተገደለ",
-        "ሞተ",
-        "explosion",
-        "bomb",
-        "ፍንዳታ",
-        "ብዙ ሰዎች ተጎዱ",
-    ]
-    medium_keywords = [
-        "injured",
-        "injury",
-        "ጉዳት",
-        "ተጎዳ",
-        "እሳት ቃጠሎ",
-        "burn",
-        "serious",
-        "ወድቆ",
-        "ደም",
-    ]
-
-    if any(w in t for w in high_keywords):
+from typing import AbstractSet, Hashable, Optional
+
+from utils.keyword_matcher import KeywordMatcher
+
+BASE_SEVERITY = {
+    "FIRE": 3,
+    "MEDICAL": 3,
+    "CRIME": 2,
+    "TRAFFIC": 3,
+    "INFRASTRUCTURE": 2,
+    "OTHER": 2,
+}
+
+HIGH_KEYWORDS = [
+    "dead",
+    "death",
+    "killed",
+    "died",
+    "ሞት",
+    "ተገደለ",
+    "ሞተ",
+    "explosion",
+    "bomb",
+    "ፍንዳታ",
+    "ብዙ ሰዎች ተጎዱ",
+]
+MEDIUM_KEYWORDS = [
+    "injured",
+    "injury",
+    "ጉዳት",
+    "ተጎዳ",
+    "እሳት ቃጠሎ",
+    "burn",
+    "serious",
+    "ወድቆ",
+    "ደም",
+]
+
+# Group keys used in keyword matchers; main.py folds these into its combined matcher.
+SEVERITY_HIGH = ("severity", "high")
+SEVERITY_MEDIUM = ("severity", "medium")
+SEVERITY_GROUPS = {SEVERITY_HIGH: HIGH_KEYWORDS, SEVERITY_MEDIUM: MEDIUM_KEYWORDS}
+
+_matcher = KeywordMatcher(SEVERITY_GROUPS)
+
+
+def infer_severity(
+    base_label: str, text: str, hits: Optional[AbstractSet[Hashable]] = None
+) -> int:
+    """
+    Simple heuristic to map label + keywords to a 0-5 severity.
+
+    `hits` may carry keyword groups already found by a combined matcher over the
+    same lower-cased text, to avoid scanning it twice.
+    """
+    if hits is None:
+        hits = _matcher.groups((text or "").lower())
+
+    score = BASE_SEVERITY.get(base_label, 2)
+
+    if SEVERITY_HIGH in hits:
         score += 2
-    elif any(w in t for w in medium_keywords):
+    elif SEVERITY_MEDIUM in hits:
         score += 1
 
     return max(0, min(5, score))
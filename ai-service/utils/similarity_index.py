@@ -0,0 +1,368 @@
+"""
+In-process approximate nearest-neighbour index over incident embeddings.
+
+Vectors are unit-length sentence embeddings, stored int8-quantized (x127), so a
+dot product is the cosine similarity and a million 768-d vectors take ~770 MB.
+Below `train_size` live rows every search is exact. From there on the index is
+an IVF: spherical k-means centroids split the rows into inverted lists, new
+rows go to the list of their nearest centroid, and a search scores only the
+rows of the `nprobe` lists closest to the query. The centroids are re-trained
+(and every row re-assigned) whenever the index has grown `retrain_growth` times
+past the size they were trained on.
+
+Rows older than `window_s` are evicted. Timestamps only move forward, so the
+live rows are always a suffix of the storage; eviction advances a start offset
+and the arrays are compacted once more than half of them are dead.
+
+save() copies the live rows under the lock (snapshot()) and writes the copy,
+including list assignments, to one .npz file (atomically) outside it, so
+searches and adds are not blocked by the disk write. load() restores it
+without re-training. `tag` is stored with
+it so a caller can tell which model produced the vectors.
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+QUANT_SCALE = 127.0
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _quantize(vectors: np.ndarray) -> np.ndarray:
+    return np.clip(np.rint(_normalize(vectors) * QUANT_SCALE), -127, 127).astype(
+        np.int8
+    )
+
+
+def spherical_kmeans(
+    vectors: np.ndarray, k: int, iterations: int = 8, seed: int = 0
+) -> np.ndarray:
+    """k unit-length centroids for unit-length `vectors` (cosine k-means)."""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), k, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = (vectors @ centroids.T).argmax(axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, vectors)
+        empty = np.bincount(assignment, minlength=k) == 0
+        sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()), replace=False)]
+        centroids = _normalize(sums)
+    return centroids
+
+
+class SimilarityIndex:
+    def __init__(
+        self,
+        dim: int,
+        window_s: float = 6 * 3600,
+        nprobe: int = 8,
+        max_lists: int = 256,
+        train_size: int = 20000,
+        retrain_growth: int = 8,
+        tag: str = "",
+    ):
+        self.dim = dim
+        self.tag = tag
+        self.window_s = window_s
+        self.nprobe = nprobe
+        self.max_lists = max_lists
+        self.train_size = train_size
+        self.retrain_growth = retrain_growth
+        self._lock = threading.RLock()
+        self._vectors = np.zeros((1024, dim), dtype=np.int8)
+        self._timestamps = np.zeros(1024, dtype=np.float64)
+        self._assignment = np.zeros(1024, dtype=np.int32)
+        self._ids: List[str] = []  # storage order, dead rows included
+        self._categories: List[str] = []
+        self._rows: Dict[str, int] = {}  # live id -> storage row
+        self._start = 0
+        self._size = 0
+        self._centroids: Optional[np.ndarray] = None
+        self._trained_on = 0
+        self._lists: List[np.ndarray] = []
+        self._list_len = np.zeros(0, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return self._size - self._start
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._rows
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self),
+            "lists": 0 if self._centroids is None else len(self._centroids),
+            "tag": self.tag,
+            "window_s": self.window_s,
+            "nprobe": self.nprobe,
+            "bytes": int(
+                self._vectors.nbytes + self._timestamps.nbytes + self._assignment.nbytes
+            ),
+        }
+
+    # --- Writes ---
+
+    def add(
+        self,
+        item_id: str,
+        vector: np.ndarray,
+        category: str = "",
+        timestamp: Optional[float] = None,
+    ) -> bool:
+        """Index one vector; returns False (and keeps the first one) if `item_id` is already live."""
+        return (
+            self.add_batch(
+                [item_id], np.asarray(vector)[None, :], [category], timestamp
+            )
+            == 1
+        )
+
+    def add_batch(
+        self,
+        item_ids: Sequence[str],
+        vectors: np.ndarray,
+        categories: Optional[Sequence[str]] = None,
+        timestamp: Optional[float] = None,
+    ) -> int:
+        """Index several vectors with one timestamp; returns how many were new."""
+        categories = (
+            list(categories) if categories is not None else [""] * len(item_ids)
+        )
+        with self._lock:
+            now = self._clock(timestamp)
+            self.evict(now)
+            keep, seen = [], set()
+            for i, item_id in enumerate(item_ids):
+                if item_id not in self._rows and item_id not in seen:
+                    keep.append(i)
+                    seen.add(item_id)
+            if not keep:
+                return 0
+            quantized = _quantize(np.asarray(vectors)[keep])
+            rows = np.arange(self._size, self._size + len(keep))
+            self._reserve(self._size + len(keep))
+            self._vectors[rows] = quantized
+            self._timestamps[rows] = now
+            for row, i in zip(rows.tolist(), keep):
+                self._ids.append(item_ids[i])
+                self._categories.append(categories[i])
+                self._rows[item_ids[i]] = row
+            self._size += len(keep)
+
+            if self._centroids is None:
+                if len(self) >= self.train_size:
+                    self._train()
+            elif len(self) >= self._trained_on * self.retrain_growth:
+                self._train()
+            else:
+                self._assign(rows)
+            return len(keep)
+
+    def evict(self, now: Optional[float] = None) -> int:
+        """Drop rows older than the window; returns how many were dropped."""
+        with self._lock:
+            now = time.time() if now is None else now
+            live = self._timestamps[self._start : self._size]
+            dead = int(np.searchsorted(live, now - self.window_s, side="left"))
+            for row in range(self._start, self._start + dead):
+                self._rows.pop(self._ids[row], None)
+            self._start += dead
+            if self._start and self._start * 2 >= self._size:
+                self._compact()
+            return dead
+
+    # --- Reads ---
+
+    def search(
+        self,
+        vector: np.ndarray,
+        k: int = 5,
+        min_score: float = 0.0,
+        exclude_id: Optional[str] = None,
+        now: Optional[float] = None,
+    ) -> List[dict]:
+        """Top-k live rows by cosine similarity: [{"id", "score", "category", "timestamp"}], best first."""
+        query = _normalize(vector).reshape(-1)
+        with self._lock:
+            now = time.time() if now is None else now
+            self.evict(now)
+            if not len(self):
+                return []
+            if self._centroids is None:
+                candidates = np.arange(self._start, self._size)
+            else:
+                probe = np.argsort(-(self._centroids @ query))[: self.nprobe]
+                candidates = np.concatenate(
+                    [self._lists[c][: self._list_len[c]] for c in probe]
+                )
+                candidates = candidates[
+                    candidates >= self._start
+                ]  # evicted, not yet compacted
+            if not len(candidates):
+                return []
+            scores = (
+                self._vectors[candidates].astype(np.float32) @ query
+            ) / QUANT_SCALE
+            if exclude_id is not None and exclude_id in self._rows:
+                scores[candidates == self._rows[exclude_id]] = -np.inf
+            top = np.argpartition(-scores, min(k, len(scores) - 1))[:k]
+            top = top[np.argsort(-scores[top])]
+            return [
+                {
+                    "id": self._ids[candidates[i]],
+                    "score": round(min(float(scores[i]), 1.0), 4),
+                    "category": self._categories[candidates[i]],
+                    "timestamp": float(self._timestamps[candidates[i]]),
+                }
+                for i in top
+                if scores[i] >= min_score
+            ]
+
+    # --- Persistence ---
+
+    def snapshot(self) -> dict:
+        """Copies of the live rows and settings; the lock is held only while copying."""
+        with self._lock:
+            live = slice(self._start, self._size)
+            return {
+                "config": np.array(
+                    [
+                        self.dim,
+                        self.window_s,
+                        self.nprobe,
+                        self.max_lists,
+                        self.train_size,
+                        self.retrain_growth,
+                        self._trained_on,
+                    ],
+                    dtype=np.float64,
+                ),
+                "vectors": self._vectors[live].copy(),
+                "timestamps": self._timestamps[live].copy(),
+                "assignment": self._assignment[live].copy(),
+                "ids": self._ids[live],
+                "categories": self._categories[live],
+                "tag": np.array(self.tag),
+                "centroids": self._centroids.copy()
+                if self._centroids is not None
+                else np.zeros((0, self.dim), np.float32),
+            }
+
+    def save(self, path: Path) -> None:
+        """Write a snapshot to `path` atomically; searches and adds keep running during the write."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        arrays = self.snapshot()
+        arrays["ids"] = np.array(arrays["ids"], dtype=str)
+        arrays["categories"] = np.array(arrays["categories"], dtype=str)
+        with tmp.open("wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path, **overrides) -> "SimilarityIndex":
+        """Restore a saved index; keyword `overrides` (e.g. window_s) replace the saved settings."""
+        with np.load(Path(path), allow_pickle=False) as data:
+            dim, window_s, nprobe, max_lists, train_size, retrain_growth, trained_on = (
+                data["config"].tolist()
+            )
+            settings = {
+                "window_s": window_s,
+                "nprobe": int(nprobe),
+                "max_lists": int(max_lists),
+                "train_size": int(train_size),
+                "retrain_growth": int(retrain_growth),
+                "tag": str(data["tag"]),
+            }
+            index = cls(int(dim), **{**settings, **overrides})
+            n = len(data["timestamps"])
+            index._reserve(n)
+            index._vectors[:n] = data["vectors"]
+            index._timestamps[:n] = data["timestamps"]
+            index._assignment[:n] = data["assignment"]
+            index._ids = data["ids"].tolist()
+            index._categories = data["categories"].tolist()
+            index._rows = {item_id: row for row, item_id in enumerate(index._ids)}
+            index._size = n
+            if len(data["centroids"]):
+                index._centroids = data["centroids"]
+                index._trained_on = int(trained_on)
+                index._rebuild_lists()
+        return index
+
+    # --- Internals ---
+
+    def _clock(self, timestamp: Optional[float]) -> float:
+        now = time.time() if timestamp is None else timestamp
+        last = self._timestamps[self._size - 1] if self._size else -np.inf
+        return max(now, float(last))  # keep storage sorted by time
+
+    def _reserve(self, rows: int) -> None:
+        capacity = len(self._timestamps)
+        if rows <= capacity:
+            return
+        capacity = max(rows, capacity * 2)
+        for name in ("_vectors", "_timestamps", "_assignment"):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[: self._size] = old[: self._size]
+            setattr(self, name, new)
+
+    def _compact(self) -> None:
+        start, n = self._start, self._size - self._start
+        for name in ("_vectors", "_timestamps", "_assignment"):
+            array = getattr(self, name)
+            array[:n] = array[start : self._size]
+        self._ids = self._ids[start:]
+        self._categories = self._categories[start:]
+        self._rows = {item_id: row - start for item_id, row in self._rows.items()}
+        self._start, self._size = 0, n
+        if self._centroids is not None:
+            self._rebuild_lists()
+
+    def _train(self) -> None:
+        live = np.arange(self._start, self._size)
+        nlist = int(min(self.max_lists, max(16, np.sqrt(len(live)))))
+        sample = np.random.default_rng(0).choice(
+            live, min(len(live), nlist * 64), replace=False
+        )
+        self._centroids = spherical_kmeans(
+            self._vectors[sample].astype(np.float32) / QUANT_SCALE, nlist
+        )
+        self._trained_on = len(live)
+        self._assign(live, rebuild=True)
+
+    def _assign(self, rows: np.ndarray, rebuild: bool = False) -> None:
+        for chunk in np.array_split(rows, max(1, len(rows) // 65536)):
+            self._assignment[chunk] = (
+                self._vectors[chunk].astype(np.float32) @ self._centroids.T
+            ).argmax(axis=1)
+        if rebuild:
+            self._rebuild_lists()
+            return
+        for row, c in zip(rows.tolist(), self._assignment[rows].tolist()):
+            if self._list_len[c] == len(self._lists[c]):
+                grown = np.zeros(max(16, 2 * len(self._lists[c])), dtype=np.int64)
+                grown[: self._list_len[c]] = self._lists[c]
+                self._lists[c] = grown
+            self._lists[c][self._list_len[c]] = row
+            self._list_len[c] += 1
+
+    def _rebuild_lists(self) -> None:
+        rows = np.arange(self._start, self._size)
+        assignment = self._assignment[rows]
+        order = np.argsort(assignment, kind="stable")
+        counts = np.bincount(assignment, minlength=len(self._centroids))
+        self._lists = np.split(rows[order], np.cumsum(counts)[:-1])
+        self._list_len = counts.astype(np.int64)
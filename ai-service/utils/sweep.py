@@ -0,0 +1,84 @@
+"""
+Bookkeeping for training/sweep_incident_classifier.py and the trials it launches.
+
+Trials run as separate processes and share one append-only JSON-lines progress
+file: each appends its validation macro-F1 after every epoch and reads everyone
+else's. A trial stops early (median stopping rule) when, at the same epoch, its
+macro-F1 is below the median of at least `min_trials` other trials. Lines are
+small single writes to a file opened in append mode, so concurrent trials do not
+interleave them.
+"""
+
+import itertools
+import json
+import random
+from pathlib import Path
+from statistics import median
+from typing import Dict, List, Optional, Sequence
+
+
+def parameter_grid(
+    space: Dict[str, Sequence], trials: int = 0, seed: int = 0
+) -> List[dict]:
+    """Every combination of `space`, or a seeded random sample of `trials` of them."""
+    names = list(space)
+    grid = [
+        dict(zip(names, values))
+        for values in itertools.product(*(space[n] for n in names))
+    ]
+    if trials and trials < len(grid):
+        grid = random.Random(seed).sample(grid, trials)
+    return grid
+
+
+class ProgressLog:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+    def record(self, **entry) -> None:
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+
+    def read(self) -> List[dict]:
+        if not self.path.exists():
+            return []
+        entries = []
+        for line in self.path.read_text(encoding="utf-8").splitlines():
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                continue  # a line still being written
+        return entries
+
+
+def should_prune(
+    entries: List[dict],
+    trial: str,
+    epoch: int,
+    value: float,
+    min_trials: int = 3,
+    warmup_epochs: int = 0,
+) -> bool:
+    """Median stopping rule over the progress `entries` of the other trials."""
+    if epoch <= warmup_epochs:
+        return False
+    others = {
+        e["trial"]: e["macro_f1"]
+        for e in entries
+        if e.get("epoch") == epoch and e["trial"] != trial
+    }
+    return len(others) >= min_trials and value < median(others.values())
+
+
+def pruned_at(entries: List[dict], trial: str) -> Optional[int]:
+    return next(
+        (e["pruned_at"] for e in entries if e["trial"] == trial and "pruned_at" in e),
+        None,
+    )
+
+
+def rank_trials(results: List[dict]) -> List[dict]:
+    """Best macro-F1 first; trials without a score (failed, timed out) last."""
+    return sorted(
+        results, key=lambda r: (r.get("macro_f1") is None, -(r.get("macro_f1") or 0.0))
+    )
@@ -0,0 +1,110 @@
+"""
+Persistent cache of tokenized datasets, shared by training and evaluation runs.
+
+Datasets built from pandas frames get a random fingerprint, so `Dataset.map`
+re-tokenizes every run. Here the tokenized columns are stored as Arrow files
+under `cache_dir/<key>/`, where the key hashes the exact texts being tokenized
+(so the CSV contents and the split), the tokenizer's identity (its serialized
+vocabulary and normalization for fast tokenizers) and the tokenization settings.
+A hit is loaded memory-mapped, so a sweep reusing the same data starts training
+without tokenizing anything.
+"""
+
+import hashlib
+import json
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+from datasets import Dataset, concatenate_datasets, load_from_disk
+
+TOKEN_COLUMNS = ("input_ids", "attention_mask")
+CACHE_FORMAT = 1
+
+
+def tokenizer_fingerprint(tokenizer) -> str:
+    """Hash of what decides the token ids: the tokenizer definition and special tokens."""
+    h = hashlib.sha256()
+    h.update(type(tokenizer).__name__.encode())
+    backend = getattr(tokenizer, "backend_tokenizer", None)
+    if backend is not None:
+        # truncation/padding in the serialized form are per-call state, not identity
+        spec = json.loads(backend.to_str())
+        spec.pop("truncation", None)
+        spec.pop("padding", None)
+        h.update(json.dumps(spec, sort_keys=True).encode())
+    else:
+        h.update(str(getattr(tokenizer, "name_or_path", "")).encode())
+        h.update(json.dumps(sorted(tokenizer.get_vocab().items())).encode())
+    h.update(
+        json.dumps(tokenizer.special_tokens_map, sort_keys=True, default=str).encode()
+    )
+    return h.hexdigest()
+
+
+def texts_fingerprint(texts: Iterable[str]) -> str:
+    h = hashlib.sha256()
+    for text in texts:
+        h.update(text.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def cache_key(texts, tokenizer, max_length: int, padding: Union[bool, str]) -> str:
+    parts = [
+        f"v{CACHE_FORMAT}",
+        texts_fingerprint(texts),
+        tokenizer_fingerprint(tokenizer),
+        str(max_length),
+        str(padding),
+    ]
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()[:32]
+
+
+def tokenize_cached(
+    ds: Dataset,
+    tokenizer,
+    cache_dir: Optional[Union[str, Path]],
+    max_length: int = 128,
+    padding: Union[bool, str] = False,
+    text_column: str = "text",
+) -> Dataset:
+    """
+    `ds` with input_ids/attention_mask added, read from the cache when the same
+    texts were tokenized the same way before. `cache_dir=None` disables caching.
+    """
+    texts = [str(t) for t in ds[text_column]]
+
+    def tokenize():
+        encoded = tokenizer(
+            texts, truncation=True, padding=padding, max_length=max_length
+        )
+        return Dataset.from_dict({col: encoded[col] for col in TOKEN_COLUMNS})
+
+    if cache_dir is None:
+        return concatenate_datasets([ds, tokenize()], axis=1)
+
+    path = Path(cache_dir) / cache_key(texts, tokenizer, max_length, padding)
+    if path.exists():
+        tokens = load_from_disk(str(path))
+        print(f"Token cache hit: {path} ({len(tokens)} rows)")
+    else:
+        tokens = tokenize()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary directory and rename, so concurrent runs never read a partial entry
+        tmp = Path(tempfile.mkdtemp(dir=path.parent, prefix=".tmp-"))
+        try:
+            tokens.save_to_disk(str(tmp))
+            tmp.rename(path)
+        except OSError:
+            if not path.exists():
+                raise
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+        tokens = load_from_disk(str(path))
+        print(f"Token cache miss: tokenized {len(tokens)} rows into {path}")
+    return concatenate_datasets(
+        [ds.remove_columns([c for c in TOKEN_COLUMNS if c in ds.column_names]), tokens],
+        axis=1,
+    )
@@ -20,8 +20,15 @@ export const aiWorker = new Worker(
 
     try {
       // 1. Call AI Service
-      aiOutput = await classifyWithBackoff({ title, description });
+      // incident_id lets the AI service match later near-identical reports (SIMILAR_INCIDENTS=on)
+      aiOutput = await classifyWithBackoff({ title, description, incident_id: String(incidentId) });
       aiSuccess = true;
+      if (aiOutput?.similar_incidents?.length) {
+        logger.info(
+          { incidentId, similar: aiOutput.similar_incidents },
+          'AI service found similar recent incidents',
+        );
+      }
     } catch (err: any) {
       const errorDetails = err.response?.data || err.message || 'Unknown error';
       const statusCode = err.response?.status;
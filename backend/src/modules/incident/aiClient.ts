@@ -18,25 +18,60 @@ let metadataCache: { expiresAt: number; value: MetadataPayload | null } | null =
 
 const sleep = (ms: number) => new Promise((r) => setTimeout(r, ms));
 
-export async function classifyWithBackoff(payload: Record<string, any>) {
-  const attempts = [0, 250, 750];
+const MAX_RETRY_AFTER_MS = 5000;
+const RETRY_SCHEDULE_MS = [0, 250, 750];
+
+/**
+ * Delay before the next attempt. When the AI service is overloaded (429) or not
+ * ready (503) it sends Retry-After; honour it (capped) instead of the fixed
+ * schedule. Returns null for errors that retrying cannot fix (other 4xx).
+ */
+export function retryDelayMs(err: any, scheduled: number): number | null {
+  const statusCode = err?.response?.status;
+  if (statusCode === 429 || statusCode === 503) {
+    const retryAfter = Number(err.response.headers?.['retry-after']);
+    if (Number.isFinite(retryAfter) && retryAfter > 0) {
+      return Math.min(Math.max(retryAfter * 1000, scheduled), MAX_RETRY_AFTER_MS);
+    }
+    return scheduled;
+  }
+  if (statusCode && statusCode >= 400 && statusCode < 500) return null;
+  return scheduled;
+}
+
+/**
+ * POST to the AI service, retrying on the RETRY_SCHEDULE_MS schedule (or the
+ * service's Retry-After) until an attempt succeeds or retryDelayMs gives up.
+ */
+async function postWithBackoff(url: string, body: unknown, timeout: number) {
   let lastError: any;
-  for (const delay of attempts) {
+  let delay = 0;
+  for (let attempt = 0; attempt < RETRY_SCHEDULE_MS.length; attempt++) {
     if (delay) await sleep(delay);
     try {
-      const res = await axios.post(CLASSIFY_URL, payload, {
-        timeout: 4500,
+      const res = await axios.post(url, body, {
+        timeout,
         headers: { Authorization: `Bearer ${INTERNAL_SERVICE_SECRET}` },
       });
       return res.data;
     } catch (err) {
       lastError = err;
-      logger.warn({ err }, 'AI classify attempt failed');
+      const next =
+        attempt + 1 < RETRY_SCHEDULE_MS.length
+          ? retryDelayMs(err, RETRY_SCHEDULE_MS[attempt + 1])
+          : null;
+      logger.warn({ err, url }, 'AI classify attempt failed');
+      if (next === null) break;
+      delay = next;
     }
   }
   throw lastError;
 }
 
+export async function classifyWithBackoff(payload: Record<string, any>) {
+  return postWithBackoff(CLASSIFY_URL, payload, 4500);
+}
+
 export async function fetchAiMetadata(force = false): Promise<MetadataPayload | null> {
   if (!force && metadataCache && metadataCache.expiresAt > Date.now()) {
     return metadataCache.value;
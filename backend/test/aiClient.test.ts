@@ -0,0 +1,67 @@
+import { describe, it, expect, vi, beforeEach } from 'vitest';
+import axios from 'axios';
+import { classifyWithBackoff, retryDelayMs } from '../src/modules/incident/aiClient';
+
+vi.mock('axios', () => ({ default: { post: vi.fn(), get: vi.fn() } }));
+vi.mock('../src/config/env', () => ({ INTERNAL_SERVICE_SECRET: 'test-secret' }));
+vi.mock('../src/logger', () => ({ default: { warn: vi.fn() } }));
+
+const httpError = (status: number, headers: Record<string, string> = {}) => ({
+  response: { status, headers },
+});
+
+describe('retryDelayMs', () => {
+  it('honours Retry-After on 429 and 503, capped at 5s', () => {
+    expect(retryDelayMs(httpError(429, { 'retry-after': '2' }), 250)).toBe(2000);
+    expect(retryDelayMs(httpError(503, { 'retry-after': '60' }), 250)).toBe(5000);
+  });
+
+  it('never waits less than the scheduled delay', () => {
+    expect(retryDelayMs(httpError(503, { 'retry-after': '0.1' }), 250)).toBe(250);
+  });
+
+  it('falls back to the schedule when Retry-After is missing or not a number', () => {
+    expect(retryDelayMs(httpError(429), 250)).toBe(250);
+    expect(retryDelayMs(httpError(503, { 'retry-after': 'soon' }), 750)).toBe(750);
+  });
+
+  it('gives up on other 4xx and retries network errors and 5xx', () => {
+    expect(retryDelayMs(httpError(400), 250)).toBeNull();
+    expect(retryDelayMs(httpError(500), 250)).toBe(250);
+    expect(retryDelayMs(new Error('ECONNRESET'), 250)).toBe(250);
+  });
+});
+
+describe('classifyWithBackoff', () => {
+  const post = vi.mocked(axios.post);
+
+  beforeEach(() => {
+    post.mockReset();
+  });
+
+  it('retries 429 and 503 responses until the service answers', async () => {
+    post
+      .mockRejectedValueOnce(httpError(429))
+      .mockRejectedValueOnce(httpError(503))
+      .mockResolvedValueOnce({ data: { predicted_category: 'FIRE' } } as any);
+
+    await expect(classifyWithBackoff({ title: 'Fire' })).resolves.toEqual({
+      predicted_category: 'FIRE',
+    });
+    expect(post).toHaveBeenCalledTimes(3);
+  });
+
+  it('does not retry a rejected request', async () => {
+    post.mockRejectedValue(httpError(422));
+
+    await expect(classifyWithBackoff({ title: '' })).rejects.toEqual(httpError(422));
+    expect(post).toHaveBeenCalledTimes(1);
+  });
+
+  it('throws the last error once every attempt has failed', async () => {
+    post.mockRejectedValue(httpError(503));
+
+    await expect(classifyWithBackoff({ title: 'Fire' })).rejects.toEqual(httpError(503));
+    expect(post).toHaveBeenCalledTimes(3);
+  });
+});
@@ -4,7 +4,7 @@ export default defineConfig({
   test: {
     environment: 'node',
     // No setupFiles to avoid DB connection
-    include: ['test/audit.test.ts'],
+    include: ['test/audit.test.ts', 'test/aiClient.test.ts'],
     testTimeout: 10000,
   },
 });
@@ -0,0 +1,200 @@
+"""
+Load profile for the AI classification service (POST /classify, /classify/batch).
+
+Payloads are incident texts sampled from ai-service/data (English, Amharic and
+mixed), sent with the service's bearer secret. Single requests are named per
+language ("/classify [am]") so Locust reports latency percentiles per language.
+Every classification result is also recorded as a RESULT entry named after the
+path that produced it (model, cascade, empty, error-fallback); error-fallback
+results count as failures, so the fallback rate shows in the stats table and
+CSVs next to HTTP errors. A summary with overall percentiles and the fallback
+rate is printed at the end and written to $AI_LOAD_REPORT when set.
+
+AI_LOAD_SHAPE picks the load shape:
+  steady  -u users at -r spawn rate for -t (default)
+  spike   AI_SPIKE_BASE_S at -u users, AI_SPIKE_HOLD_S at AI_SPIKE_USERS
+          (default 10 x -u), then AI_SPIKE_BASE_S back at -u; AI_SPIKES cycles
+  soak    ramp to -u and hold for -t (default 1h)
+"""
+
+import csv
+import json
+import os
+import random
+from pathlib import Path
+
+from locust import HttpUser, LoadTestShape, between, events, task
+from locust.runners import WorkerRunner
+from locust.stats import StatsEntry
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "ai-service" / "data"
+DATA_FILES = os.getenv(
+    "AI_LOAD_DATA",
+    f"{DATA_DIR / 'incidents_labeled.csv'},{DATA_DIR / 'incidents_am_aug.csv'}",
+).split(",")
+SECRET = os.getenv("INTERNAL_SERVICE_SECRET", "")
+MAX_FALLBACK_RATE = float(os.getenv("AI_MAX_FALLBACK_RATE", "0.01"))
+BATCH_SIZES = (5, 20)
+
+
+def load_rows():
+    rows = []
+    for path in DATA_FILES:
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            for row in csv.DictReader(f):
+                if row.get("text"):
+                    rows.append(
+                        {"text": row["text"], "lang": row.get("lang") or "unknown"}
+                    )
+    return rows
+
+
+ROWS = load_rows()
+
+
+class ErrorFallback(Exception):
+    pass
+
+
+def result_path(model_version: str) -> str:
+    if model_version == "error-fallback":
+        return "error-fallback"
+    for suffix in ("cascade", "empty"):
+        if model_version.endswith(f"-{suffix}"):
+            return suffix
+    return "model"  # model or prediction cache
+
+
+class AiClassifyUser(HttpUser):
+    wait_time = between(
+        float(os.getenv("AI_WAIT_MIN_S", "0.5")), float(os.getenv("AI_WAIT_MAX_S", "2"))
+    )
+
+    def on_start(self):
+        if SECRET:
+            self.client.headers["Authorization"] = f"Bearer {SECRET}"
+
+    def record_results(self, results, response_time: float):
+        for result in results:
+            path = result_path(result.get("model_version", ""))
+            events.request.fire(
+                request_type="RESULT",
+                name=path,
+                response_time=response_time,
+                response_length=0,
+                exception=ErrorFallback(path) if path == "error-fallback" else None,
+                context={},
+            )
+
+    @task(9)
+    def classify(self):
+        row = random.choice(ROWS)
+        with self.client.post(
+            "/classify",
+            json={"title": "", "description": row["text"]},
+            name=f"/classify [{row['lang']}]",
+            catch_response=True,
+        ) as res:
+            if res.status_code == 200:
+                self.record_results([res.json()], res.request_meta["response_time"])
+
+    @task(1)
+    def classify_batch(self):
+        rows = random.sample(ROWS, random.randint(*BATCH_SIZES))
+        with self.client.post(
+            "/classify/batch",
+            json=[{"title": "", "description": row["text"]} for row in rows],
+            catch_response=True,
+        ) as res:
+            if res.status_code == 200:
+                self.record_results(res.json(), res.request_meta["response_time"])
+
+
+class AiLoadShape(LoadTestShape):
+    use_common_options = True
+    profile = os.getenv("AI_LOAD_SHAPE", "steady")
+
+    def tick(self):
+        options = self.runner.environment.parsed_options
+        users = options.num_users or 10
+        rate = options.spawn_rate or 1
+        run_time = self.get_run_time()
+
+        if self.profile == "spike":
+            base_s = float(os.getenv("AI_SPIKE_BASE_S", "60"))
+            hold_s = float(os.getenv("AI_SPIKE_HOLD_S", "30"))
+            spike_users = int(os.getenv("AI_SPIKE_USERS", str(users * 10)))
+            cycle = 2 * base_s + hold_s
+            if run_time >= cycle * int(os.getenv("AI_SPIKES", "1")):
+                return None
+            in_cycle = run_time % cycle
+            if base_s <= in_cycle < base_s + hold_s:
+                return spike_users, spike_users  # everyone arrives within a second
+            return users, spike_users  # drop back just as fast
+
+        limit = options.run_time or (3600 if self.profile == "soak" else None)
+        if limit is not None and run_time >= limit:
+            return None
+        return users, rate
+
+
+@events.test_stop.add_listener
+def summarize(environment, **_kwargs):
+    stats = environment.stats
+    if stats is None or isinstance(environment.runner, WorkerRunner):
+        return  # the master reports the aggregated numbers
+    singles = [
+        e
+        for (name, method), e in stats.entries.items()
+        if method == "POST" and name.startswith("/classify [")
+    ]
+    results = {
+        name: e.num_requests
+        for (name, method), e in stats.entries.items()
+        if method == "RESULT"
+    }
+    if not singles and not results:
+        return
+
+    combined = StatsEntry(stats, "/classify", "POST", use_response_times_cache=False)
+    for entry in singles:
+        combined.extend(entry)
+
+    def latency(entry: StatsEntry) -> dict:
+        return {
+            "requests": entry.num_requests,
+            "failures": entry.num_failures,
+            "p50_ms": entry.get_response_time_percentile(0.5),
+            "p95_ms": entry.get_response_time_percentile(0.95),
+            "p99_ms": entry.get_response_time_percentile(0.99),
+        }
+
+    total_results = sum(results.values())
+    fallback_rate = (
+        results.get("error-fallback", 0) / total_results if total_results else 0.0
+    )
+    report = {
+        "classify": {
+            **latency(combined),
+            "per_language": {
+                e.name[len("/classify [") : -1]: latency(e) for e in singles
+            },
+        },
+        "results": results,
+        "error_fallback_rate": round(fallback_rate, 5),
+        "max_error_fallback_rate": MAX_FALLBACK_RATE,
+    }
+    batch = stats.entries.get(("/classify/batch", "POST"))
+    if batch is not None:
+        report["classify_batch"] = latency(batch)
+
+    print("AI load summary:\n" + json.dumps(report, indent=2))
+    if os.getenv("AI_LOAD_REPORT"):
+        Path(os.environ["AI_LOAD_REPORT"]).write_text(
+            json.dumps(report, indent=2), encoding="utf-8"
+        )
+    if fallback_rate > MAX_FALLBACK_RATE:
+        print(
+            f"error-fallback rate {fallback_rate:.2%} exceeds {MAX_FALLBACK_RATE:.2%}"
+        )
+        environment.process_exit_code = 1